@@ -0,0 +1,81 @@
+"""Rendered HTML cache
+
+Pages and the fragments they are built from only change when the data
+version does, so each (template, key) is rendered once per data version and
+served as a string until the inputs move.
+"""
+import threading
+import time
+
+from markupsafe import Markup
+
+# Keys come from query parameters, so the number of entries is capped
+MAX_ENTRIES = 512
+
+
+class FragmentCache:
+    """
+    In-memory store of rendered templates.
+
+    env is the Jinja2 environment, version() returns the current data
+    version; entries rendered against another version are dropped, and the
+    oldest entries go first once max_entries is reached.
+    """
+
+    def __init__(self, env, version, max_entries=MAX_ENTRIES):
+        self.env = env
+        self.version = version
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, template, key, context, version=None):
+        """
+        Return (html, hit) for one template and key. context() builds the
+        template variables and is only called on a miss.
+        """
+        if version is None:
+            version = self.version()
+        entry_key = (template, key, version)
+
+        with self._lock:
+            html = self._entries.get(entry_key)
+            if html is not None:
+                self.hits += 1
+                return html, True
+
+        html = Markup(self.env.get_template(template).render(**context()))
+
+        with self._lock:
+            self._evict_stale(version)
+            self._entries[entry_key] = html
+            self.misses += 1
+        return html, False
+
+    def page(self, template, key, context):
+        """
+        Render a whole page through the cache.
+        Returns (html, hit, elapsed_ms) like PredictionCache.get.
+        """
+        start = time.perf_counter()
+        version = self.version()
+        html, hit = self.render(template, key, lambda: context(version), version)
+        return html, hit, (time.perf_counter() - start) * 1000
+
+    def invalidate(self):
+        """Drop every rendered page and fragment"""
+        with self._lock:
+            self._entries.clear()
+
+    def hit_ratio(self):
+        """Share of lookups served without rendering"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _evict_stale(self, version):
+        for stale in [k for k in self._entries if k[2] != version]:
+            del self._entries[stale]
+        while len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
@@ -2,32 +2,52 @@
 NRL Predictions FastAPI Application
 Fetches real data from nrl.com
 """
-from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
+from datetime import date
+from fastapi import FastAPI
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
+from fastapi.concurrency import run_in_threadpool
 import os
+import time
+
+from app import observability
+from app.static_assets import StaticAssets
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Materialize predictions and render the pages for upcoming rounds before serving traffic"""
+    rounds = fixtures.upcoming_rounds() or [1]
+    prediction_cache.precompute(rounds)
+    for round_num in rounds:
+        render_home(round_num)
+    render_home()
+    render_fixtures()
+    visualisations.precompute([predictions.YEAR, predictions.YEAR - 1])
+    yield
+
 
 app = FastAPI(
     title="NRL Predictions API",
     description="NRL Match Predictions and Try Scorer Probabilities - Real-time data from nrl.com",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# Mount static files
+# Per-route latency and payload sizes, rendered on /metrics
+request_metrics = observability.RequestMetrics()
+app.add_middleware(observability.MetricsMiddleware, metrics=request_metrics)
+
+# Mount static files, fingerprinted and precompressed at start-up
 static_dir = os.path.join(os.path.dirname(__file__), "static")
-if os.path.exists(static_dir):
-    app.mount("/static", StaticFiles(directory=static_dir), name="static")
+static_assets = StaticAssets(static_dir)
+app.mount("/static", static_assets, name="static")
 
-# Mount templates
+# Mount templates; static_url() links to the fingerprinted asset names
 templates_dir = os.path.join(os.path.dirname(__file__), "templates")
 templates = Jinja2Templates(directory=templates_dir)
-
-
-@app.get("/")
-async def home(request: Request):
-    """Home page with current fixtures"""
-    return templates.TemplateResponse("index.html", {"request": request})
+templates.env.globals["static_url"] = static_assets.url
 
 
 @app.get("/api/health")
@@ -37,13 +57,63 @@ async def health():
 
 
 # Import routes
-from app.routes import predictions, fixtures
+from app.routes import predictions, fixtures, pages, visualisations
+from app.prediction_cache import PredictionCache
+from app.fragment_cache import FragmentCache
+
+prediction_cache = PredictionCache(
+    compute=predictions.get_predictions,
+    model_version=predictions.MODEL_VERSION,
+    sources=predictions.prediction_sources
+)
+
+# Rendered pages and per-round fragments, keyed by the prediction data version
+fragment_cache = FragmentCache(
+    env=templates.env,
+    version=lambda: f"{prediction_cache.model_version}-{prediction_cache.data_version()}"
+)
+
+
+def html_response(html, hit, elapsed_ms):
+    """Cached page with the same cache headers as /api/predictions"""
+    return HTMLResponse(html, headers={
+        "X-Cache": "HIT" if hit else "MISS",
+        "Server-Timing": f'render;dur={elapsed_ms:.3f};desc="{"hit" if hit else "miss"}"'
+    })
+
+
+def render_home(round_num=None):
+    """Home page of a round; without one, the next round to be played as of today"""
+    # The default round only moves with the date or the data, so resolve it inside the cached render
+    key = round_num if round_num is not None else ("upcoming", date.today().isoformat())
+    return fragment_cache.page("index.html", key, lambda version: pages.home_context(
+        fragment_cache, version, round_num if round_num is not None else pages.default_round(), prediction_cache))
+
+
+def render_fixtures():
+    return fragment_cache.page("fixtures.html", None,
+                               lambda version: pages.fixtures_context(fragment_cache, version))
+
+
+def render_try_scorers(round_num):
+    return fragment_cache.page("try_scorers.html", round_num,
+                               lambda version: pages.try_scorers_context(fragment_cache, version, round_num))
+
+
+@app.get("/")
+async def home(round: int = None):
+    """Home page with the predictions of a round, rendered server-side"""
+    return html_response(*render_home(round))
 
 
 @app.get("/api/predictions")
-async def get_predictions():
-    """Get match predictions"""
-    return predictions.get_predictions()
+async def get_predictions(round_num: int = 1):
+    """Get match predictions, served from the materialized per-round cache"""
+    payload, hit, elapsed_ms = prediction_cache.get(round_num)
+    return JSONResponse(payload, headers={
+        "X-Cache": "HIT" if hit else "MISS",
+        "Server-Timing": f'predictions;dur={elapsed_ms:.3f};desc="{"hit" if hit else "miss"}"'
+    })
 
 
 @app.get("/api/fixtures")
@@ -54,16 +124,57 @@ async def get_fixtures(round_num: int = None):
     return fixtures.get_fixtures()
 
 
+@app.get("/api/visualisations")
+async def get_visualisations(year: int = None, round_num: int = None, selection: str = "NRL"):
+    """Chart data (attack vs defense, form, half splits) for a season through a round"""
+    payload, hit = await run_in_threadpool(visualisations.get_visualisations,
+                                           year or predictions.YEAR, round_num, selection)
+    return JSONResponse(payload, headers={"X-Cache": "HIT" if hit else "MISS"})
+
+
+@app.get("/metrics")
+async def metrics(format: str = "prometheus"):
+    """Request, prediction cache and data version metrics (Prometheus text, or format=json)"""
+    if format == "json":
+        return {
+            "routes": request_metrics.snapshot(),
+            "prediction_cache": {
+                "hits": prediction_cache.hits,
+                "misses": prediction_cache.misses,
+                "hit_ratio": prediction_cache.hit_ratio(),
+            },
+            "fragment_cache": {
+                "hits": fragment_cache.hits,
+                "misses": fragment_cache.misses,
+                "hit_ratio": fragment_cache.hit_ratio(),
+            },
+            "data_version": prediction_cache.data_version(),
+            "data_version_age_seconds": observability.data_version_age(predictions.prediction_sources()),
+        }
+    return PlainTextResponse(observability.render_metrics(request_metrics, prediction_cache,
+                                                          predictions.prediction_sources, fragment_cache))
+
+
+@app.get("/debug/profile")
+async def profile(seconds: float = 10.0):
+    """Sample all threads for a time window and return collapsed stacks (requires NRL_PROFILING=1)"""
+    if not observability.PROFILING_ENABLED:
+        return JSONResponse({"detail": "Profiling is disabled; set NRL_PROFILING=1"}, status_code=404)
+    profiler = await run_in_threadpool(observability.profile_window, seconds)
+    path = profiler.dump(f"{int(time.time())}-window")
+    return PlainTextResponse(profiler.collapsed(), headers={"X-Profile-Path": path})
+
+
 @app.get("/fixtures")
-async def fixtures_page(request: Request):
-    """Fixtures page"""
-    return templates.TemplateResponse("fixtures.html", {"request": request})
+async def fixtures_page():
+    """Fixtures page, every cached round rendered server-side"""
+    return html_response(*render_fixtures())
 
 
 @app.get("/try-scorers")
-async def try_scorers_page(request: Request):
+async def try_scorers_page(round: int = 1):
     """Try scorer predictions page"""
-    return templates.TemplateResponse("try_scorers.html", {"request": request})
+    return html_response(*render_try_scorers(round))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,253 @@
+"""Request metrics and sampling profiler for the API
+
+MetricsMiddleware records latency and request/response payload sizes per
+route template (``/api/predictions``, not every query string). The
+``/metrics`` endpoint renders them as Prometheus text together with the
+prediction cache hit ratio and the age of the data version.
+
+The profiler is opt-in (``NRL_PROFILING=1``). It samples every thread's
+stack with ``sys._current_frames`` and writes collapsed stacks
+("frame;frame;frame count" lines) that flamegraph.pl, speedscope or
+inferno render directly. Profile one request by sending ``X-Profile: 1``,
+or a time window with ``GET /debug/profile?seconds=10``.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+# Upper bounds of the latency (seconds) and payload size (bytes) buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+PROFILING_ENABLED = os.environ.get("NRL_PROFILING", "") not in ("", "0", "false")
+PROFILE_DIR = os.environ.get(
+    "NRL_PROFILE_DIR", os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "data", "cache", "profiles")))
+PROFILE_INTERVAL = 0.005
+MAX_PROFILE_SECONDS = 60
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout"""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[index] += 1
+                return
+        self.counts[-1] += 1
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip([*map(str, self.bounds), "+Inf"], self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f"{name}_sum{{{labels}}} {self.sum:.6f}"
+        yield f"{name}_count{{{labels}}} {self.count}"
+
+
+class RequestMetrics:
+    """Per-route latency, payload size and status counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.response_size = defaultdict(lambda: Histogram(SIZE_BUCKETS))
+        self.request_size = defaultdict(lambda: Histogram(SIZE_BUCKETS))
+        self.statuses = Counter()
+        self.in_flight = 0
+
+    def record(self, method, route, status, seconds, request_bytes, response_bytes):
+        key = (method, route)
+        with self._lock:
+            self.latency[key].observe(seconds)
+            self.response_size[key].observe(response_bytes)
+            self.request_size[key].observe(request_bytes)
+            self.statuses[(method, route, status)] += 1
+
+    def snapshot(self):
+        """Plain-dict view for JSON consumers"""
+        with self._lock:
+            return {
+                f"{method} {route}": {
+                    "count": histogram.count,
+                    "latency_mean_ms": round(histogram.sum / histogram.count * 1000, 3) if histogram.count else None,
+                    "response_bytes_mean": round(self.response_size[(method, route)].sum / histogram.count)
+                    if histogram.count else None,
+                    "statuses": {str(status): count for (m, r, status), count in self.statuses.items()
+                                 if (m, r) == (method, route)},
+                }
+                for (method, route), histogram in sorted(self.latency.items())
+            }
+
+    def prometheus_lines(self):
+        with self._lock:
+            lines = ["# TYPE http_request_duration_seconds histogram"]
+            for (method, route), histogram in sorted(self.latency.items()):
+                lines.extend(histogram.lines("http_request_duration_seconds", f'method="{method}",route="{route}"'))
+            lines.append("# TYPE http_response_size_bytes histogram")
+            for (method, route), histogram in sorted(self.response_size.items()):
+                lines.extend(histogram.lines("http_response_size_bytes", f'method="{method}",route="{route}"'))
+            lines.append("# TYPE http_request_size_bytes histogram")
+            for (method, route), histogram in sorted(self.request_size.items()):
+                lines.extend(histogram.lines("http_request_size_bytes", f'method="{method}",route="{route}"'))
+            lines.append("# TYPE http_requests_total counter")
+            for (method, route, status), count in sorted(self.statuses.items()):
+                lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+            lines.append(f"http_requests_in_flight {self.in_flight}")
+            return lines
+
+
+def route_template(scope):
+    """Path template of the matched route, so path and query values don't explode label cardinality"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request and counting body bytes in and out"""
+
+    def __init__(self, app, metrics, profiling=PROFILING_ENABLED):
+        self.app = app
+        self.metrics = metrics
+        self.profiling = profiling
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sizes = {"request": 0, "response": 0}
+        status = {"code": 500}
+
+        async def counting_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                sizes["request"] += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            elif message["type"] == "http.response.body":
+                sizes["response"] += len(message.get("body", b""))
+            await send(message)
+
+        profiler = None
+        if self.profiling and (b"x-profile", b"1") in scope.get("headers", []):
+            profiler = SamplingProfiler().start()
+
+        self.metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.metrics.in_flight -= 1
+            route = route_template(scope)
+            self.metrics.record(scope["method"], route, status["code"], elapsed, sizes["request"], sizes["response"])
+            if profiler is not None:
+                profiler.stop()
+                profiler.dump(f"{int(time.time())}-{scope['method']}-{route.strip('/').replace('/', '_') or 'root'}")
+
+
+def data_version_age(paths):
+    """Seconds since the newest of the data version's source files changed (None if none exist)"""
+    mtimes = [os.path.getmtime(path) for path in paths if os.path.exists(path)]
+    return time.time() - max(mtimes) if mtimes else None
+
+
+def render_metrics(metrics, cache, sources, fragments=None):
+    """Prometheus text for request metrics, the prediction and page caches and the data version"""
+    lines = metrics.prometheus_lines()
+    lines += [
+        "# TYPE prediction_cache_hits_total counter",
+        f"prediction_cache_hits_total {cache.hits}",
+        f"prediction_cache_misses_total {cache.misses}",
+        f"prediction_cache_hit_ratio {cache.hit_ratio():.6f}",
+        f'prediction_data_version_info{{version="{cache.data_version()}",model="{cache.model_version}"}} 1',
+    ]
+    if fragments is not None:
+        lines += [
+            "# TYPE fragment_cache_hits_total counter",
+            f"fragment_cache_hits_total {fragments.hits}",
+            f"fragment_cache_misses_total {fragments.misses}",
+            f"fragment_cache_hit_ratio {fragments.hit_ratio():.6f}",
+        ]
+    age = data_version_age(sources())
+    if age is not None:
+        lines.append(f"prediction_data_version_age_seconds {age:.3f}")
+    lines.append(f"process_uptime_seconds {time.time() - metrics.started:.3f}")
+    return "\n".join(lines) + "\n"
+
+
+# ============================================
+# Sampling profiler
+# ============================================
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all other threads every ``interval`` seconds and
+    aggregates them as collapsed stacks (root first, frames joined by ';').
+    """
+
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        """Flame-graph input: one "stack count" line per distinct stack"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def dump(self, name, directory=None):
+        directory = directory or PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+        return path
+
+
+def profile_window(seconds, interval=PROFILE_INTERVAL):
+    """Sample for ``seconds`` (capped at MAX_PROFILE_SECONDS) and return the profiler"""
+    profiler = SamplingProfiler(interval).start()
+    time.sleep(min(seconds, MAX_PROFILE_SECONDS))
+    return profiler.stop()
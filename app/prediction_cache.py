@@ -0,0 +1,87 @@
+"""Materialized per-round prediction cache
+
+Predictions only change when fixtures, results or the model change, so they
+are computed once per (round, model version, data version) and served from
+memory until one of those inputs moves.
+"""
+import threading
+import time
+
+from data.loader import file_fingerprint
+
+
+class PredictionCache:
+    """
+    In-memory store of computed prediction payloads.
+
+    compute(round_num) builds the payload for one round, sources() returns the
+    input file paths whose contents define the data version.
+    """
+
+    def __init__(self, compute, model_version, sources):
+        self.compute = compute
+        self.model_version = model_version
+        self.sources = sources
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def data_version(self):
+        """Current version of the prediction inputs"""
+        return file_fingerprint(self.sources())
+
+    def key(self, round_num, data_version=None):
+        """Cache key for a round at the current model and data version"""
+        if data_version is None:
+            data_version = self.data_version()
+        return (round_num, self.model_version, data_version)
+
+    def get(self, round_num):
+        """
+        Return (payload, hit, elapsed_ms) for a round, computing it on a miss.
+        Entries built against an older data or model version are dropped.
+        """
+        start = time.perf_counter()
+        key = self.key(round_num)
+
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self.hits += 1
+                return payload, True, (time.perf_counter() - start) * 1000
+
+        payload = self.compute(round_num)
+
+        with self._lock:
+            self._evict_stale(key)
+            self._entries[key] = payload
+            self.misses += 1
+        return payload, False, (time.perf_counter() - start) * 1000
+
+    def precompute(self, rounds):
+        """Materialize predictions for the given rounds ahead of any request"""
+        data_version = self.data_version()
+        for round_num in rounds:
+            key = self.key(round_num, data_version)
+            if key in self._entries:
+                continue
+            payload = self.compute(round_num)
+            with self._lock:
+                self._evict_stale(key)
+                self._entries[key] = payload
+
+    def invalidate(self):
+        """Drop every materialized round"""
+        with self._lock:
+            self._entries.clear()
+
+    def hit_ratio(self):
+        """Share of lookups served without recomputation"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _evict_stale(self, key):
+        _, model_version, data_version = key
+        for stale in [k for k in self._entries if k[1:] != (model_version, data_version)]:
+            del self._entries[stale]
@@ -1,2 +1,2 @@
 """Routes package"""
-from app.routes import predictions, fixtures
+from app.routes import predictions, fixtures, visualisations
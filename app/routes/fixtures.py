@@ -39,7 +39,7 @@ def get_all_fixtures():
         "year": 2026,
         "competition_id": "111",
         "fixtures": {},
-        "note": "Run 'python scripts/fetch_fixtures.py' to fetch from nrl.com",
+        "note": "Run 'python -m scripts.fetch_fixtures' to fetch from nrl.com",
         "generated_at": None,
         "source": "cached"
     }
@@ -70,7 +70,7 @@ def get_round_fixtures(round_num):
         "round": round_num,
         "year": 2026,
         "fixtures": [],
-        "note": f"Round {round_num} fixtures not found. Run 'python scripts/fetch_fixtures.py' to fetch from nrl.com",
+        "note": f"Round {round_num} fixtures not found. Run 'python -m scripts.fetch_fixtures' to fetch from nrl.com",
         "last_updated": datetime.now().isoformat()
     }
 
@@ -95,6 +95,22 @@ def get_fixtures():
         "year": 2026,
         "competition": "NRL Premiership",
         "fixtures": {},
-        "note": "No fixtures cached. Run 'python scripts/fetch_fixtures.py' to fetch from nrl.com",
+        "note": "No fixtures cached. Run 'python -m scripts.fetch_fixtures' to fetch from nrl.com",
         "last_updated": datetime.now().isoformat()
     }
+
+
+def upcoming_rounds(today=None):
+    """
+    Rounds that still have a fixture on or after today, in round order
+    """
+    data = load_cached_fixtures()
+    if not data or not data.get("fixtures"):
+        return []
+
+    today = today or datetime.now().strftime("%Y-%m-%d")
+    rounds = []
+    for round_str, matches in data["fixtures"].items():
+        if any(match.get("date", "") >= today for match in matches):
+            rounds.append(int(round_str))
+    return sorted(rounds)
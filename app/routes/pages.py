@@ -0,0 +1,60 @@
+"""Server-side rendered HTML pages
+
+Each page is assembled from per-round fragments that go through the
+fragment cache, so a round rendered for one page is reused by the next.
+"""
+from app.routes import fixtures, predictions, try_scorers
+
+
+def default_round():
+    """First round that still has fixtures to play, else round 1"""
+    upcoming = fixtures.upcoming_rounds()
+    return upcoming[0] if upcoming else 1
+
+
+def prediction_rounds():
+    """Rounds offered in the home page round selector"""
+    cached = fixtures.load_cached_fixtures() or {}
+    return sorted({int(r) for r in cached.get("fixtures", {})} | set(predictions.ROUND_PREDICTIONS))
+
+
+def home_context(cache, version, round_num, prediction_cache):
+    """Home page with the predictions of one round"""
+    payload, _, _ = prediction_cache.get(round_num)
+    fragment, _ = cache.render("fragments/predictions.html", round_num, lambda: {"payload": payload}, version)
+    return {
+        "round_num": round_num,
+        "rounds": prediction_rounds(),
+        "year": predictions.YEAR,
+        "predictions_html": fragment,
+    }
+
+
+def fixtures_context(cache, version):
+    """Fixtures page with every cached round"""
+    data = fixtures.get_fixtures()
+    rounds = sorted(data["fixtures"], key=int)
+    fragments = [
+        cache.render("fragments/fixtures_round.html", int(round_str),
+                     lambda round_str=round_str: {"round_num": round_str, "matches": data["fixtures"][round_str]},
+                     version)[0]
+        for round_str in rounds if data["fixtures"][round_str]
+    ]
+    return {
+        "year": data.get("year", predictions.YEAR),
+        "rounds": rounds,
+        "note": data.get("note"),
+        "fixtures_html": fragments,
+    }
+
+
+def try_scorers_context(cache, version, round_num):
+    """Try scorer page of one round"""
+    payload = try_scorers.get_try_scorers(round_num)
+    fragment, _ = cache.render("fragments/try_scorers.html", round_num, lambda: {"payload": payload}, version)
+    return {
+        "round_num": round_num,
+        "rounds": try_scorers.available_rounds(),
+        "year": try_scorers.YEAR,
+        "try_scorers_html": fragment,
+    }
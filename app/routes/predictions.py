@@ -3,113 +3,185 @@ import json
 import os
 from datetime import datetime
 
+from app.routes import fixtures
+from config.paths import DATA_DIR, MATCHUP_INDEX_PATH, RATINGS_PATH, odds_path
+from data.entities import team_id
 
-def get_predictions():
+# numpy/pandas models are imported on first use, keeping them out of app start-up
+
+YEAR = 2026
+# Minimum expected return per unit staked before a price is flagged as value
+VALUE_EDGE = 0.05
+
+# Bump whenever the prediction logic changes so materialized rounds are rebuilt
+MODEL_NAME = "NRL Match Predictor v2.0"
+MODEL_VERSION = "2.0"
+
+ROUND_PREDICTIONS = {
+    1: [
+        {
+            "match": "Melbourne Storm vs Sydney Roosters",
+            "date": "2026-03-05",
+            "predicted_winner": "Melbourne Storm",
+            "predicted_margin": 6,
+            "confidence": 0.68
+        },
+        {
+            "match": "Penrith Panthers vs Brisbane Broncos",
+            "date": "2026-03-06",
+            "predicted_winner": "Penrith Panthers",
+            "predicted_margin": 8,
+            "confidence": 0.72
+        },
+        {
+            "match": "North Queensland Cowboys vs South Sydney Rabbitohs",
+            "date": "2026-03-06",
+            "predicted_winner": "North Queensland Cowboys",
+            "predicted_margin": 4,
+            "confidence": 0.58
+        },
+        {
+            "match": "Parramatta Eels vs Canterbury-Bankstown Bulldogs",
+            "date": "2026-03-07",
+            "predicted_winner": "Parramatta Eels",
+            "predicted_margin": 2,
+            "confidence": 0.52
+        },
+        {
+            "match": "Newcastle Knights vs St George Illawarra Dragons",
+            "date": "2026-03-07",
+            "predicted_winner": "Newcastle Knights",
+            "predicted_margin": 6,
+            "confidence": 0.62
+        },
+        {
+            "match": "Wests Tigers vs Manly-Warringah Sea Eagles",
+            "date": "2026-03-07",
+            "predicted_winner": "Manly-Warringah Sea Eagles",
+            "predicted_margin": 8,
+            "confidence": 0.65
+        },
+        {
+            "match": "Cronulla-Sutherland Sharks vs Dolphins",
+            "date": "2026-03-08",
+            "predicted_winner": "Cronulla-Sutherland Sharks",
+            "predicted_margin": 4,
+            "confidence": 0.58
+        },
+        {
+            "match": "Gold Coast Titans vs Canberra Raiders",
+            "date": "2026-03-08",
+            "predicted_winner": "Canberra Raiders",
+            "predicted_margin": 6,
+            "confidence": 0.60
+        }
+    ],
+}
+
+
+def get_predictions(round_num=1):
     """
-    Get match predictions for Round 1, 2026
+    Get match predictions for a round of 2026
     Returns predicted margins and winners
     """
-    return {
-        "round": 1,
-        "year": 2026,
-        "predictions": [
-            {
-                "match": "Melbourne Storm vs Sydney Roosters",
-                "date": "2026-03-05",
-                "predicted_winner": "Melbourne Storm",
-                "predicted_margin": 6,
-                "confidence": 0.68,
-                "home_odds": 1.55,
-                "away_odds": 2.45
-            },
-            {
-                "match": "Penrith Panthers vs Brisbane Broncos",
-                "date": "2026-03-06",
-                "predicted_winner": "Penrith Panthers",
-                "predicted_margin": 8,
-                "confidence": 0.72,
-                "home_odds": 1.48,
-                "away_odds": 2.60
-            },
-            {
-                "match": "North Queensland Cowboys vs South Sydney Rabbitohs",
-                "date": "2026-03-06",
-                "predicted_winner": "North Queensland Cowboys",
-                "predicted_margin": 4,
-                "confidence": 0.58,
-                "home_odds": 1.75,
-                "away_odds": 2.05
-            },
-            {
-                "match": "Parramatta Eels vs Canterbury-Bankstown Bulldogs",
-                "date": "2026-03-07",
-                "predicted_winner": "Parramatta Eels",
-                "predicted_margin": 2,
-                "confidence": 0.52,
-                "home_odds": 1.85,
-                "away_odds": 1.95
-            },
-            {
-                "match": "Newcastle Knights vs St George Illawarra Dragons",
-                "date": "2026-03-07",
-                "predicted_winner": "Newcastle Knights",
-                "predicted_margin": 6,
-                "confidence": 0.62,
-                "home_odds": 1.65,
-                "away_odds": 2.20
-            },
-            {
-                "match": "Wests Tigers vs Manly-Warringah Sea Eagles",
-                "date": "2026-03-07",
-                "predicted_winner": "Manly-Warringah Sea Eagles",
-                "predicted_margin": 8,
-                "confidence": 0.65,
-                "home_odds": 2.20,
-                "away_odds": 1.65
-            },
-            {
-                "match": "Cronulla-Sutherland Sharks vs Dolphins",
-                "date": "2026-03-08",
-                "predicted_winner": "Cronulla-Sutherland Sharks",
-                "predicted_margin": 4,
-                "confidence": 0.58,
-                "home_odds": 1.70,
-                "away_odds": 2.10
-            },
-            {
-                "match": "Gold Coast Titans vs Canberra Raiders",
-                "date": "2026-03-08",
-                "predicted_winner": "Canberra Raiders",
-                "predicted_margin": 6,
-                "confidence": 0.60,
-                "home_odds": 2.05,
-                "away_odds": 1.75
-            }
-        ],
+    from data.matchup_index import MatchupIndex
+    from predictions.ratings import RatingEngine
+
+    ratings = RatingEngine.load(RATINGS_PATH) if os.path.exists(RATINGS_PATH) else None
+    matchups = MatchupIndex.load(MATCHUP_INDEX_PATH) if os.path.exists(MATCHUP_INDEX_PATH) else None
+    venues = fixture_venues(round_num) if matchups is not None else {}
+    predictions = [with_matchup(with_ratings(with_team_ids(p), ratings), matchups, venues)
+                   for p in ROUND_PREDICTIONS.get(round_num, [])]
+    payload = {
+        "round": round_num,
+        "year": YEAR,
+        "predictions": with_odds(predictions, round_num),
         "model_info": {
-            "name": "NRL Match Predictor v2.0",
+            "name": MODEL_NAME,
+            "version": MODEL_VERSION,
             "features": ["Team form", "Head to head", "Home advantage", "Recent scoring"]
         },
         "generated_at": datetime.now().isoformat()
     }
+    if not payload["predictions"]:
+        payload["note"] = f"No predictions available for round {round_num}"
+    return payload
+
 
+def with_team_ids(prediction):
+    """Attach canonical integer team IDs so clients can join on keys, not names"""
+    home_team, away_team = prediction["match"].split(" vs ")
+    return {
+        **prediction,
+        "home_team_id": team_id(home_team),
+        "away_team_id": team_id(away_team),
+        "predicted_winner_id": team_id(prediction["predicted_winner"])
+    }
 
-def predict_match(home_team, away_team, home_odds, away_odds):
+
+def with_ratings(prediction, ratings):
+    """Attach the current team rating features when a ratings snapshot exists"""
+    if ratings is None or prediction["home_team_id"] is None or prediction["away_team_id"] is None:
+        return prediction
+    return {**prediction, **ratings.match_features(prediction["home_team_id"], prediction["away_team_id"])}
+
+
+def fixture_venues(round_num):
+    """(home_team_id, away_team_id) -> venue for a round's cached fixtures"""
+    return {
+        (match.get("home_team_id"), match.get("away_team_id")): match.get("venue")
+        for match in fixtures.get_round_fixtures(round_num)["fixtures"]
+    }
+
+
+def with_matchup(prediction, matchups, venues):
+    """Attach head-to-head and venue records from the precomputed index"""
+    home_id, away_id = prediction["home_team_id"], prediction["away_team_id"]
+    if matchups is None or home_id is None or away_id is None:
+        return prediction
+    venue = venues.get((home_id, away_id))
+    return {**prediction, "venue": venue, "matchup": matchups.query(home_id, away_id, venue)}
+
+
+def with_odds(predictions, round_num):
     """
-    Predict a single match outcome
-    Returns predicted winner and margin
+    Attach the latest head-to-head prices, margin-free implied probabilities
+    and value flags from the odds store, for the whole round at once
     """
-    # Simple prediction logic based on odds
-    implied_home_win_prob = 1 / home_odds
-    implied_away_win_prob = 1 / away_odds
-    
-    if implied_home_win_prob > implied_away_win_prob:
-        return {
-            "predicted_winner": home_team,
-            "confidence": min(implied_home_win_prob, 0.85)
-        }
-    else:
-        return {
-            "predicted_winner": away_team,
-            "confidence": min(implied_away_win_prob, 0.85)
-        }
+    known = [p for p in predictions if p["home_team_id"] is not None and p["away_team_id"] is not None]
+    if not known or not os.path.exists(odds_path("NRL", YEAR, DATA_DIR)):
+        return predictions
+
+    import pandas as pd
+    from data.odds import OddsStore, value_bets
+
+    odds = OddsStore.load("NRL", YEAR, DATA_DIR).h2h(rounds=[(YEAR, round_num)])
+    if odds.empty:
+        return predictions
+
+    model = pd.DataFrame({
+        "year": YEAR,
+        "round": round_num,
+        "home_id": [p["home_team_id"] for p in known],
+        "away_id": [p["away_team_id"] for p in known],
+        "home_prob": [p["confidence"] if p["predicted_winner_id"] == p["home_team_id"] else 1 - p["confidence"]
+                      for p in known],
+    })
+    columns = ["home_odds", "away_odds", "home_implied", "away_implied", "margin", "home_edge", "away_edge",
+               "value_side", "is_value"]
+    rows = value_bets(odds, model, VALUE_EDGE).set_index(["home_id", "away_id"])[columns]
+    rows = rows.rename(columns={"margin": "book_margin"}).round(4).astype(object)
+
+    result = []
+    for prediction in predictions:
+        key = (prediction["home_team_id"], prediction["away_team_id"])
+        if key in rows.index:
+            prediction = {**prediction, **rows.loc[key].to_dict()}
+            prediction["is_value"] = bool(prediction["is_value"])
+        result.append(prediction)
+    return result
+
+
+def prediction_sources():
+    """Input files whose changes invalidate materialized predictions"""
+    return [fixtures.CACHED_FIXTURES_PATH, RATINGS_PATH, MATCHUP_INDEX_PATH, odds_path("NRL", YEAR, DATA_DIR)]
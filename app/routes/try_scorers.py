@@ -0,0 +1,41 @@
+"""Try scorer prediction routes"""
+from datetime import datetime
+
+YEAR = 2026
+
+# Anytime try scorer probabilities, highest first
+ROUND_TRY_SCORERS = {
+    1: [
+        {"player": "Dylan Edwards", "team": "Penrith Panthers", "opponent": "Brisbane Broncos", "probability": 0.52},
+        {"player": "Valentine Holmes", "team": "North Queensland Cowboys", "opponent": "South Sydney Rabbitohs",
+         "probability": 0.48},
+        {"player": "James Tedesco", "team": "Sydney Roosters", "opponent": "Melbourne Storm", "probability": 0.45},
+        {"player": "Latrell Mitchell", "team": "South Sydney Rabbitohs", "opponent": "North Queensland Cowboys",
+         "probability": 0.43},
+        {"player": "Hamiso Tabuai-Fidow", "team": "Brisbane Broncos", "opponent": "Penrith Panthers",
+         "probability": 0.42},
+        {"player": "Josh Addo-Carr", "team": "Melbourne Storm", "opponent": "Sydney Roosters", "probability": 0.40},
+        {"player": "Alex Twal", "team": "Wests Tigers", "opponent": "Manly Sea Eagles", "probability": 0.38},
+        {"player": "Dale Finucane", "team": "Cronulla Sharks", "opponent": "Dolphins", "probability": 0.36},
+    ],
+}
+
+
+def available_rounds():
+    """Rounds with try scorer predictions, in order"""
+    return sorted(ROUND_TRY_SCORERS)
+
+
+def get_try_scorers(round_num=1):
+    """
+    Get anytime try scorer probabilities for a round of 2026
+    """
+    payload = {
+        "round": round_num,
+        "year": YEAR,
+        "try_scorers": ROUND_TRY_SCORERS.get(round_num, []),
+        "generated_at": datetime.now().isoformat()
+    }
+    if not payload["try_scorers"]:
+        payload["note"] = f"No try scorer predictions available for round {round_num}"
+    return payload
@@ -0,0 +1,54 @@
+"""Visualisation data API routes
+
+Chart-ready aggregates (attack versus defense, form trends, half splits) for
+any season and round. Seasons are precomputed by data.charts and saved next
+to the data; here they are held in memory per data version, so a request is
+a dictionary lookup until new results land.
+"""
+import os
+import threading
+
+from data.charts import chart_data, charts_version, season_charts
+from data.entities import TEAM_LISTS
+from data.loader import season_path
+
+# Chart seasons and sliced payloads, per (selection, year) and data version
+_seasons = {}
+_payloads = {}
+_lock = threading.Lock()
+
+
+def get_visualisations(year, round_num=None, selection="NRL"):
+    """
+    Return (payload, hit) with the chart data of a season through a round
+    (the latest played round when round_num is None)
+    """
+    if selection not in TEAM_LISTS:
+        return {"selection": selection, "year": year, "note": f"Unknown competition: {selection}"}, False
+    if not os.path.exists(season_path(selection, year)):
+        return {"selection": selection, "year": year, "round": round_num,
+                "note": f"No match data for {selection} {year}"}, False
+
+    version = charts_version(selection, year)
+    key = (selection, year, round_num, version)
+    with _lock:
+        payload = _payloads.get(key)
+        if payload is not None:
+            return payload, True
+
+        season = _seasons.get((selection, year))
+        if season is None or season["version"] != version:
+            season = season_charts(selection, year)
+            _seasons[(selection, year)] = season
+        payload = chart_data(season, round_num)
+        for stale in [k for k in _payloads if k[:2] == (selection, year) and k[3] != version]:
+            del _payloads[stale]
+        _payloads[key] = payload
+    return payload, False
+
+
+def precompute(years, selection="NRL"):
+    """Warm the chart data of seasons that have match data"""
+    for year in years:
+        if os.path.exists(season_path(selection, year)):
+            get_visualisations(year, None, selection)
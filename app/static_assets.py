@@ -0,0 +1,132 @@
+"""Fingerprinted, precompressed static assets
+
+At start-up every file under app/static is read once, given a content-hashed
+name (styles.css -> styles.3f9a1c2b7d.css) and compressed with gzip and,
+when the brotli package is installed, brotli. Templates link through
+static_url(), so a changed file gets a new URL and the old one can be cached
+forever: hashed URLs are served with Cache-Control immutable, the encoding
+picked from Accept-Encoding. Original names still resolve, revalidated by
+ETag, for links from outside the templates.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+
+from starlette.responses import PlainTextResponse, Response
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+HASH_LENGTH = 10
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Below this size compression costs more than it saves
+MIN_COMPRESS_BYTES = 256
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+
+def fingerprinted_name(name, digest):
+    """styles.css -> styles.<digest>.css"""
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{digest}{ext}"
+
+
+class Asset:
+    """One static file with its hashed name and compressed variants"""
+
+    def __init__(self, name, body):
+        self.name = name
+        self.digest = hashlib.sha256(body).hexdigest()[:HASH_LENGTH]
+        self.hashed_name = fingerprinted_name(name, self.digest)
+        self.media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        self.etag = f'"{self.digest}"'
+        self.variants = {"identity": body}
+        if len(body) >= MIN_COMPRESS_BYTES and self.media_type.startswith(COMPRESSIBLE_TYPES):
+            compressed = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                compressed["br"] = brotli.compress(body, quality=11)
+            # Keep only variants that are actually smaller
+            self.variants.update({k: v for k, v in compressed.items() if len(v) < len(body)})
+
+    def encoding_for(self, accept_encoding):
+        """Best stored encoding the client accepts: br, then gzip, then identity"""
+        accepted = {part.split(";")[0].strip().lower() for part in accept_encoding.split(",")}
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+
+class StaticAssets:
+    """
+    ASGI app serving the fingerprinted assets of a directory (mount it at
+    /static). The manifest is built once, when the app is created.
+    """
+
+    def __init__(self, directory, prefix="/static"):
+        self.directory = directory
+        self.prefix = prefix.rstrip("/")
+        self.assets = {}
+        self.by_path = {}
+        self.build()
+
+    def build(self):
+        """Read, hash and compress every file under the directory"""
+        assets = {}
+        for root, _, files in os.walk(self.directory):
+            for filename in sorted(files):
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, self.directory).replace(os.sep, "/")
+                with open(path, "rb") as f:
+                    assets[name] = Asset(name, f.read())
+        self.assets = assets
+        # Hashed names are immutable; original names must be revalidated
+        self.by_path = {asset.hashed_name: (asset, IMMUTABLE) for asset in assets.values()}
+        self.by_path.update({asset.name: (asset, REVALIDATE) for asset in assets.values()})
+
+    def url(self, name):
+        """Fingerprinted URL of an asset (the plain URL for unknown names)"""
+        asset = self.assets.get(name.lstrip("/"))
+        return f"{self.prefix}/{asset.hashed_name if asset else name.lstrip('/')}"
+
+    def manifest(self):
+        """Original name -> fingerprinted name, with the stored encodings and sizes"""
+        return {
+            name: {"path": asset.hashed_name, "sizes": {k: len(v) for k, v in asset.variants.items()}}
+            for name, asset in self.assets.items()
+        }
+
+    def response(self, path, headers):
+        entry = self.by_path.get(path.lstrip("/"))
+        if entry is None:
+            return PlainTextResponse("Not Found", status_code=404)
+        asset, cache_control = entry
+        common = {"Cache-Control": cache_control, "ETag": asset.etag, "Vary": "Accept-Encoding"}
+        if asset.etag in [tag.strip() for tag in headers.get("if-none-match", "").split(",")]:
+            return Response(status_code=304, headers=common)
+        encoding = asset.encoding_for(headers.get("accept-encoding", ""))
+        if encoding != "identity":
+            common["Content-Encoding"] = encoding
+        return Response(asset.variants[encoding], media_type=asset.media_type, headers=common)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            response = PlainTextResponse("Method Not Allowed", status_code=405)
+        else:
+            # Under a Mount, root_path ends with the mount prefix and path still includes it
+            path, root_path = scope["path"], scope.get("root_path", "")
+            if root_path and path.startswith(root_path):
+                path = path[len(root_path):]
+            headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+            response = self.response(path, headers)
+        await response(scope, receive, send)
+
+
+if __name__ == "__main__":
+    import json
+
+    print(json.dumps(StaticAssets(os.path.join(os.path.dirname(__file__), "static")).manifest(), indent=2))
@@ -0,0 +1,165 @@
+"""
+import_time.py
+
+Start-up cost of the app and the scraping entry points.
+
+Each entry point is imported in a fresh interpreter under
+``python -X importtime``. The report lists the total import time, the
+slowest modules by cumulative time and any heavy dependencies (pandas,
+numpy, selenium, ...) that were pulled in. Two budgets are checked:
+
+    - IMPORT_BUDGETS: milliseconds allowed for the whole import (best of
+      ``--repeat`` runs, so a cold disk cache does not fail the check)
+    - FORBIDDEN_MODULES: heavy packages an entry point must only import
+      lazily, on first use
+
+Usage (from the repository root):
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --only app.main --top 25
+    python -m benchmarks.import_time --check
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+ROOT_DIR: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES: List[str] = ["pandas", "numpy", "selenium", "chromedriver_autoinstaller", "tensorflow", "sklearn",
+                            "scipy", "pyarrow", "matplotlib"]
+
+# Milliseconds allowed for `import <entry point>`
+IMPORT_BUDGETS: Dict[str, float] = {
+    "app.main": 900.0,
+    "scraping.pipeline": 400.0,
+    "scraping.run": 400.0,
+    "scraping.match_data_select": 400.0,
+    "scraping.match_data_detailed_select": 500.0,
+    "scraping.player_data_select": 500.0,
+    "scripts.fetch_fixtures": 400.0,
+}
+
+# Heavy packages each entry point must not import at start-up
+FORBIDDEN_MODULES: Dict[str, List[str]] = {
+    "app.main": ["pandas", "numpy", "selenium"],
+    "scraping.pipeline": ["pandas", "numpy", "selenium", "chromedriver_autoinstaller"],
+    "scraping.run": ["pandas", "numpy", "selenium", "chromedriver_autoinstaller"],
+    "scraping.match_data_select": ["pandas", "numpy", "selenium"],
+    "scraping.match_data_detailed_select": ["pandas", "numpy", "selenium"],
+    "scraping.player_data_select": ["pandas", "numpy", "selenium"],
+    "scripts.fetch_fixtures": ["pandas", "numpy", "selenium"],
+}
+
+DEFAULT_REPEAT: int = 3
+DEFAULT_TOP: int = 10
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( +)(\S+)\s*$")
+
+
+@dataclass
+class ImportProfile:
+    """Parsed ``-X importtime`` output of one entry point"""
+
+    module: str
+    total_ms: float = 0.0
+    # (module, self ms, cumulative ms, nesting depth)
+    modules: List[Tuple[str, float, float, int]] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def loaded(self) -> List[str]:
+        return [name for name, *_ in self.modules]
+
+    def heavy(self) -> List[str]:
+        """Heavy top-level packages that were imported"""
+        roots = {name.split(".")[0] for name in self.loaded}
+        return [name for name in HEAVY_MODULES if name in roots]
+
+    def top(self, n: int = DEFAULT_TOP) -> List[Tuple[str, float, float, int]]:
+        """Slowest modules by cumulative time, excluding the entry point itself"""
+        rows = [row for row in self.modules if row[0] != self.module]
+        return sorted(rows, key=lambda row: row[2], reverse=True)[:n]
+
+
+def parse_importtime(module: str, stderr: str) -> ImportProfile:
+    """Build a profile from the interpreter's ``-X importtime`` lines"""
+    profile = ImportProfile(module)
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        profile.modules.append((name, int(self_us) / 1000, int(cumulative_us) / 1000, depth))
+        if depth == 0:
+            profile.total_ms += int(cumulative_us) / 1000
+    return profile
+
+
+def measure(module: str) -> ImportProfile:
+    """Import one module in a fresh interpreter"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT_DIR,
+                            capture_output=True, text=True, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"})
+    profile = parse_importtime(module, result.stderr)
+    if result.returncode != 0:
+        profile.error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed"
+    return profile
+
+
+def best_of(module: str, repeat: int = DEFAULT_REPEAT) -> ImportProfile:
+    """Fastest of ``repeat`` fresh imports"""
+    profiles = [measure(module) for _ in range(max(1, repeat))]
+    return min(profiles, key=lambda profile: (profile.error is not None, profile.total_ms))
+
+
+def violations(profile: ImportProfile) -> List[str]:
+    """Budget and forbidden-import problems of one entry point"""
+    if profile.error:
+        return [f"import failed: {profile.error}"]
+    problems = []
+    budget = IMPORT_BUDGETS.get(profile.module)
+    if budget is not None and profile.total_ms > budget:
+        problems.append(f"{profile.total_ms:.0f} ms over the {budget:.0f} ms budget")
+    forbidden = set(FORBIDDEN_MODULES.get(profile.module, []))
+    problems.extend(f"imports {name} at start-up" for name in profile.heavy() if name in forbidden)
+    return problems
+
+
+def report(profile: ImportProfile, top: int = DEFAULT_TOP) -> str:
+    budget = IMPORT_BUDGETS.get(profile.module)
+    lines = [f"{profile.module}: {profile.total_ms:.1f} ms"
+             + (f" (budget {budget:.0f} ms)" if budget is not None else "")]
+    if profile.error:
+        lines.append(f"  error: {profile.error}")
+        return "\n".join(lines)
+    lines.append(f"  heavy modules: {', '.join(profile.heavy()) or 'none'}")
+    for name, self_ms, cumulative_ms, depth in profile.top(top):
+        lines.append(f"  {cumulative_ms:>9.1f} ms cumulative {self_ms:>8.1f} ms self  {'  ' * depth}{name}")
+    lines.extend(f"  VIOLATION: {problem}" for problem in violations(profile))
+    return "\n".join(lines)
+
+
+def run(modules: Sequence[str], repeat: int = DEFAULT_REPEAT, top: int = DEFAULT_TOP) -> List[ImportProfile]:
+    profiles = []
+    for module in modules:
+        profile = best_of(module, repeat)
+        print(report(profile, top), flush=True)
+        profiles.append(profile)
+    return profiles
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report the import time of the app and scraping entry points")
+    parser.add_argument("--only", default=None, help=f"comma separated modules (default: {', '.join(IMPORT_BUDGETS)})")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="fresh imports per module, best kept")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="slowest modules listed per entry point")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 when a budget is exceeded")
+    args = parser.parse_args()
+
+    profiles = run(args.only.split(",") if args.only else list(IMPORT_BUDGETS), args.repeat, args.top)
+    if args.check and any(violations(profile) for profile in profiles):
+        sys.exit(1)
@@ -0,0 +1,201 @@
+"""
+mock_server.py
+
+Local stand-in for the nrl.com, qrl.com.au and nswrl.com.au draw and match
+centre pages, so the scrapers and the pipeline can be load tested offline.
+
+    GET /draw/?competition=111&round=5&season=2024       draw page (vue-draw q-data)
+    GET /draw/{competition}/{year}/round-{n}/{home}-v-{away}/   match centre page
+    GET /__stats                                          request counts (JSON)
+
+Pages come from ``--recorded`` when a saved copy exists
+(``draw_{season}_round_{round}.html``,
+``match_centre_{year}_round_{round}_{home}-v-{away}.html`` or
+``match_centre_{year}_round_{round}.html``) and are generated by
+``benchmarks.synthetic`` otherwise. Every response waits ``--latency``
+seconds plus up to ``--jitter``; ``--error-rate`` of requests get a 503 and
+``--throttle-rate`` a 429 with Retry-After.
+
+Point the scrapers at it through the base URL variables read by
+config.environment:
+
+    python -m benchmarks.mock_server --port 8765 --latency 0.2 --error-rate 0.02
+    export NRL_BASE_URL=http://127.0.0.1:8765 QRL_BASE_URL=http://127.0.0.1:8765 NSWRL_BASE_URL=http://127.0.0.1:8765
+    python -m scraping.pipeline --selections NRL,HOSTPLUS --years 2024 --rounds 5
+
+Requires:
+    - numpy
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from config import environment as EV
+from benchmarks.synthetic import draw_page, match_centre_page
+from data.entities import slugify
+
+MATCH_CENTRE_PATH = re.compile(r"^(/draw/[^/]+/)(\d{4})/round-(\d+)/([^/]+)-v-([^/]+)/?$")
+
+# Competition id -> (teams, draw path on its site)
+COMPETITION_TEAMS: Dict[str, Tuple[list, str]] = {
+    EV.COMPETITION[selection]: (teams, urlparse(website).path)
+    for selection, (teams, website) in EV.SELECTION_MAPPING.items()
+}
+
+# Team slug -> team name across every competition
+TEAM_SLUGS: Dict[str, str] = {
+    slugify(team): team for teams, _ in EV.SELECTION_MAPPING.values() for team in teams
+}
+
+
+class MockConfig:
+    """Latency and failure settings shared by all handler threads"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, recorded: Optional[str] = None, seed: Optional[int] = None) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.recorded = recorded
+        self.random = random.Random(seed)
+        self.stats: Counter = Counter()
+        self.lock = threading.Lock()
+
+    def outcome(self) -> Tuple[float, Optional[int]]:
+        """(delay in seconds, forced error status or None) for one request"""
+        with self.lock:
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            roll = self.random.random()
+        if roll < self.error_rate:
+            return delay, 503
+        if roll < self.error_rate + self.throttle_rate:
+            return delay, 429
+        return delay, None
+
+    def count(self, name: str) -> None:
+        with self.lock:
+            self.stats[name] += 1
+
+    def recorded_page(self, *names: str) -> Optional[str]:
+        for name in names if self.recorded else ():
+            path = os.path.join(self.recorded, name)
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    return f.read()
+        return None
+
+
+@lru_cache(maxsize=512)
+def _draw(competition: str, year: int, round_num: int) -> str:
+    teams, draw_path = COMPETITION_TEAMS.get(competition, COMPETITION_TEAMS[EV.COMPETITION["NRL"]])
+    return draw_page(year, round_num, competition, teams, draw_path)
+
+
+@lru_cache(maxsize=2048)
+def _match_centre(year: int, round_num: int, home: str, away: str) -> str:
+    return match_centre_page(year, round_num, home, away)
+
+
+def make_handler(config: MockConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/__stats":
+                with config.lock:
+                    return self._send(200, json.dumps(dict(config.stats)), "application/json")
+
+            delay, error = config.outcome()
+            time.sleep(delay)
+            if error is not None:
+                config.count(f"status_{error}")
+                return self._send(error, "", headers={"Retry-After": "1"} if error == 429 else None)
+
+            page = self._page(url)
+            if page is None:
+                config.count("status_404")
+                return self._send(404, "Not found")
+            config.count("status_200")
+            self._send(200, page)
+
+        def _page(self, url) -> Optional[str]:
+            if url.path.rstrip("/") == "/draw":
+                query = parse_qs(url.query)
+                try:
+                    competition = query.get("competition", ["111"])[0]
+                    round_num, year = int(query["round"][0]), int(query["season"][0])
+                except (KeyError, ValueError):
+                    return None
+                config.count("draw")
+                return config.recorded_page(f"draw_{year}_round_{round_num}.html") or _draw(competition, year, round_num)
+
+            match = MATCH_CENTRE_PATH.match(url.path)
+            if match is None:
+                return None
+            _, year, round_num, home, away = match.groups()
+            config.count("match_centre")
+            return (config.recorded_page(f"match_centre_{year}_round_{round_num}_{home}-v-{away}.html",
+                                         f"match_centre_{year}_round_{round_num}.html")
+                    or _match_centre(int(year), int(round_num), TEAM_SLUGS.get(home, home), TEAM_SLUGS.get(away, away)))
+
+        def _send(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, config: Optional[MockConfig] = None,
+          background: bool = False) -> ThreadingHTTPServer:
+    """
+    Start the mock server. With ``background=True`` it runs on a daemon
+    thread and the server is returned (call ``shutdown()`` to stop it);
+    port 0 picks a free port (``server.server_port``).
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(config or MockConfig()))
+    server.daemon_threads = True
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    else:
+        server.serve_forever()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve stand-in draw and match centre pages")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--recorded", default=None, help="directory of saved pages served instead of synthetic ones")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    base = f"http://{args.host}:{args.port}"
+    print(f"Serving mock draw and match centre pages on {base}")
+    print(f"export NRL_BASE_URL={base} QRL_BASE_URL={base} NSWRL_BASE_URL={base}")
+    serve(args.host, args.port, MockConfig(args.latency, args.jitter, args.error_rate, args.throttle_rate,
+                                           args.recorded, args.seed))
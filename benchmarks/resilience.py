@@ -0,0 +1,128 @@
+"""
+resilience.py
+
+Behaviour checks for the shared HTTP client's circuit breaker.
+
+Each scenario drives ``HttpClient`` offline (a mock transport or a plain
+function for ``call``) with a one-failure threshold and a short reset, and
+checks the breaker ends in the expected state:
+
+    - trial_content_error: the half-open trial call reaches the host but
+      the page cannot be parsed; the circuit must close, not stay held
+    - trial_throttled: the half-open trial request gets a 429; likewise
+    - trial_timeout: the half-open trial times out; the circuit reopens
+    - content_errors_closed: parse errors never open a closed circuit
+
+Usage (from the repository root):
+    python -m benchmarks.resilience
+    python -m benchmarks.resilience --check
+
+Requires:
+    - httpx
+"""
+
+import argparse
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+
+from scraping.utilities.http_client import CircuitOpenError, HttpClient
+
+HOST: str = "bench.invalid"
+RESET: float = 0.05
+
+
+def _client(statuses: List[int] = ()) -> HttpClient:
+    """Client whose mock host answers with ``statuses`` in turn (200 once they run out)"""
+    pending = list(statuses)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(pending.pop(0) if pending else 200, headers={"Retry-After": "0"})
+
+    return HttpClient(max_retries=0, breaker_threshold=1, breaker_reset=RESET,
+                      transport=httpx.MockTransport(handler))
+
+
+def _timeout() -> None:
+    raise TimeoutError("page load timed out")
+
+
+def _unparsable() -> None:
+    raise ValueError("page loaded without the expected elements")
+
+
+def _attempt(fn: Callable[[], object]) -> str:
+    """Name of the exception ``fn`` raised, or 'ok'"""
+    try:
+        fn()
+    except Exception as ex:
+        return type(ex).__name__
+    return "ok"
+
+
+def _tripped(client: HttpClient) -> None:
+    """Open the host's circuit with a timeout and wait until it is half-open"""
+    _attempt(lambda: client.call(HOST, _timeout, retry_on=(TimeoutError,)))
+    time.sleep(RESET * 1.5)
+
+
+def trial_content_error() -> Tuple[bool, str]:
+    client = _client()
+    _tripped(client)
+    trial = _attempt(lambda: client.call(HOST, _unparsable, retry_on=(TimeoutError,)))
+    after = _attempt(lambda: client.call(HOST, lambda: None, retry_on=(TimeoutError,)))
+    return trial == "ValueError" and after == "ok", f"trial {trial}, next call {after}"
+
+
+def trial_throttled() -> Tuple[bool, str]:
+    client = _client([429])
+    _tripped(client)
+    trial = client.get(f"http://{HOST}/").status_code
+    after = _attempt(lambda: client.get(f"http://{HOST}/"))
+    return trial == 429 and after == "ok", f"trial {trial}, next request {after}"
+
+
+def trial_timeout() -> Tuple[bool, str]:
+    client = _client()
+    _tripped(client)
+    trial = _attempt(lambda: client.call(HOST, _timeout, retry_on=(TimeoutError,)))
+    after = _attempt(lambda: client.call(HOST, lambda: None, retry_on=(TimeoutError,)))
+    return (trial == "TimeoutError" and after == CircuitOpenError.__name__,
+            f"trial {trial}, next call {after}")
+
+
+def content_errors_closed() -> Tuple[bool, str]:
+    client = _client()
+    for _ in range(3):
+        _attempt(lambda: client.call(HOST, _unparsable, retry_on=(TimeoutError,)))
+    state = client.breaker(HOST).state
+    return state == "closed", f"breaker {state}"
+
+
+CHECKS: Dict[str, Callable[[], Tuple[bool, str]]] = {
+    "trial_content_error": trial_content_error,
+    "trial_throttled": trial_throttled,
+    "trial_timeout": trial_timeout,
+    "content_errors_closed": content_errors_closed,
+}
+
+
+def run() -> List[Tuple[str, bool, str]]:
+    results = []
+    for name, check in CHECKS.items():
+        passed, detail = check()
+        results.append((name, passed, detail))
+        print(f"  {name:<24} {'ok' if passed else 'FAILED'}  ({detail})")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the HTTP client's circuit breaker recovers as intended")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 when a scenario fails")
+    args = parser.parse_args()
+
+    outcomes = run()
+    if args.check and not all(passed for _, passed, _ in outcomes):
+        sys.exit(1)
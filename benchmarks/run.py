@@ -0,0 +1,457 @@
+"""
+run.py
+
+Benchmark harness for the hot paths of the scrapers, loaders, feature
+builder and API.
+
+    - extract_*:  page extraction from the saved HTML in benchmarks/pages
+                  (WebDriver and HTTP replaced by in-memory stand-ins)
+    - load_*:     season loading from synthetic multi-season JSON
+    - features_*: feature-matrix construction
+    - api_*:      /api/fixtures and /api/predictions through an in-process
+                  ASGI client, with the app pointed at a fixtures cache,
+                  ratings, matchup index and odds built from the synthetic
+                  seasons
+
+Each benchmark is calibrated so one sample lasts at least MIN_SAMPLE_SECONDS
+and reports the median, minimum and p95 seconds per call. Results are saved
+as benchmarks/results/{commit}.json and compared against a baseline (by
+default the newest result of an ancestor commit); a median more than
+``--threshold`` slower than the baseline is a regression, and ``--check``
+exits non-zero so CI can block the deploy.
+
+Usage (from the repository root):
+    python -m benchmarks.run
+    python -m benchmarks.run --only extract,api --repeat 9
+    python -m benchmarks.run --baseline main --threshold 0.15 --check
+
+Requires:
+    - httpx
+    - numpy
+    - pandas
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from benchmarks.synthetic import PAGES_DIR, fixture_cache, odds_snapshots, round_fixtures, write_seasons
+
+ROOT_DIR: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+SEASONS: List[int] = list(range(2008, 2025))
+PLAYER_SEASONS: List[int] = [2023, 2024]
+
+DEFAULT_REPEAT: int = 7
+MIN_SAMPLE_SECONDS: float = 0.05
+# Relative slowdown of the median that counts as a regression
+DEFAULT_THRESHOLD: float = 0.2
+# Differences below this many seconds per call are treated as noise
+MIN_DELTA: float = 0.0005
+
+
+@dataclass
+class Timing:
+    median: float
+    min: float
+    p95: float
+    repeat: int
+    number: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"median": self.median, "min": self.min, "p95": self.p95, "repeat": self.repeat, "number": self.number}
+
+
+def measure(fn: Callable[[], Any], repeat: int = DEFAULT_REPEAT) -> Timing:
+    """Seconds per call of ``fn`` over ``repeat`` samples of ``number`` calls each (after one warm-up call)"""
+    fn()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SAMPLE_SECONDS or number >= 10000:
+            break
+        number *= 2 if elapsed * 10 > MIN_SAMPLE_SECONDS else 10
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return Timing(statistics.median(samples), min(samples), float(np.percentile(samples, 95)), repeat, number)
+
+
+# ============================================
+# Benchmarks
+# ============================================
+
+class PageDriver:
+    """
+    Stands in for a WebDriver: ``get`` is a no-op, ``page_source`` is the
+    saved page and ``find_elements`` answers CSS selectors from it
+    """
+
+    def __init__(self, page_source: str) -> None:
+        from bs4 import BeautifulSoup
+
+        self.page_source = page_source
+        # Parsed once, like the DOM a browser already holds when the extractor polls it
+        self._soup = BeautifulSoup(page_source, "html.parser")
+
+    def get(self, url: str) -> None:
+        pass
+
+    def find_elements(self, by: str, value: str) -> List[Any]:
+        if by != "css selector":
+            raise ValueError(f"PageDriver only supports CSS selectors, not {by!r}")
+        return self._soup.select(value)
+
+
+class Context:
+    """Shared inputs built once per run: saved pages, synthetic seasons and the ASGI client"""
+
+    def __init__(self) -> None:
+        self.data_dir = tempfile.mkdtemp(prefix="nrl-bench-")
+        self._table = None
+        self._lineups = None
+        self._loop = None
+        self._client = None
+        # (module, attribute, original value) of every app path pointed at the synthetic data
+        self._patched: List[Tuple[Any, str, Any]] = []
+        # Player and venue IDs assigned to synthetic names are saved here, not to data/entities.json
+        from data import entities
+
+        registry = entities.EntityRegistry.load(os.path.join(self.data_dir, "entities.json"))
+        self._registry = entities.set_registry(registry)
+
+    def page(self, name: str) -> str:
+        with open(os.path.join(PAGES_DIR, name), encoding="utf-8") as f:
+            return f.read()
+
+    def seasons(self) -> str:
+        if not os.listdir(self.data_dir):
+            write_seasons(self.data_dir, SEASONS, player_years=PLAYER_SEASONS)
+        return self.data_dir
+
+    def table(self):
+        if self._table is None:
+            from data.match_table import load_match_table
+
+            self._table = load_match_table("NRL", SEASONS, self.seasons())
+        return self._table
+
+    def lineups(self):
+        if self._lineups is None:
+            from data.lineups import load_lineups
+
+            self._lineups = load_lineups("NRL", PLAYER_SEASONS, self.seasons())
+        return self._lineups
+
+    def api_inputs(self) -> None:
+        """
+        Point the app at a fixtures cache, ratings, a matchup index and odds
+        built from the synthetic seasons, so the API benchmarks time the
+        full prediction path instead of empty fallbacks
+        """
+        if self._patched:
+            return
+        from app.main import prediction_cache
+        from app.routes import fixtures, predictions
+        from data.entities import TEAM_LISTS, team_id
+        from data.loader import iter_seasons
+        from data.matchup_index import MatchupIndex
+        from data.odds import OddsStore
+        from predictions.ratings import RatingEngine
+
+        base = self.seasons()
+        year = predictions.YEAR
+        # Round 1 pairs the teams of the hard-coded predictions, so every one finds its fixture and prices
+        pairs = {round_num: [tuple(TEAM_LISTS["NRL"][team_id(name)] for name in p["match"].split(" vs "))
+                             for p in matches] for round_num, matches in predictions.ROUND_PREDICTIONS.items()}
+        cache = fixture_cache(year, pairs=pairs)
+        fixtures_path = os.path.join(base, f"fixtures_{year}.json")
+        with open(fixtures_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+
+        ratings_path = os.path.join(base, "ratings.npz")
+        matchup_path = os.path.join(base, "matchup_index.npz")
+        RatingEngine.replay(iter_seasons("NRL", SEASONS, "match", base)).save(ratings_path)
+        MatchupIndex.build(iter_seasons("NRL", SEASONS, "match", base)).save(matchup_path)
+        store = OddsStore("NRL")
+        store.add(odds_snapshots(cache))
+        store.save(year, base)
+
+        for module, name, value in ((fixtures, "CACHED_FIXTURES_PATH", fixtures_path),
+                                    (predictions, "RATINGS_PATH", ratings_path),
+                                    (predictions, "MATCHUP_INDEX_PATH", matchup_path),
+                                    (predictions, "DATA_DIR", base)):
+            self._patched.append((module, name, getattr(module, name)))
+            setattr(module, name, value)
+        prediction_cache.invalidate()
+
+    def get(self, path: str):
+        """GET a path from the app through an in-process ASGI transport"""
+        if self._client is None:
+            import httpx
+
+            from app.main import app
+
+            self._loop = asyncio.new_event_loop()
+            self._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+        response = self._loop.run_until_complete(self._client.get(path))
+        response.raise_for_status()
+        return response
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._loop.run_until_complete(self._client.aclose())
+            self._loop.close()
+        for module, name, value in reversed(self._patched):
+            setattr(module, name, value)
+        from data.entities import set_registry
+
+        set_registry(self._registry)
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+
+def _quiet(fn: Callable[[], Any]) -> Callable[[], Any]:
+    """Drop the scrapers' progress prints while timing"""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return run
+
+
+def bench_extract_detailed(ctx: Context) -> Callable[[], Any]:
+    from scraping.utilities.get_detailed_match_data import get_detailed_nrl_data
+
+    fixture = round_fixtures(2024, 1)[0]
+    driver = PageDriver(ctx.page("match_centre_2024_round_1.html"))
+    return _quiet(lambda: get_detailed_nrl_data(1, 2024, fixture["home"], fixture["away"], driver=driver))
+
+
+def bench_extract_players(ctx: Context) -> Callable[[], Any]:
+    from scraping.player_data_select import fetch_player_match
+    from scraping.utilities import http_client
+
+    fixture = round_fixtures(2024, 1)[0]
+    driver = PageDriver(ctx.page("match_centre_2024_round_1.html"))
+    # Page loads go through the shared client; lift its limit so only extraction is timed
+    client = http_client.HttpClient()
+    client.configure_host("www.nrl.com", rate=1e9, burst=10 ** 9, max_rate=1e9)
+    http_client.set_client(client)
+    return _quiet(lambda: fetch_player_match(driver, 2024, 1, fixture["home"], fixture["away"], "NRL"))
+
+
+def bench_extract_draw(ctx: Context) -> Callable[[], Any]:
+    import httpx
+    from scraping.utilities import http_client
+    from scraping.utilities.get_nrl_data import get_nrl_data
+
+    page = ctx.page("draw_2024_round_1.html")
+    client = http_client.HttpClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, text=page)))
+    client.configure_host("www.nrl.com", rate=1e9, burst=10 ** 9, max_rate=1e9)
+    http_client.set_client(client)
+    return _quiet(lambda: get_nrl_data(1, 2024, "111"))
+
+
+def bench_load_matches(ctx: Context) -> Callable[[], Any]:
+    from data.match_table import load_match_table
+
+    base = ctx.seasons()
+    return lambda: load_match_table("NRL", SEASONS, base, detailed_stats=("half_time",))
+
+
+def bench_load_lineups(ctx: Context) -> Callable[[], Any]:
+    from data.lineups import load_lineups
+
+    base = ctx.seasons()
+    return lambda: load_lineups("NRL", PLAYER_SEASONS, base)
+
+
+def bench_features_matches(ctx: Context) -> Callable[[], Any]:
+    from predictions.features import build_features
+
+    table = ctx.table()
+    return lambda: build_features(table)
+
+
+def bench_features_lineups(ctx: Context) -> Callable[[], Any]:
+    from predictions.features import build_features
+
+    table, lineups = ctx.table(), ctx.lineups()
+    return lambda: build_features(table, lineups=lineups)
+
+
+def bench_api_fixtures(ctx: Context) -> Callable[[], Any]:
+    ctx.api_inputs()
+    return lambda: ctx.get("/api/fixtures")
+
+
+def bench_api_fixtures_round(ctx: Context) -> Callable[[], Any]:
+    ctx.api_inputs()
+    return lambda: ctx.get("/api/fixtures?round_num=1")
+
+
+def bench_api_predictions(ctx: Context) -> Callable[[], Any]:
+    ctx.api_inputs()
+    return lambda: ctx.get("/api/predictions?round_num=1")
+
+
+def bench_api_predictions_cold(ctx: Context) -> Callable[[], Any]:
+    from app.main import prediction_cache
+
+    ctx.api_inputs()
+
+    def run():
+        prediction_cache.invalidate()
+        return ctx.get("/api/predictions?round_num=1")
+    return run
+
+
+BENCHMARKS: Dict[str, Callable[[Context], Callable[[], Any]]] = {
+    "extract_detailed": bench_extract_detailed,
+    "extract_players": bench_extract_players,
+    "extract_draw": bench_extract_draw,
+    "load_matches": bench_load_matches,
+    "load_lineups": bench_load_lineups,
+    "features_matches": bench_features_matches,
+    "features_lineups": bench_features_lineups,
+    "api_fixtures": bench_api_fixtures,
+    "api_fixtures_round": bench_api_fixtures_round,
+    "api_predictions": bench_api_predictions,
+    "api_predictions_cold": bench_api_predictions_cold,
+}
+
+
+def run_benchmarks(only: Optional[Sequence[str]] = None, repeat: int = DEFAULT_REPEAT) -> Dict[str, Timing]:
+    """Time every benchmark whose name starts with one of ``only`` (all by default)"""
+    names = [name for name in BENCHMARKS if not only or name.startswith(tuple(only))]
+    ctx = Context()
+    results = {}
+    try:
+        for name in names:
+            results[name] = measure(BENCHMARKS[name](ctx), repeat)
+            print(f"  {name:<22} {results[name].median * 1000:>10.3f} ms")
+    finally:
+        ctx.close()
+    return results
+
+
+# ============================================
+# Results
+# ============================================
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def result_path(commit: str, results_dir: str = RESULTS_DIR) -> str:
+    return os.path.join(results_dir, f"{commit}.json")
+
+
+def save_results(results: Dict[str, Timing], results_dir: str = RESULTS_DIR) -> str:
+    commit = _git("rev-parse", "--short=12", "HEAD") or "unknown"
+    record = {
+        "commit": commit,
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "benchmarks": {name: timing.to_dict() for name, timing in results.items()},
+    }
+    os.makedirs(results_dir, exist_ok=True)
+    path = result_path(commit, results_dir)
+    # Partial runs (--only) update the commit's earlier results instead of replacing them
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            record["benchmarks"] = {**json.load(f).get("benchmarks", {}), **record["benchmarks"]}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2)
+    return path
+
+
+def load_baseline(baseline: Optional[str] = None, results_dir: str = RESULTS_DIR) -> Optional[Dict[str, Any]]:
+    """
+    Baseline results from a JSON file, a commit ref, or (by default) the
+    newest ancestor of HEAD that has results.
+    """
+    if baseline and os.path.isfile(baseline):
+        with open(baseline, encoding="utf-8") as f:
+            return json.load(f)
+    if baseline:
+        candidates = [_git("rev-parse", "--short=12", baseline)]
+    else:
+        candidates = (_git("rev-list", "--max-count=200", "--abbrev=12", "--abbrev-commit", "HEAD~1") or "").split()
+    for commit in candidates:
+        if commit and os.path.exists(result_path(commit, results_dir)):
+            with open(result_path(commit, results_dir), encoding="utf-8") as f:
+                return json.load(f)
+    return None
+
+
+def compare(results: Dict[str, Timing], baseline: Dict[str, Any],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Tuple[str, float, float, bool]]:
+    """(name, baseline median, current median, regressed) for benchmarks present in both runs"""
+    rows = []
+    for name, timing in results.items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if previous is None:
+            continue
+        before = previous["median"]
+        regressed = timing.median > before * (1 + threshold) and timing.median - before > MIN_DELTA
+        rows.append((name, before, timing.median, regressed))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time scraping, loading, feature and API hot paths")
+    parser.add_argument("--only", default=None, help=f"comma separated name prefixes from {sorted(BENCHMARKS)}")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--baseline", default=None, help="commit ref or results JSON (default: newest ancestor)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown of the median counted as a regression")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 on any regression")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+    print("Running benchmarks (seconds per call, median)")
+    results = run_benchmarks(args.only.split(",") if args.only else None, args.repeat)
+    if not args.no_save:
+        print(f"Saved {save_results(results)}")
+
+    if baseline is None:
+        print("No baseline results to compare against")
+        sys.exit(0)
+
+    print(f"\nAgainst {baseline['commit']} (threshold {args.threshold:.0%}):")
+    rows = compare(results, baseline, args.threshold)
+    for name, before, after, regressed in rows:
+        change = (after - before) / before if before else 0.0
+        flag = "REGRESSION" if regressed else ""
+        print(f"  {name:<22} {before * 1000:>10.3f} -> {after * 1000:>10.3f} ms {change:>+7.1%} {flag}")
+    if args.check and any(regressed for *_, regressed in rows):
+        sys.exit(1)
@@ -0,0 +1,321 @@
+"""
+synthetic.py
+
+Deterministic stand-ins for scraped data, used by the benchmarks.
+
+    - ``draw_page``: an nrl.com draw page with the ``vue-draw`` q-data blob
+    - ``match_centre_page``: a match centre page with every element
+      ``get_detailed_nrl_data`` and ``fetch_player_match`` read, padded with
+      navigation markup to a realistic size
+    - ``write_seasons``: match, detailed and player statistics files for
+      many seasons in the scraped JSON layout
+    - ``fixture_cache`` and ``odds_snapshots``: the app's cached fixtures
+      file and bookmaker price snapshots for an upcoming season
+
+The saved pages in ``benchmarks/pages`` come from ``write_pages``:
+
+    python -m benchmarks.synthetic --pages benchmarks/pages
+    python -m benchmarks.synthetic --seasons /tmp/bench-data --years 2008-2024
+
+Requires:
+    - numpy
+"""
+
+import argparse
+import html
+import json
+import os
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import environment as EV
+from data.entities import slugify, team_id
+from data.loader import season_path
+
+PAGES_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages")
+
+ROUNDS: int = 27
+VENUES: List[str] = [
+    "Suncorp Stadium", "Allianz Stadium", "Accor Stadium", "AAMI Park", "CommBank Stadium", "GIO Stadium",
+    "McDonald Jones Stadium", "WIN Stadium", "4 Pines Park", "BlueBet Stadium", "PointsBet Stadium",
+    "Cbus Super Stadium", "Qld Country Bank Stadium", "Go Media Stadium", "Leichhardt Oval",
+]
+
+# Detailed statistics keys, in page order (as in get_detailed_match_data)
+BAR_STATS: List[str] = [
+    "time_in_possession", "all_runs", "all_run_metres", "post_contact_metres", "line_breaks", "tackle_breaks",
+    "average_set_distance", "kick_return_metres", "offloads", "receipts", "total_passes", "dummy_passes", "kicks",
+    "kicking_metres", "forced_drop_outs", "bombs", "grubbers", "tackles_made", "missed_tackles", "intercepts",
+    "ineffective_tackles", "errors", "penalties_conceded", "ruck_infringements", "inside_10_metres",
+    "interchanges_used",
+]
+DONUT_STATS: List[str] = ["Completion Rate", "Average_Play_Ball_Speed", "Kick_Defusal", "Effective_Tackle"]
+SUMMARY_STATS: List[str] = [
+    "tries", "conversions", "penalty_goals", "sin_bins", "1_point_field_goals", "2_point_field_goals", "half_time",
+]
+PLAYERS_PER_SIDE: int = 17
+
+
+# ============================================
+# Fixtures
+# ============================================
+
+def round_fixtures(year: int, round_num: int, teams: Sequence[str] = EV.TEAMS,
+                   pairs: Optional[Sequence[Tuple[str, str]]] = None) -> List[Dict[str, object]]:
+    """Pairings (random unless ``pairs`` is given), scores and venues for one round, stable per (year, round)"""
+    rng = np.random.RandomState(year * 100 + round_num)
+    order = rng.permutation(len(teams))
+    if pairs is None:
+        pairs = [(teams[order[index]], teams[order[index + 1]]) for index in range(0, len(order) - 1, 2)]
+    fixtures = []
+    for number, (home, away) in enumerate(pairs):
+        fixtures.append({
+            "home": home,
+            "away": away,
+            "home_score": int(rng.poisson(22)),
+            "away_score": int(rng.poisson(18)),
+            "venue": VENUES[rng.randint(len(VENUES))],
+            "date": f"{year}-{3 + round_num // 4:02d}-{1 + (round_num * 7 + 2 * number) % 28:02d}T09:50:00Z",
+        })
+    return fixtures
+
+
+def _players(rng: np.random.RandomState, team: str) -> List[Dict[str, str]]:
+    rows = []
+    for number in range(1, PLAYERS_PER_SIDE + 1):
+        row = {"Name": f"{team.split()[0]} Player{number}"}
+        for label in EV.PLAYER_LABELS:
+            row[label] = str(int(rng.randint(0, 120)))
+        row["Number"] = str(number)
+        row["Position"] = "Interchange" if number > 13 else "na"
+        row["Mins Played"] = "80" if number <= 13 else str(int(rng.randint(10, 50)))
+        rows.append(row)
+    return rows
+
+
+def _try_minutes(rng: np.random.RandomState, count: int) -> List[int]:
+    return sorted(int(minute) for minute in rng.randint(1, 80, size=count))
+
+
+# ============================================
+# Pages
+# ============================================
+
+def draw_page(year: int, round_num: int, competition: str = "111", teams: Sequence[str] = EV.TEAMS,
+              draw_path: str = "/draw/nrl-premiership/") -> str:
+    """A draw page whose q-data blob lists the round's fixtures (kick-off times in epoch milliseconds)"""
+    fixtures = [{
+        "type": "Match",
+        "roundTitle": f"Round {round_num}",
+        "matchState": "FullTime",
+        "homeTeam": {"nickName": f["home"], "name": f["home"], "score": f["home_score"]},
+        "awayTeam": {"nickName": f["away"], "name": f["away"], "score": f["away_score"]},
+        "venue": f["venue"],
+        "clock": {"kickOffTimeLong": int(datetime.fromisoformat(f["date"].replace("Z", "+00:00")).timestamp() * 1000)},
+        "matchCentreUrl": f"{draw_path}{year}/round-{round_num}/{slugify(f['home'])}-v-{slugify(f['away'])}/",
+    } for f in round_fixtures(year, round_num, teams)]
+    blob = html.escape(json.dumps({"competition": competition, "fixtures": fixtures}), quote=True)
+    return (f"<!DOCTYPE html><html><head><title>Draw</title></head><body>{_navigation(40)}"
+            f'<div id="vue-draw" q-data="{blob}"></div></body></html>')
+
+
+def match_centre_page(year: int, round_num: int, home: str, away: str, filler: int = 150) -> str:
+    """A match centre page with team, summary, referee, weather and player statistics sections"""
+    rng = np.random.RandomState(zlib.crc32(f"{year}-{round_num}-{home}-{away}".encode()))
+    parts = ["<!DOCTYPE html><html><head><title>Match Centre</title></head><body>", _navigation(filler)]
+
+    parts.append(f'<p class="match-centre-card-donut__value--home">{rng.randint(40, 60)}%</p>')
+    parts.append(f'<p class="match-centre-card-donut__value--away">{rng.randint(40, 60)}%</p>')
+
+    parts.append("<dl>")
+    for _ in BAR_STATS:
+        parts.append(f'<dd class="stats-bar-chart__label--home">{rng.randint(0, 1800)}</dd>')
+        parts.append(f'<dd class="stats-bar-chart__label--away">{rng.randint(0, 1800)}</dd>')
+    parts.append("</dl>")
+    for _ in DONUT_STATS:
+        parts.append(f'<p class="donut-chart-stat__value">{rng.randint(60, 95)}</p>' * 2)
+
+    # Summary groups as nrl.com nests them: name, home/away values, then the scorer lists.
+    # Tries are listed with their minutes, goals as made/attempted tallies.
+    sides = (("home", home), ("away", away))
+    tries = {side: _try_minutes(rng, rng.randint(1, 6)) for side, _ in sides}
+    goals = {side: int(rng.randint(0, len(tries[side]) + 1)) for side, _ in sides}
+    for name in ["TRIES", "CONVERSIONS", "PENALTY GOALS", "SIN BINS", "1 POINT FIELD GOALS",
+                 "2 POINT FIELD GOALS", "HALF TIME"]:
+        parts.append(f'<div class="match-centre-summary-group"><span class="match-centre-summary-group__name">{name}</span>')
+        for side, _ in sides:
+            value = {"TRIES": len(tries[side]), "CONVERSIONS": goals[side]}.get(name, rng.randint(0, 6))
+            parts.append(f'<span class="match-centre-summary-group__value"><span>{value}</span></span>')
+        if name in ("TRIES", "CONVERSIONS"):
+            for side, team in sides:
+                parts.append(f'<ul class="match-centre-summary-group__list--{side}">')
+                if name == "TRIES":
+                    for minute in tries[side]:
+                        parts.append(f"<li>{team.split()[0]} Player{rng.randint(1, 18)} {minute}'</li>")
+                elif goals[side]:
+                    parts.append(f"<li>{team.split()[0]} Player7 {goals[side]}/{len(tries[side])}</li>")
+                parts.append("</ul>")
+        parts.append("</div>")
+
+    for position in ("Referee", "Touch Judge", "Touch Judge", "Bunker Official"):
+        parts.append(f'<a class="card-team-mate"><h3 class="card-team-mate__name">Official {rng.randint(1, 40)}</h3>'
+                     f'<p class="card-team-mate__position">{position}</p></a>')
+    parts.append('<p class="match-weather__text">Ground Conditions: <span>Good</span></p>')
+    parts.append('<p class="match-weather__text">Weather: <span>Fine</span></p>')
+
+    parts.append("<table><tbody>")
+    for team in (home, away):
+        for player in _players(rng, team):
+            cells = "".join(f'<td class="table__cell table-tbody__td">{player[label]}</td>'
+                            for label in EV.PLAYER_LABELS)
+            parts.append(f'<tr class="table-tbody__tr"><th><a class="table__content-link">{player["Name"]}</a></th>'
+                         f"{cells}</tr>")
+    parts.append("</tbody></table></body></html>")
+    return "".join(parts)
+
+
+def _navigation(sections: int) -> str:
+    """Header and menu markup that real pages carry around the data"""
+    return "".join(
+        f'<nav class="menu-{i}"><ul>' + "".join(f'<li><a href="/news/{i}/{j}/">Story {i}.{j}</a></li>'
+                                               for j in range(8)) + "</ul></nav>"
+        for i in range(sections))
+
+
+def write_pages(directory: str = PAGES_DIR, year: int = 2024, round_num: int = 1) -> List[str]:
+    """Save a draw page and one match centre page per fixture of a round"""
+    os.makedirs(directory, exist_ok=True)
+    paths = [os.path.join(directory, f"draw_{year}_round_{round_num}.html")]
+    with open(paths[0], "w", encoding="utf-8") as f:
+        f.write(draw_page(year, round_num))
+    fixture = round_fixtures(year, round_num)[0]
+    paths.append(os.path.join(directory, f"match_centre_{year}_round_{round_num}.html"))
+    with open(paths[1], "w", encoding="utf-8") as f:
+        f.write(match_centre_page(year, round_num, fixture["home"], fixture["away"]))
+    return paths
+
+
+# ============================================
+# Seasons
+# ============================================
+
+def write_seasons(base_path: str, years: Sequence[int], selection: str = "NRL", rounds: int = ROUNDS,
+                  player_years: Optional[Sequence[int]] = None) -> None:
+    """
+    Write match and detailed files for every year (and player statistics for
+    ``player_years``) in the layout the scrapers produce.
+    """
+    player_years = set(player_years or [])
+    for year in years:
+        rng = np.random.RandomState(year)
+        match_rounds, detailed_rounds, player_rounds = [], [], []
+        for round_num in range(1, rounds + 1):
+            fixtures = round_fixtures(year, round_num)
+            match_rounds.append({str(round_num): [{
+                "Round": f"Round {round_num}",
+                "Home": f["home"], "Home_Score": f["home_score"],
+                "Away": f["away"], "Away_Score": f["away_score"],
+                "Venue": f["venue"], "Date": f["date"],
+            } for f in fixtures]})
+            detailed_rounds.append({str(round_num): [{
+                f"{f['home']} v {f['away']}": {
+                    "match": {"overall_first_try_scorer": None, "main_ref": "Official 1",
+                              "ground_condition": "Good", "weather_condition": "Fine"},
+                    "home": _side_stats(rng, f["home_score"]),
+                    "away": _side_stats(rng, f["away_score"]),
+                }} for f in fixtures]})
+            if year in player_years:
+                player_rounds.append({str(round_num - 1): [{
+                    f"{year}-{round_num}-{f['home'].replace(' ', '-')}-v-{f['away'].replace(' ', '-')}":
+                        _players(rng, f["home"]) + _players(rng, f["away"])
+                } for f in fixtures]})
+
+        files = {"match": {selection: [{str(year): match_rounds}]}, "detailed": {selection: detailed_rounds}}
+        if year in player_years:
+            files["player"] = {"PlayerStats": [{str(year): player_rounds}]}
+        for kind, content in files.items():
+            path = season_path(selection, year, kind, base_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(content, f, separators=(",", ":"))
+
+
+def fixture_cache(year: int, rounds: int = ROUNDS,
+                  pairs: Optional[Dict[int, Sequence[Tuple[str, str]]]] = None) -> Dict[str, object]:
+    """
+    Content of the app's cached fixtures file (``scripts.fetch_fixtures``
+    layout) for a season; ``pairs`` fixes the pairings of given rounds.
+    """
+    pairs = pairs or {}
+    rounds_data = {}
+    for round_num in range(1, rounds + 1):
+        rounds_data[str(round_num)] = [{
+            "round": f"Round {round_num}",
+            "date": f["date"][:10],
+            "time": "19:50 AEST",
+            "home_team": f["home"],
+            "away_team": f["away"],
+            "venue": f["venue"],
+            "home_team_full": f["home"],
+            "away_team_full": f["away"],
+            "home_team_id": team_id(f["home"]),
+            "away_team_id": team_id(f["away"]),
+        } for f in round_fixtures(year, round_num, pairs=pairs.get(round_num))]
+    return {"competition": "NRL Premiership", "year": year, "competition_id": "111", "fixtures": rounds_data,
+            "source": "synthetic", "generated_at": f"{year}-02-01T00:00:00"}
+
+
+def odds_snapshots(cache: Dict[str, object], bookmakers: Sequence[str] = ("bet365", "sportsbet", "tab"),
+                   snapshots: int = 4) -> List[Dict[str, object]]:
+    """Head-to-head price snapshots (``data.odds.SNAPSHOT_COLUMNS``) for every fixture of a fixtures cache"""
+    year = int(cache["year"])
+    rng = np.random.RandomState(year)
+    records = []
+    for round_key, matches in cache["fixtures"].items():
+        for match in matches:
+            home_prob = float(rng.uniform(0.25, 0.75))
+            for bookmaker in bookmakers:
+                for hour in range(snapshots):
+                    drift = float(rng.normal(0, 0.02))
+                    for selection, prob in (("home", home_prob + drift), ("away", 1 - home_prob - drift)):
+                        records.append({
+                            "timestamp": f"{match['date']}T{hour * 6:02d}:00:00Z", "year": year,
+                            "round": int(round_key), "home": match["home_team"], "away": match["away_team"],
+                            "market": "h2h", "selection": selection, "price": round(1 / (prob * 1.05), 2),
+                            "line": None, "bookmaker": bookmaker,
+                        })
+    return records
+
+
+def _side_stats(rng: np.random.RandomState, score: int) -> Dict[str, object]:
+    stats: Dict[str, object] = {name: str(rng.randint(0, 1800)) for name in BAR_STATS}
+    stats.update({name: str(rng.randint(60, 95)) for name in DONUT_STATS})
+    stats.update({name: str(rng.randint(0, 6)) for name in SUMMARY_STATS})
+    stats["half_time"] = str(score // 2)
+    stats["try_minutes"] = [f"{minute}'" for minute in _try_minutes(rng, score // 6)]
+    return stats
+
+
+def _parse_years(value: str) -> List[int]:
+    if "-" in value:
+        first, last = value.split("-")
+        return list(range(int(first), int(last) + 1))
+    return [int(year) for year in value.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic pages and season files for benchmarks")
+    parser.add_argument("--pages", default=None, help="directory for the saved HTML pages")
+    parser.add_argument("--seasons", default=None, help="base directory for synthetic season files")
+    parser.add_argument("--years", default="2008-2024")
+    parser.add_argument("--player-years", default="2023-2024")
+    args = parser.parse_args()
+
+    if args.pages:
+        print("\n".join(write_pages(args.pages)))
+    if args.seasons:
+        write_seasons(args.seasons, _parse_years(args.years), player_years=_parse_years(args.player_years))
+        print(f"Seasons written under {args.seasons}")
@@ -0,0 +1,5 @@
+"""Project configuration
+
+    from config import environment as EV   # teams, competitions, site URLs
+    from config.paths import DATA_DIR       # data and artifact locations
+"""
@@ -0,0 +1,103 @@
+"""Teams, competitions, site URLs and scraping labels shared by every package"""
+import os
+
+TEAMS = ["Broncos", "Roosters", "Wests Tigers", "Rabbitohs", "Storm", "Eels", "Raiders", "Knights", "Dragons", "Sea Eagles", "Panthers", "Sharks", "Bulldogs", "Dolphins", "Titans", "Cowboys", "Warriors"]
+
+# Site roots, overridable to point the scrapers at a local stand-in (benchmarks/mock_server.py)
+NRL_BASE_URL = os.environ.get("NRL_BASE_URL", "https://www.nrl.com").rstrip("/")
+QRL_BASE_URL = os.environ.get("QRL_BASE_URL", "https://www.qrl.com.au").rstrip("/")
+NSWRL_BASE_URL = os.environ.get("NSWRL_BASE_URL", "https://www.nswrl.com.au").rstrip("/")
+
+NRL_DRAW_URL = f"{NRL_BASE_URL}/draw/"
+NRL_WEBSITE = f"{NRL_BASE_URL}/draw/nrl-premiership/"
+NRLW_WEBSITE = f"{NRL_BASE_URL}/draw/womens-premiership/"
+HOSTPLUS_WEBSITE = f"{QRL_BASE_URL}/draw/qrl-premiership/"
+KNOCKON_WEBSITE = f"{NSWRL_BASE_URL}/draw/nsw-cup/"
+
+DATA_WEBSITE = "https://geo145327-staging.s3.ap-southeast-2.amazonaws.com/public/"
+
+
+PLAYER_LABELS =     ["Number", "Position", "Mins Played", "Points", "Tries", "Conversions", "Conversion Attempts",
+                    "Penalty Goals", "Goal Conversion Rate", "1 Point Field Goals",
+                    "2 Point Field Goals", "Total Points", "All Runs", "All Run Metres",
+                    "Kick Return Metres", "Post Contact Metres", "Line Breaks",
+                    "Line Break Assists", "Try Assists", "Line Engaged Runs", "Tackle Breaks",
+                    "Hit Ups", "Play The Ball", "Average Play The Ball Speed",
+                    "Dummy Half Runs", "Dummy Half Run Metres", "One on One Steal",
+                    "Offloads", "Dummy Passes", "Passes", "Receipts", "Passes To Run Ratio",
+                    "Tackle Efficiency", "Tackles Made", "Missed Tackles",
+                    "Ineffective Tackles", "Intercepts", "Kicks Defused", "Kicks",
+                    "Kicking Metres", "Forced Drop Outs", "Bomb Kicks", "Grubbers",
+                    "40/20", "20/40", "Cross Field Kicks", "Kicked Dead", "Errors",
+                    "Handling Errors", "One on One Lost", "Penalties", "Ruck Infringements",
+                    "Inside 10 Metres", "On Report", "Sin Bins", "Send Offs",
+                    "Stint One", "Stint Two"]
+
+
+
+NRL_2024_ROUND = 1
+
+
+
+TEAM_COLOURS = {
+    "Broncos": "#760135",
+    "Roosters": "#e82c2e",
+    "Wests Tigers": "#f68b1f",
+    "Rabbitohs": "#006633",
+    "Storm": "#3E2783",
+    "Eels": "#ffd327",
+    "Raiders": "#c3d941",
+    "Knights": "#ee3524",
+    "Dragons": "#e2231b",
+    "Sea Eagles": "#6F0F3B",
+    "Panthers": "#221F20",
+    "Sharks": "#00a9d8",
+    "Bulldogs": "#0054A4",
+    "Dolphins": "#E5CC7A", 
+    "Titans": "#e7a614",
+    "Cowboys": "#002b5c",
+    "Warriors": "#231f20"
+}
+
+TEAM_COLOURS_INVERSE = {
+    "Broncos": "#fbbf15",
+    "Roosters": "#00305e",
+    "Wests Tigers": "#000000",
+    "Rabbitohs": "#e2261b",
+    "Storm": "#f9b018",
+    "Eels": "#006eb5",
+    "Raiders": "#00ac5b",
+    "Knights": "#00539f",
+    "Dragons": "#ffffff",
+    "Sea Eagles": "#ffffff",
+    "Panthers": "#ff0082",
+    "Sharks": "#000000",
+    "Bulldogs": "#A7A9AC",
+    "Dolphins": "#FB141E", 
+    "Titans": "#009ddc",
+    "Cowboys": "#ffdd00",
+    "Warriors": "#bdbcbc"
+}
+
+
+NRLW_TEAMS = ["Broncos", "Roosters", "Wests Tigers", "Eels", "Raiders", "Knights", "Dragons", "Sharks", "Titans", "Cowboys"]
+HOSTPLUS_TEAMS = ["Falcons", "Devils", "Dolphins", "WM Seagulls", "Blackhawks", "Seagulls", "Jets", "Tigers", "Capras", "Pride", "Cutters", "Bears", "Magpies", "Hunters", "Clydesdales"]
+KNOCKON_TEAMS = ["Dragons", "Jets", "Warriors", "Eels", "Knights", "Panthers", "Bulldogs", "Raiders", "Rabbitohs", "Roosters", "Sea Eagles", "Bears", "Magpies"]
+
+
+
+COMPETITION = {
+    'NRL' : '111',
+    'NRLW' : '161',
+    'KNOCKON': '113',
+    'HOSTPLUS': '114',
+    'PRESEASON': '119'
+}
+
+# Team list and draw website per selection type
+SELECTION_MAPPING = {
+    'NRL': (TEAMS, NRL_WEBSITE),
+    'NRLW': (NRLW_TEAMS, NRLW_WEBSITE),
+    'KNOCKON': (KNOCKON_TEAMS, KNOCKON_WEBSITE),
+    'HOSTPLUS': (HOSTPLUS_TEAMS, HOSTPLUS_WEBSITE)
+}
@@ -0,0 +1,19 @@
+"""Locations of the data directory and the persisted artifacts
+
+Kept free of heavy imports so the web app can resolve every path at start-up
+without loading numpy or pandas.
+"""
+import os
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT_DIR, "data")
+CACHE_DIR = os.path.join(DATA_DIR, "cache")
+
+REGISTRY_PATH = os.path.join(DATA_DIR, "entities.json")
+RATINGS_PATH = os.path.join(DATA_DIR, "ratings.npz")
+MATCHUP_INDEX_PATH = os.path.join(DATA_DIR, "matchup_index.npz")
+
+
+def odds_path(selection, year, base_path=DATA_DIR):
+    """Odds snapshot store of one competition and season"""
+    return os.path.join(base_path, selection, str(year), f"{selection}_odds_{year}.pkl")
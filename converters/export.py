@@ -0,0 +1,325 @@
+"""
+export.py
+
+Batch converter from the scraped JSON files to flat exports.
+
+Replaces ``match_to_txt_2023.ipynb`` and ``player_to_txt_2023.ipynb``,
+which were hard-coded to 2023, rebuilt the wide DataFrame by hand and wrote
+tab-separated files. Every (competition, season, kind) is one job and jobs
+run in parallel across processes. Each job streams records from
+``data.loader`` straight into its output in ``--chunk-rows`` batches, so
+memory stays flat however large the season is:
+
+    - match:    one row per team per match (attack, defense, margin, win, ...)
+    - player:   one row per player per match, with team and opponent and
+                every PLAYER_LABELS column
+    - detailed: one row per team per match with the detailed statistics
+
+Formats are gzip-compressed CSV or TSV (``.csv.gz``, ``.tsv.gz``; plain with
+``--compression none``) and Parquet (zstd row groups; requires pyarrow). In
+Parquet the key and score columns in INTEGER_COLUMNS are typed and only the
+free-form statistics are stored as strings.
+Outputs newer than their source file are skipped unless ``--force``.
+
+Usage (from the repository root):
+    python -m converters.export --selections NRL,NRLW --years 2008-2024
+    python -m converters.export --years 2023 --kinds player --format tsv --compression none
+    python -m converters.export --years 2024 --format parquet --workers 4
+
+Requires:
+    - pyarrow (Parquet output only)
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from config import environment as EV
+from config.paths import DATA_DIR
+from data.entities import team_id
+from data.loader import (LoadReport, MatchRecord, PlayerStatRecord, away_start, iter_detailed_matches, iter_matches,
+                         iter_player_stats, season_path)
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+EXPORT_DIR: str = os.path.join(DATA_DIR, "exports")
+
+KINDS: List[str] = ["match", "player", "detailed"]
+FORMATS: Dict[str, str] = {"csv": ",", "tsv": "\t", "parquet": ""}
+
+DEFAULT_CHUNK_ROWS: int = 50_000
+
+MATCH_COLUMNS: List[str] = ["competition", "year", "round", "team", "team_id", "opponent", "opponent_id", "home",
+                            "attack", "defense", "margin", "win", "venue", "date"]
+PLAYER_COLUMNS: List[str] = ["year", "round", "match_key", "team", "team_id", "opponent", "home", "row", "name",
+                             *EV.PLAYER_LABELS]
+DETAILED_KEYS: List[str] = ["competition", "year", "round", "team", "team_id", "opponent", "home"]
+
+# Parquet types of the columns the loader already gives as integers; every other column is a string
+INTEGER_COLUMNS: Dict[str, str] = {
+    "year": "int16", "round": "int16", "team_id": "int16", "opponent_id": "int16", "home": "int8",
+    "attack": "int16", "defense": "int16", "margin": "int16", "win": "int8", "row": "int32",
+}
+
+
+@dataclass(frozen=True)
+class ExportJob:
+    selection: str
+    year: int
+    kind: str
+
+    def __str__(self):
+        return f"{self.selection} {self.year} {self.kind}"
+
+
+@dataclass
+class ExportResult:
+    job: ExportJob
+    path: Optional[str]
+    rows: int = 0
+    seconds: float = 0.0
+    status: str = "done"
+    issues: int = 0
+    message: str = ""
+
+
+def output_path(job: ExportJob, fmt: str, compression: str, output_dir: str = EXPORT_DIR) -> str:
+    extension = "parquet" if fmt == "parquet" else fmt + (".gz" if compression == "gzip" else "")
+    return os.path.join(output_dir, job.selection, str(job.year), f"{job.selection}_{job.kind}_{job.year}.{extension}")
+
+
+# ============================================
+# Row streams
+# ============================================
+
+def match_rows(records: Iterable[MatchRecord]) -> Iterator[List[Any]]:
+    """Home and away row of every played or scheduled match"""
+    for record in records:
+        for home, team, team_id_, opponent, opponent_id, scored, conceded in (
+                (1, record.home, record.home_id, record.away, record.away_id, record.home_score, record.away_score),
+                (0, record.away, record.away_id, record.home, record.home_id, record.away_score, record.home_score)):
+            played = scored is not None and conceded is not None
+            yield [record.competition, record.year, record.round, team, team_id_, opponent, opponent_id, home,
+                   scored, conceded, scored - conceded if played else None,
+                   # Draws count as a win for both sides, as in data.match_table
+                   int(scored >= conceded) if played else None,
+                   record.venue, record.date]
+
+
+def player_rows(records: Iterable[PlayerStatRecord], selection: str) -> Iterator[List[Any]]:
+    """Player rows with their side, one match buffered at a time"""
+    match: List[PlayerStatRecord] = []
+
+    def flush():
+        split = away_start([_jersey(record.stats.get("Number")) for record in match])
+        for index, record in enumerate(match):
+            home = index < split
+            team, opponent = (record.home, record.away) if home else (record.away, record.home)
+            yield [record.year, record.round, record.match_key, team, team_id(team, selection), opponent, int(home),
+                   record.row, record.name, *[record.stats.get(label) for label in EV.PLAYER_LABELS]]
+
+    for record in records:
+        if match and (record.year, record.match_key) != (match[0].year, match[0].match_key):
+            yield from flush()
+            match.clear()
+        match.append(record)
+    if match:
+        yield from flush()
+
+
+def detailed_rows(records: Iterable[Any], selection: str, columns: List[str]) -> Iterator[List[Any]]:
+    """Home and away statistics of every match; lists and mappings are stored as JSON"""
+    for record in records:
+        for home, team, opponent, stats in ((1, record.home, record.away, record.home_stats),
+                                            (0, record.away, record.home, record.away_stats)):
+            values = [_scalar(stats.get(column)) for column in columns[len(DETAILED_KEYS):]]
+            yield [selection, record.year, record.round, team, team_id(team, selection), opponent, home, *values]
+
+
+def job_stream(job: ExportJob, report: LoadReport,
+               base_path: str = DATA_DIR) -> Tuple[List[str], Iterator[List[Any]]]:
+    """Columns and row iterator of one job"""
+    path = season_path(job.selection, job.year, job.kind, base_path)
+    if job.kind == "match":
+        return MATCH_COLUMNS, match_rows(iter_matches(path, job.selection, report))
+    if job.kind == "player":
+        return PLAYER_COLUMNS, player_rows(iter_player_stats(path, report), job.selection)
+
+    # Detailed files have no fixed schema: a first streaming pass collects every stat key of the
+    # season (issues are reported by the second pass), and matches without a key leave it empty
+    stat_keys = set()
+    for record in iter_detailed_matches(path, job.selection, job.year, LoadReport()):
+        stat_keys.update(record.home_stats.keys(), record.away_stats.keys())
+    columns = DETAILED_KEYS + sorted(stat_keys)
+    return columns, detailed_rows(iter_detailed_matches(path, job.selection, job.year, report), job.selection,
+                                  columns)
+
+
+# ============================================
+# Writers
+# ============================================
+
+def _chunks(rows: Iterator[List[Any]], size: int) -> Iterator[List[List[Any]]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def write_delimited(path: str, columns: Sequence[str], rows: Iterator[List[Any]], delimiter: str,
+                    compression: str = "gzip", chunk_rows: int = DEFAULT_CHUNK_ROWS) -> int:
+    """Stream rows into a (gzip) CSV/TSV file, one chunk per write; returns the row count"""
+    count = 0
+    raw = gzip.open(path, "wb", compresslevel=6) if compression == "gzip" else open(path, "wb")
+    with raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(columns)
+        for chunk in _chunks(rows, chunk_rows):
+            writer.writerows(chunk)
+            count += len(chunk)
+    return count
+
+
+def write_parquet(path: str, columns: Sequence[str], rows: Iterator[List[Any]],
+                  chunk_rows: int = DEFAULT_CHUNK_ROWS) -> int:
+    """Stream rows into a Parquet file, one zstd row group per chunk; returns the row count"""
+    if pyarrow is None:
+        raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+    schema = pyarrow.schema([(column, pyarrow.type_for_alias(INTEGER_COLUMNS.get(column, "string")))
+                             for column in columns])
+    count, writer = 0, None
+    try:
+        for chunk in _chunks(rows, chunk_rows):
+            # Scraped statistics mix numbers, "-" and percentages, so they stay text
+            arrays = [pyarrow.array(values if column in INTEGER_COLUMNS else
+                                    [None if v is None else str(v) for v in values], type_)
+                      for column, type_, values in zip(columns, schema.types, zip(*chunk))]
+            table = pyarrow.Table.from_arrays(arrays, schema=schema)
+            if writer is None:
+                writer = pyarrow.parquet.ParquetWriter(path, schema, compression="zstd")
+            writer.write_table(table)
+            count += len(chunk)
+        if writer is None:
+            pyarrow.parquet.write_table(schema.empty_table(), path, compression="zstd")
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+def run_job(job: ExportJob, fmt: str = "csv", compression: str = "gzip", output_dir: str = EXPORT_DIR,
+            chunk_rows: int = DEFAULT_CHUNK_ROWS, force: bool = False, base_path: str = DATA_DIR) -> ExportResult:
+    """Convert one season file; safe to run in a worker process"""
+    start = time.perf_counter()
+    source = season_path(job.selection, job.year, job.kind, base_path)
+    path = output_path(job, fmt, compression, output_dir)
+    if not os.path.exists(source):
+        return ExportResult(job, None, status="missing", message=source)
+    if not force and os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(source):
+        return ExportResult(job, path, status="skipped", message="up to date")
+
+    report = LoadReport()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    try:
+        columns, rows = job_stream(job, report, base_path)
+        if fmt == "parquet":
+            count = write_parquet(tmp, columns, rows, chunk_rows)
+        else:
+            count = write_delimited(tmp, columns, rows, FORMATS[fmt], compression, chunk_rows)
+        os.replace(tmp, path)
+    except Exception as ex:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return ExportResult(job, None, status="failed", message=str(ex), seconds=time.perf_counter() - start)
+    return ExportResult(job, path, count, time.perf_counter() - start, issues=len(report.issues))
+
+
+def run_exports(jobs: Sequence[ExportJob], fmt: str = "csv", compression: str = "gzip", output_dir: str = EXPORT_DIR,
+                chunk_rows: int = DEFAULT_CHUNK_ROWS, workers: Optional[int] = None, force: bool = False,
+                base_path: str = DATA_DIR) -> List[ExportResult]:
+    """Run every job across a process pool (in-process with workers=1)"""
+    options = dict(fmt=fmt, compression=compression, output_dir=output_dir, chunk_rows=chunk_rows, force=force,
+                   base_path=base_path)
+    if workers == 1 or len(jobs) <= 1:
+        results = [run_job(job, **options) for job in jobs]
+        for result in results:
+            _print_result(result)
+        return results
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_job, job, **options) for job in jobs]
+        for future in as_completed(futures):
+            results.append(future.result())
+            _print_result(results[-1])
+    return results
+
+
+def _print_result(result: ExportResult) -> None:
+    if result.status == "done":
+        issues = f", {result.issues} skipped entries" if result.issues else ""
+        print(f"  {result.job}: {result.rows} rows in {result.seconds:.2f}s -> {result.path}{issues}", flush=True)
+    else:
+        print(f"  {result.job}: {result.status} ({result.message})", flush=True)
+
+
+def _jersey(value: Any) -> Optional[int]:
+    try:
+        return int(float(str(value).strip()))
+    except (TypeError, ValueError):
+        return None
+
+
+def _scalar(value: Any) -> Any:
+    return json.dumps(value, separators=(",", ":")) if isinstance(value, (list, dict)) else value
+
+
+def _parse_years(value: str) -> List[int]:
+    if "-" in value:
+        first, last = value.split("-")
+        return list(range(int(first), int(last) + 1))
+    return [int(year) for year in value.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert scraped JSON seasons to compressed CSV/TSV or Parquet")
+    parser.add_argument("--selections", default="NRL", help=f"comma separated, from {list(EV.COMPETITION)}")
+    parser.add_argument("--years", required=True, help="first-last season or a comma separated list")
+    parser.add_argument("--kinds", default="match,player", help=f"comma separated, from {KINDS}")
+    parser.add_argument("--format", default="csv", choices=list(FORMATS))
+    parser.add_argument("--compression", default="gzip", choices=["gzip", "none"], help="for csv and tsv")
+    parser.add_argument("--output", default=EXPORT_DIR)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="rows per write / row group")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="rewrite outputs that are already up to date")
+    args = parser.parse_args()
+
+    if args.format == "parquet" and pyarrow is None:
+        parser.error("--format parquet requires pyarrow (pip install pyarrow)")
+
+    jobs = [ExportJob(selection, year, kind) for selection in args.selections.split(",")
+            for year in _parse_years(args.years) for kind in args.kinds.split(",")]
+    print(f"Converting {len(jobs)} season files to {args.format}")
+    start = time.perf_counter()
+    results = run_exports(jobs, args.format, args.compression, args.output, args.chunk_rows, args.workers, args.force)
+    done = [r for r in results if r.status == "done"]
+    print(f"{len(done)} written ({sum(r.rows for r in done)} rows), "
+          f"{sum(r.status == 'skipped' for r in results)} up to date, "
+          f"{sum(r.status == 'missing' for r in results)} missing, "
+          f"{sum(r.status == 'failed' for r in results)} failed in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,265 @@
+"""
+charts.py
+
+Chart-ready aggregates for the web UI: attack versus defense, form trends
+and half splits, for any season through any round.
+
+``visualisations/round_visulisations.ipynb`` rebuilt the wide table and
+summed the Attack/Defense columns for one hard-coded year on every run.
+Here each season is reduced once to (team x round) series plus their running
+totals and saved as JSON (``data/cache/charts/{selection}_{year}.json``)
+together with the data version of the season files it was built from. The
+totals through round R are then a column lookup, and the saved file is
+rebuilt only when new results land:
+
+    season = season_charts("NRL", 2024)     # loads, or rebuilds if the data changed
+    chart_data(season, round_num=10)        # attack_defense, form, half_splits
+
+Usage (from the repository root, after a scrape):
+    python -m data.charts --selection NRL --years 2023-2024
+
+Requires:
+    - numpy and pandas, to build a season (loading and slicing are pure Python)
+"""
+
+import argparse
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import environment as EV
+from config.paths import DATA_DIR
+from data.entities import TEAM_LISTS
+from data.loader import LoadReport, data_version
+
+# Bump when the saved layout changes so older files are rebuilt
+CHARTS_VERSION: int = 2
+
+# Rounds in the rolling form window
+FORM_WINDOW: int = 5
+
+# Season files a chart season depends on
+SOURCE_KINDS = ("match", "detailed")
+
+# Per-round series kept for every team ("half" ones need detailed match data)
+SERIES: List[str] = ["points_for", "points_against", "margin", "win", "first_half_for", "first_half_against",
+                     "tries", "first_half_tries", "second_half_tries"]
+
+
+def charts_path(selection: str, year: int, base_path: str = DATA_DIR) -> str:
+    return os.path.join(base_path, "cache", "charts", f"{selection}_{year}.json")
+
+
+def charts_version(selection: str, year: int, base_path: str = DATA_DIR) -> str:
+    """Version of a chart season: layout version plus the fingerprint of its season files"""
+    return f"{CHARTS_VERSION}-{data_version(selection, [year], SOURCE_KINDS, base_path)}"
+
+
+# ============================================
+# Building
+# ============================================
+
+def build_season(selection: str, year: int, base_path: str = DATA_DIR,
+                 report: Optional[LoadReport] = None) -> Dict[str, Any]:
+    """
+    Reduce one season to per-team series and running totals.
+
+    Returns
+    -------
+    dict
+        JSON-ready: selection, year, version, rounds (played, ascending),
+        teams (name, id, colours) and, per series, a list per team aligned
+        with rounds (None for byes and games not completed), plus
+        ``cumulative`` running totals and ``games`` played through each
+        round. ``win`` is 1 for a win only; draws are 0 like losses.
+    """
+    import numpy as np
+
+    from data.match_table import load_match_table
+
+    table = load_match_table(selection, [year], base_path, report, detailed_stats=("half_time",))
+    # Completed matches only: fixtures not yet played are neither games nor 0-0 draws
+    played = table[table["completed"].astype(bool) & table["team_id"].notna()] if not table.empty else table
+    teams = TEAM_LISTS.get(selection, TEAM_LISTS["NRL"])
+    rounds = sorted(int(r) for r in played["round"].unique()) if not played.empty else []
+
+    frame = played.assign(
+        points_for=played["attack"].astype(float),
+        points_against=played["defense"].astype(float),
+        margin=played["margin"].astype(float),
+        win=(played["margin"] > 0).astype(float),
+        first_half_for=played["half_time"] if "half_time" in played else np.nan,
+        first_half_against=played["opp_half_time"] if "opp_half_time" in played else np.nan,
+        tries=played["tries"] if "tries" in played else np.nan,
+        first_half_tries=played["first_half_tries"] if "first_half_tries" in played else np.nan,
+        second_half_tries=played["second_half_tries"] if "second_half_tries" in played else np.nan,
+    ) if not played.empty else played
+
+    series, cumulative = {}, {}
+    round_pos = {r: i for i, r in enumerate(rounds)}
+    for name in SERIES:
+        grid = np.full((len(teams), len(rounds)), np.nan)
+        if len(frame):
+            team_idx = frame["team_id"].astype(int).to_numpy()
+            keep = team_idx < len(teams)
+            round_idx = np.array([round_pos[int(r)] for r in frame["round"]], dtype=int)
+            grid[team_idx[keep], round_idx[keep]] = frame[name].astype(float).to_numpy()[keep]
+        series[name] = grid
+        cumulative[name] = np.nancumsum(grid, axis=1)
+    games = np.cumsum(~np.isnan(series["points_for"]), axis=1)
+    has_halves = bool(np.isfinite(series["first_half_for"]).any())
+
+    def listed(grid, digits=2):
+        return [[None if np.isnan(v) else round(float(v), digits) for v in row] for row in grid]
+
+    return {
+        "selection": selection,
+        "year": year,
+        "version": charts_version(selection, year, base_path),
+        "rounds": rounds,
+        "has_halves": has_halves,
+        "teams": [{"team": team, "team_id": team_id, "colour": EV.TEAM_COLOURS.get(team),
+                   "colour_inverse": EV.TEAM_COLOURS_INVERSE.get(team)} for team_id, team in enumerate(teams)],
+        "series": {name: listed(grid) for name, grid in series.items()},
+        "cumulative": {name: listed(grid) for name, grid in cumulative.items()},
+        "games": games.astype(int).tolist(),
+    }
+
+
+def save_season(season: Dict[str, Any], base_path: str = DATA_DIR) -> str:
+    path = charts_path(season["selection"], season["year"], base_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(season, f, separators=(",", ":"))
+    os.replace(tmp, path)
+    return path
+
+
+def load_season(selection: str, year: int, base_path: str = DATA_DIR) -> Optional[Dict[str, Any]]:
+    """Saved chart season, or None when missing or unreadable"""
+    try:
+        with open(charts_path(selection, year, base_path), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def season_charts(selection: str, year: int, base_path: str = DATA_DIR) -> Dict[str, Any]:
+    """Saved chart season when it matches the current data, else rebuilt and saved"""
+    season = load_season(selection, year, base_path)
+    if season is not None and season.get("version") == charts_version(selection, year, base_path):
+        return season
+    season = build_season(selection, year, base_path)
+    save_season(season, base_path)
+    return season
+
+
+def refresh(selections: Iterable[str], years: Iterable[int], base_path: str = DATA_DIR) -> List[str]:
+    """Rebuild the chart seasons whose data changed; returns the saved paths"""
+    saved = []
+    for selection in selections:
+        for year in years:
+            season = load_season(selection, year, base_path)
+            if season is None or season.get("version") != charts_version(selection, year, base_path):
+                saved.append(save_season(build_season(selection, year, base_path), base_path))
+    return saved
+
+
+# ============================================
+# Slicing
+# ============================================
+
+def chart_data(season: Dict[str, Any], round_num: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Aggregates of a chart season through ``round_num`` (inclusive; the
+    latest played round by default).
+    """
+    rounds = [r for r in season["rounds"] if round_num is None or r <= round_num]
+    last = len(rounds) - 1
+    payload = {
+        "selection": season["selection"],
+        "year": season["year"],
+        "round": rounds[-1] if rounds else round_num,
+        "rounds": rounds,
+        "version": season["version"],
+        "attack_defense": [],
+        "form": [],
+        "half_splits": [] if season["has_halves"] else None,
+    }
+    if not rounds:
+        payload["note"] = f"No results for {season['selection']} {season['year']}" + (
+            f" through round {round_num}" if round_num is not None else "")
+        return payload
+
+    series, cumulative = season["series"], season["cumulative"]
+    for i, team in enumerate(season["teams"]):
+        games = season["games"][i][last]
+        if not games:
+            continue
+        total = {name: cumulative[name][i][last] for name in SERIES}
+        payload["attack_defense"].append({
+            **team,
+            "games": games,
+            "points_for": total["points_for"],
+            "points_against": total["points_against"],
+            "attack_per_game": round(total["points_for"] / games, 2),
+            "defense_per_game": round(total["points_against"] / games, 2),
+        })
+
+        margins = series["margin"][i][:last + 1]
+        played = [m for m in margins if m is not None]
+        payload["form"].append({
+            **team,
+            "margins": margins,
+            "rolling_margin": _rolling(margins, FORM_WINDOW),
+            "cumulative_wins": [int(w or 0) for w in cumulative["win"][i][:last + 1]],
+            "last_results": [_result(m) for m in played[-FORM_WINDOW:]],
+        })
+
+        if season["has_halves"]:
+            first_for, first_against = total["first_half_for"], total["first_half_against"]
+            payload["half_splits"].append({
+                **team,
+                "first_half_for": first_for,
+                "first_half_against": first_against,
+                "second_half_for": round(total["points_for"] - first_for, 2),
+                "second_half_against": round(total["points_against"] - first_against, 2),
+                "first_half_tries": total["first_half_tries"],
+                "second_half_tries": total["second_half_tries"],
+            })
+
+    payload["attack_defense"].sort(key=lambda row: row["attack_per_game"] - row["defense_per_game"], reverse=True)
+    return payload
+
+
+def _result(margin: float) -> str:
+    return "W" if margin > 0 else "D" if margin == 0 else "L"
+
+
+def _rolling(values: List[Optional[float]], window: int) -> List[Optional[float]]:
+    """Mean of the last ``window`` played values at each round (None before the first game)"""
+    result, recent = [], []
+    for value in values:
+        if value is not None:
+            recent = (recent + [value])[-window:]
+        result.append(round(sum(recent) / len(recent), 2) if recent else None)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute chart data for the web UI")
+    parser.add_argument("--selection", default="NRL", help="comma separated competitions")
+    parser.add_argument("--years", default="2024", help="first-last season, e.g. 2008-2025")
+    parser.add_argument("--force", action="store_true", help="rebuild even when the data is unchanged")
+    args = parser.parse_args()
+
+    first, _, last = args.years.partition("-")
+    years = range(int(first), int(last or first) + 1)
+    for selection in args.selection.split(","):
+        for year in years:
+            if args.force:
+                path = save_season(build_season(selection, year))
+            else:
+                path = next(iter(refresh([selection], [year])), None)
+            print(f"{selection} {year}: {'saved ' + path if path else 'up to date'}")
@@ -0,0 +1,265 @@
+"""
+entities.py
+
+Canonical registry of teams, venues, players and referees.
+
+Names arrive in many spellings: nicknames in the draw data ("Sea Eagles"),
+full names from the fixtures feed ("Manly Warringah Sea Eagles"), URL slugs
+("sea-eagles") and the occasional typo. This module resolves every alias to
+a stable integer ID so joins and group-bys can run on compact keys, and
+generates the URL slugs used by the scrapers.
+
+Team IDs follow the order of the team lists in config.environment (the
+same ``teams.index(team)`` values the notebooks already use). Venue, player
+and referee IDs are assigned on first sight and persisted to
+``data/entities.json`` so they never change between runs: code that creates
+IDs calls ``get_registry().save_changes()`` once it is done.
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Union
+
+from config import environment as EV
+from config.paths import REGISTRY_PATH
+
+TEAM_LISTS: Dict[str, List[str]] = {
+    "NRL": EV.TEAMS,
+    "NRLW": EV.NRLW_TEAMS,
+    "HOSTPLUS": EV.HOSTPLUS_TEAMS,
+    "KNOCKON": EV.KNOCKON_TEAMS,
+}
+
+# Full names and common variants for each NRL nickname
+NRL_TEAM_ALIASES: Dict[str, List[str]] = {
+    "Broncos": ["Brisbane Broncos", "Brisbane"],
+    "Roosters": ["Sydney Roosters", "Eastern Suburbs Roosters"],
+    "Wests Tigers": ["West Tigers", "Tigers"],
+    "Rabbitohs": ["South Sydney Rabbitohs", "South Sydney", "Souths"],
+    "Storm": ["Melbourne Storm", "Melbourne"],
+    "Eels": ["Parramatta Eels", "Parramatta"],
+    "Raiders": ["Canberra Raiders", "Canberra"],
+    "Knights": ["Newcastle Knights", "Newcastle"],
+    "Dragons": ["St George Illawarra Dragons", "St. George Illawarra Dragons", "St George Illawarra"],
+    "Sea Eagles": ["Manly-Warringah Sea Eagles", "Manly Warringah Sea Eagles", "Manly Sea Eagles", "Manly"],
+    "Panthers": ["Penrith Panthers", "Penrith"],
+    "Sharks": ["Cronulla-Sutherland Sharks", "Cronulla Sutherland Sharks", "Cronulla Sharks", "Cronulla"],
+    "Bulldogs": ["Canterbury-Bankstown Bulldogs", "Canterbury Bankstown Bulldogs", "Canterbury Bulldogs", "Canterbury"],
+    "Dolphins": ["The Dolphins"],
+    "Titans": ["Gold Coast Titans", "Gold Coast"],
+    "Cowboys": ["North Queensland Cowboys", "Nth Queensland Cowboys", "North Queensland"],
+    "Warriors": ["New Zealand Warriors", "One New Zealand Warriors", "Vodafone Warriors"],
+}
+
+TEAM_ALIASES: Dict[str, Dict[str, List[str]]] = {
+    "NRL": NRL_TEAM_ALIASES,
+    "NRLW": {team: aliases for team, aliases in NRL_TEAM_ALIASES.items() if team in EV.NRLW_TEAMS},
+}
+
+
+def normalise(name: str) -> str:
+    """Lookup form of a name: case, punctuation and spacing are ignored"""
+    name = re.sub(r"[^0-9a-z']+", " ", name.casefold())
+    return re.sub(r"\s+", " ", name.replace("'", "")).strip()
+
+
+def slugify(name: str) -> str:
+    """URL slug in the form used by nrl.com match centre links"""
+    return normalise(name).replace(" ", "-")
+
+
+class EntityIndex:
+    """
+    Bidirectional name <-> integer ID index for one kind of entity.
+
+    Attributes
+    ----------
+    kind : str
+        Entity kind (e.g. 'team', 'venue')
+    names : list
+        Canonical names, positioned by ID
+    """
+
+    def __init__(self, kind: str, names: Iterable[str] = (), aliases: Optional[Dict[str, Iterable[str]]] = None) -> None:
+        self.kind: str = kind
+        self.names: List[str] = []
+        self._lookup: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        for name in names:
+            self.add(name, (aliases or {}).get(name, ()))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return self.resolve(name) is not None
+
+    def add(self, name: str, aliases: Iterable[str] = ()) -> int:
+        """Register a canonical name (and aliases), returning its ID"""
+        with self._lock:
+            entity_id = self._lookup.get(normalise(name))
+            if entity_id is None:
+                entity_id = len(self.names)
+                self.names.append(name)
+            for key in [name, slugify(name), *aliases]:
+                self._lookup.setdefault(normalise(key), entity_id)
+            return entity_id
+
+    def alias(self, alias: str, name: str) -> int:
+        """Point an extra spelling at an existing entity"""
+        entity_id = self.id(name)
+        with self._lock:
+            self._lookup[normalise(alias)] = entity_id
+        return entity_id
+
+    def resolve(self, name: Optional[str]) -> Optional[int]:
+        """ID for any known spelling of a name, or None"""
+        if not name:
+            return None
+        return self._lookup.get(normalise(name))
+
+    def id(self, name: str, create: bool = False) -> int:
+        """
+        ID for a name.
+
+        Raises
+        ------
+        KeyError
+            If the name is unknown and create is False
+        """
+        entity_id = self.resolve(name)
+        if entity_id is not None:
+            return entity_id
+        if not create:
+            raise KeyError(f"Unknown {self.kind}: {name!r}")
+        return self.add(name)
+
+    def name(self, entity_id: int) -> str:
+        """Canonical name for an ID"""
+        return self.names[entity_id]
+
+    def canonical(self, name: str) -> str:
+        """Canonical spelling of any known alias"""
+        return self.names[self.id(name)]
+
+    def slug(self, name_or_id: Union[str, int]) -> str:
+        """URL slug of the canonical name"""
+        if isinstance(name_or_id, int):
+            return slugify(self.names[name_or_id])
+        entity_id = self.resolve(name_or_id)
+        return slugify(self.names[entity_id] if entity_id is not None else name_or_id)
+
+    def to_dict(self) -> Dict[str, object]:
+        aliases: Dict[str, List[str]] = {}
+        for key, entity_id in self._lookup.items():
+            if key != normalise(self.names[entity_id]) and key != normalise(slugify(self.names[entity_id])):
+                aliases.setdefault(self.names[entity_id], []).append(key)
+        return {"names": list(self.names), "aliases": aliases}
+
+    @classmethod
+    def from_dict(cls, kind: str, data: Dict[str, object]) -> "EntityIndex":
+        return cls(kind, data.get("names", []), data.get("aliases", {}))
+
+
+class EntityRegistry:
+    """
+    All entity indexes used by the scrapers, storage and API.
+
+    Teams are scoped by competition because feeder clubs share nicknames
+    with NRL clubs (e.g. the HOSTPLUS and NRL "Dolphins").
+    """
+
+    DYNAMIC_KINDS = ("venues", "players", "referees")
+
+    def __init__(self, path: str = REGISTRY_PATH) -> None:
+        # File the dynamic IDs are loaded from and saved back to
+        self.path = path
+        self.teams: Dict[str, EntityIndex] = {
+            competition: EntityIndex("team", names, TEAM_ALIASES.get(competition))
+            for competition, names in TEAM_LISTS.items()
+        }
+        self.venues = EntityIndex("venue")
+        self.players = EntityIndex("player")
+        self.referees = EntityIndex("referee")
+        self._saved = self._sizes()
+
+    def _sizes(self) -> Dict[str, int]:
+        """Names and aliases known per dynamic kind, to tell whether anything was added"""
+        return {kind: len(getattr(self, kind)._lookup) for kind in self.DYNAMIC_KINDS}
+
+    def team_index(self, competition: str = "NRL") -> EntityIndex:
+        return self.teams[competition]
+
+    def team_id(self, name: str, competition: str = "NRL") -> int:
+        return self.teams[competition].id(name)
+
+    def team_name(self, team_id: int, competition: str = "NRL") -> str:
+        return self.teams[competition].name(team_id)
+
+    def team_slug(self, name: str, competition: str = "NRL") -> str:
+        return self.teams[competition].slug(name)
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Persist the dynamically assigned IDs so they stay stable (to ``self.path`` by default)"""
+        path = path or self.path
+        data = {kind: getattr(self, kind).to_dict() for kind in self.DYNAMIC_KINDS}
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False, indent=2)
+        self._saved = self._sizes()
+
+    def save_changes(self, path: Optional[str] = None) -> bool:
+        """Save only if IDs or aliases were added since the last load or save; returns whether it saved"""
+        if self._sizes() == self._saved:
+            return False
+        self.save(path)
+        return True
+
+    @classmethod
+    def load(cls, path: str = REGISTRY_PATH) -> "EntityRegistry":
+        registry = cls(path)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            for kind in cls.DYNAMIC_KINDS:
+                if kind in data:
+                    setattr(registry, kind, EntityIndex.from_dict(kind[:-1], data[kind]))
+            registry._saved = registry._sizes()
+        return registry
+
+
+_registry: Optional[EntityRegistry] = None
+
+
+def get_registry() -> EntityRegistry:
+    """Process-wide registry, loaded from data/entities.json on first use"""
+    global _registry
+    if _registry is None:
+        _registry = EntityRegistry.load()
+    return _registry
+
+
+def set_registry(registry: Optional[EntityRegistry]) -> Optional[EntityRegistry]:
+    """Replace the process-wide registry (e.g. one loaded from another file); returns the previous one"""
+    global _registry
+    previous, _registry = _registry, registry
+    return previous
+
+
+def team_slug(name: str, competition: str = "NRL") -> str:
+    """URL slug for a team name in any known spelling"""
+    return get_registry().team_slug(name, competition)
+
+
+def team_id(name: str, competition: str = "NRL") -> Optional[int]:
+    """Integer ID for a team name in any known spelling, or None"""
+    return get_registry().teams[competition].resolve(name)
+
+
+def competition_for_id(competition_id: str) -> Optional[str]:
+    """Selection name (e.g. 'NRL') for an nrl.com competition ID (e.g. '111')"""
+    for selection, value in EV.COMPETITION.items():
+        if value == str(competition_id):
+            return selection
+    return None
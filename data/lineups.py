@@ -0,0 +1,275 @@
+"""
+lineups.py
+
+Named teams per match and lineup-strength aggregates.
+
+``build_lineups`` turns the player statistics files into one row per
+player per match with the jersey number, position, position group and
+minutes played, instead of hard-coded 13-man lists and ``names.keys()``
+positions. ``player_form`` gives every player's pre-match rolling form,
+and ``lineup_strength`` averages that form by position group for each
+side, so a whole round (or several seasons) is scored in one call.
+
+    lineups = load_lineups("NRL", [2023, 2024])
+    strength = lineup_strength(lineups)                      # every match
+    strength = lineup_strength(lineups, rounds=[(2024, 5)])  # one round
+
+Upcoming matches can be scored from announced team lists with
+``named_lineup`` before any statistics exist for them.
+
+Requires:
+    - pandas
+    - numpy
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data.entities import get_registry, team_id
+from data.loader import DATA_DIR, LoadReport, PlayerStatRecord, away_start, iter_seasons
+
+# Jersey number -> position for starting sides (``names`` in the try scorer notebook)
+JERSEY_POSITIONS: Dict[int, str] = {
+    1: "Fullback", 2: "Winger", 3: "Centre", 4: "Centre", 5: "Winger", 6: "Five-Eighth", 7: "Halfback",
+    8: "Prop", 9: "Hooker", 10: "Prop", 11: "2nd Row", 12: "2nd Row", 13: "Lock",
+}
+
+POSITION_GROUPS: Dict[str, str] = {
+    "fullback": "backs",
+    "winger": "backs",
+    "centre": "backs",
+    "five-eighth": "spine",
+    "five-eight": "spine",
+    "halfback": "spine",
+    "hooker": "spine",
+    "prop": "forwards",
+    "2nd row": "forwards",
+    "second row": "forwards",
+    "lock": "forwards",
+}
+GROUPS: List[str] = ["backs", "spine", "forwards", "bench"]
+
+# Player statistics column -> lineup column
+LINEUP_STATS: Dict[str, str] = {
+    "Tries": "tries",
+    "Try Assists": "try_assists",
+    "Line Breaks": "line_breaks",
+    "All Run Metres": "run_metres",
+    "Tackle Breaks": "tackle_breaks",
+    "Tackle Efficiency": "tackle_efficiency",
+    "Tackles Made": "tackles",
+    "Missed Tackles": "missed_tackles",
+    "Errors": "errors",
+}
+
+# Form metrics aggregated per position group
+STRENGTH_METRICS: List[str] = ["tries", "line_breaks", "run_metres", "tackle_efficiency", "missed_tackles"]
+
+# Number of previous games in a player's rolling form
+PLAYER_HISTORY: int = 5
+
+LINEUP_COLUMNS: List[str] = [
+    "year", "round", "match_key", "team", "team_id", "opponent", "home",
+    "player", "player_id", "number", "position", "group", "minutes", *LINEUP_STATS.values(),
+]
+
+
+# ============================================
+# Named teams
+# ============================================
+
+def position_group(position: Optional[str], number: Optional[int] = None) -> str:
+    """Position group for a listed position, falling back to the jersey number"""
+    if position:
+        group = POSITION_GROUPS.get(position.strip().lower())
+        if group is not None:
+            return group
+    if number is not None and number in JERSEY_POSITIONS:
+        return POSITION_GROUPS[JERSEY_POSITIONS[number].lower()]
+    return "bench"
+
+
+def build_lineups(records: Iterable[PlayerStatRecord], selection: str = "NRL") -> pd.DataFrame:
+    """
+    One row per player per match from player statistics records.
+
+    Each match lists the home side first; the away side starts where the
+    jersey numbers restart (or half way down when numbers are missing).
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns in LINEUP_COLUMNS
+    """
+    players = get_registry().players
+    rows = []
+    match_rows: List[PlayerStatRecord] = []
+
+    def flush():
+        numbers = [_to_int(record.stats.get("Number")) for record in match_rows]
+        split = away_start(numbers)
+        for index, (record, number) in enumerate(zip(match_rows, numbers)):
+            home = index < split
+            team, opponent = (record.home, record.away) if home else (record.away, record.home)
+            position = record.stats.get("Position")
+            row = {
+                "year": record.year,
+                "round": record.round,
+                "match_key": record.match_key,
+                "team": team,
+                "team_id": team_id(team, selection),
+                "opponent": opponent,
+                "home": int(home),
+                "player": record.name,
+                "player_id": players.id(record.name, create=True) if record.name else None,
+                "number": number,
+                "position": position if position and position != "na" else JERSEY_POSITIONS.get(number),
+                "group": position_group(position, number),
+                "minutes": _to_minutes(record.stats.get("Mins Played")),
+            }
+            for label, column in LINEUP_STATS.items():
+                row[column] = _to_float(record.stats.get(label))
+            rows.append(row)
+        match_rows.clear()
+
+    for record in records:
+        if match_rows and (record.year, record.match_key) != (match_rows[0].year, match_rows[0].match_key):
+            flush()
+        match_rows.append(record)
+    if match_rows:
+        flush()
+    # Keep the player IDs assigned here stable for the next run
+    get_registry().save_changes()
+
+    lineups = pd.DataFrame.from_records(rows, columns=LINEUP_COLUMNS)
+    lineups["team_id"] = lineups["team_id"].astype("Int16")
+    lineups["player_id"] = lineups["player_id"].astype("Int32")
+    lineups["number"] = lineups["number"].astype("Int8")
+    for column in ("team", "opponent", "position", "group"):
+        lineups[column] = lineups[column].astype("category")
+    return lineups
+
+
+def load_lineups(selection: str, years: Iterable[int], base_path: str = DATA_DIR,
+                 report: Optional[LoadReport] = None) -> pd.DataFrame:
+    """Lineups for whole seasons straight from the player statistics files"""
+    return build_lineups(iter_seasons(selection, years, "player", base_path, report), selection)
+
+
+def named_lineup(year: int, round_num: int, team: str, opponent: str, home: bool, names: Sequence[str],
+                 selection: str = "NRL") -> pd.DataFrame:
+    """
+    Rows for an announced team list in jersey order (1-13 starters, then the bench),
+    so upcoming matches can be scored by ``lineup_strength``.
+    """
+    players = get_registry().players
+    rows = [{
+        "year": year,
+        "round": round_num,
+        "match_key": f"{year}-{round_num}-{(team if home else opponent).replace(' ', '-')}"
+                     f"-v-{(opponent if home else team).replace(' ', '-')}",
+        "team": team,
+        "team_id": team_id(team, selection),
+        "opponent": opponent,
+        "home": int(home),
+        "player": name,
+        "player_id": players.id(name, create=True),
+        "number": number,
+        "position": JERSEY_POSITIONS.get(number, "Interchange"),
+        "group": position_group(None, number),
+        "minutes": np.nan,
+    } for number, name in enumerate(names, start=1)]
+    get_registry().save_changes()
+    return pd.DataFrame.from_records(rows, columns=LINEUP_COLUMNS)
+
+
+# ============================================
+# Aggregates
+# ============================================
+
+def player_form(lineups: pd.DataFrame, history: int = PLAYER_HISTORY) -> pd.DataFrame:
+    """
+    Each player's mean of STRENGTH_METRICS over their previous ``history``
+    games (across seasons), aligned with the lineup rows.
+
+    Rows for matches without statistics yet (named lineups) get the form
+    from the player's last games as well.
+    """
+    order = lineups.sort_values(["player_id", "year", "round"], kind="stable").index
+    ordered = lineups.loc[order]
+    values = ordered[STRENGTH_METRICS].astype(float)
+    # Shift by one so each row only sees games before it
+    previous = values.groupby(ordered["player_id"].to_numpy()).shift(1)
+    form = (previous.groupby(ordered["player_id"].to_numpy())
+            .rolling(history, min_periods=1).mean()
+            .reset_index(level=0, drop=True))
+    return form.reindex(lineups.index)
+
+
+def lineup_strength(lineups: pd.DataFrame, history: int = PLAYER_HISTORY,
+                    rounds: Optional[Sequence[Tuple[int, int]]] = None) -> pd.DataFrame:
+    """
+    Pre-match lineup strength for every (match, side): the mean player form
+    of each position group and of the whole lineup.
+
+    Parameters
+    ----------
+    lineups : pandas.DataFrame
+        Output of ``build_lineups`` (plus any ``named_lineup`` rows)
+    rounds : sequence of (year, round), optional
+        Only return these rounds; form still uses all earlier games
+
+    Returns
+    -------
+    pandas.DataFrame
+        year, round, match_key, team, team_id, home, players plus
+        ``{group}_{metric}`` and ``lineup_{metric}`` columns
+    """
+    form = player_form(lineups, history)
+    keys = ["year", "round", "match_key", "team"]
+    frame = pd.concat([lineups[keys + ["team_id", "home", "group"]], form], axis=1)
+    if rounds is not None:
+        wanted = pd.MultiIndex.from_tuples(list(rounds), names=["year", "round"])
+        frame = frame[pd.MultiIndex.from_frame(frame[["year", "round"]]).isin(wanted)]
+    frame = frame.assign(team=frame["team"].astype(str), group=frame["group"].astype(str))
+
+    sides = frame.groupby(keys, sort=False, observed=True)
+    overall = sides[STRENGTH_METRICS].mean().add_prefix("lineup_")
+    info = sides.agg(team_id=("team_id", "first"), home=("home", "first"), players=("group", "size"))
+
+    by_group = frame.groupby(keys + ["group"], sort=False, observed=True)[STRENGTH_METRICS].mean().unstack("group")
+    by_group = by_group.reindex(columns=pd.MultiIndex.from_product([STRENGTH_METRICS, GROUPS]))
+    by_group.columns = [f"{group}_{metric}" for metric, group in by_group.columns]
+
+    return info.join(overall).join(by_group).reset_index().sort_values(["year", "round", "match_key", "home"],
+                                                                       ascending=[True, True, True, False],
+                                                                       ignore_index=True)
+
+
+def strength_columns(strength: pd.DataFrame) -> List[str]:
+    """Aggregate columns of a ``lineup_strength`` frame"""
+    prefixes = tuple(f"{group}_" for group in [*GROUPS, "lineup"])
+    return [c for c in strength.columns if c.startswith(prefixes)]
+
+
+def _to_int(value) -> Optional[int]:
+    number = _to_float(value)
+    return None if np.isnan(number) else int(number)
+
+
+def _to_float(value) -> float:
+    try:
+        return float(str(value).replace("%", "").replace(",", "").strip())
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _to_minutes(value) -> float:
+    """Minutes from '80' or '52:10' style values"""
+    match = re.fullmatch(r"\s*(\d+)(?::(\d+))?\s*", str(value))
+    if match is None:
+        return np.nan
+    return int(match.group(1)) + int(match.group(2) or 0) / 60
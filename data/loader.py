@@ -0,0 +1,471 @@
+"""
+loader.py
+
+Streaming loader for the legacy nested NRL JSON files.
+
+Every data file written by the scrapers nests its records a few levels
+deep (competition -> year -> round -> match). This module walks those
+layouts once, validates each entry and yields typed records lazily, so
+consumers no longer index into ``data[SELECTION][0][str(year)][round]``
+by hand. Entries that cannot be read are recorded in a ``LoadReport``
+rather than silently dropped.
+
+Files are streamed with ``ijson`` when it is installed, so memory stays
+bounded to a single round; otherwise each file is parsed whole with
+``orjson`` (or the standard library ``json``) and walked the same way.
+"""
+
+import hashlib
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from config.paths import DATA_DIR
+from data.entities import TEAM_LISTS, team_id
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+try:
+    import orjson as _json
+
+    def _loads(raw: bytes) -> Any:
+        return _json.loads(raw)
+except ImportError:  # pragma: no cover - optional dependency
+    import json as _json
+
+    def _loads(raw: bytes) -> Any:
+        return _json.loads(raw)
+
+
+FILE_PATTERNS: Dict[str, str] = {
+    "match": "{selection}_data_{year}.json",
+    "detailed": "{selection}_detailed_match_data_{year}.json",
+    "player": "{selection}_player_statistics_{year}.json",
+}
+
+
+class MatchRecord(NamedTuple):
+    """One fixture from a ``{selection}_data_{year}.json`` file"""
+    competition: str
+    year: int
+    round: int
+    home: str
+    away: str
+    home_score: Optional[int]
+    away_score: Optional[int]
+    venue: Optional[str]
+    date: Any
+    match_centre_url: Optional[str]
+    home_id: Optional[int] = None
+    away_id: Optional[int] = None
+
+
+class DetailedMatchRecord(NamedTuple):
+    """One match from a ``{selection}_detailed_match_data_{year}.json`` file"""
+    competition: str
+    year: int
+    round: int
+    home: str
+    away: str
+    match: Dict[str, Any]
+    home_stats: Dict[str, Any]
+    away_stats: Dict[str, Any]
+
+
+class PlayerStatRecord(NamedTuple):
+    """One player row from a ``{selection}_player_statistics_{year}.json`` file"""
+    year: int
+    round: int
+    match_key: str
+    home: str
+    away: str
+    row: int
+    name: Optional[str]
+    stats: Dict[str, str]
+
+
+@dataclass
+class LoadIssue:
+    """A skipped or malformed entry and where it was found"""
+    path: str
+    location: str
+    reason: str
+
+
+@dataclass
+class LoadReport:
+    """
+    Running tally of what a load produced.
+
+    Attributes
+    ----------
+    loaded : int
+        Number of records yielded
+    issues : list
+        Every entry that was skipped or repaired, with the reason
+    """
+    loaded: int = 0
+    issues: List[LoadIssue] = field(default_factory=list)
+
+    @property
+    def skipped(self) -> int:
+        return len(self.issues)
+
+    def add(self, path: str, location: str, reason: str) -> None:
+        self.issues.append(LoadIssue(path, location, reason))
+
+    def summary(self) -> str:
+        lines = [f"Loaded {self.loaded} records, {self.skipped} issues"]
+        lines += [f"  {i.path} [{i.location}]: {i.reason}" for i in self.issues]
+        return "\n".join(lines)
+
+
+def season_path(selection: str, year: int, kind: str = "match", base_path: str = DATA_DIR) -> str:
+    """
+    Path of a season file in the layout written by the scrapers and downloader.
+
+    Parameters
+    ----------
+    selection : str
+        Competition name (e.g. 'NRL')
+    year : int
+        Season
+    kind : str
+        One of 'match', 'detailed' or 'player'
+    base_path : str, optional
+        Data directory (defaults to this package)
+    """
+    filename = FILE_PATTERNS[kind].format(selection=selection, year=year)
+    return os.path.join(base_path, selection, str(year), filename)
+
+
+def file_fingerprint(paths: Iterable[str]) -> str:
+    """
+    Cheap version string from the size and mtime of each file.
+    Missing files contribute a fixed marker so creating them changes the version.
+    """
+    digest = hashlib.sha1()
+    for path in sorted(paths):
+        try:
+            stat = os.stat(path)
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        except OSError:
+            digest.update(f"{path}:missing".encode())
+    return digest.hexdigest()[:12]
+
+
+def data_version(selection: str, years: Iterable[int], kinds: Iterable[str] = ("match",),
+                 base_path: str = DATA_DIR) -> str:
+    """Fingerprint of the season files a load of these years would read"""
+    return file_fingerprint(season_path(selection, year, kind, base_path) for year in years for kind in kinds)
+
+
+# ============================================
+# Raw layout walkers
+# ============================================
+
+def _stream_nested(path: str, root: str) -> Iterator[Tuple[str, int, Any]]:
+    """
+    Yield (key, index, item) for every ``root: [{key: [item, ...]}]`` entry.
+
+    Only one item is held in memory at a time when ijson is available.
+    """
+    if ijson is not None:
+        pattern = re.compile(rf"^{re.escape(root)}\.item\.([^.]+)\.item$")
+        with open(path, "rb") as file:
+            events = ijson.parse(file, use_float=True)
+            counters: Dict[str, int] = {}
+            for prefix, event, value in events:
+                match = pattern.match(prefix)
+                if not match or event not in ("start_map", "start_array", "string", "number", "null", "boolean"):
+                    continue
+                key = match.group(1)
+                index = counters.get(key, 0)
+                counters[key] = index + 1
+                if event in ("start_map", "start_array"):
+                    builder = ijson.ObjectBuilder()
+                    builder.event(event, value)
+                    depth = 1
+                    for _, inner_event, inner_value in events:
+                        builder.event(inner_event, inner_value)
+                        if inner_event in ("start_map", "start_array"):
+                            depth += 1
+                        elif inner_event in ("end_map", "end_array"):
+                            depth -= 1
+                            if depth == 0:
+                                break
+                    yield key, index, builder.value
+                else:
+                    yield key, index, value
+        return
+
+    with open(path, "rb") as file:
+        data = _loads(file.read())
+    for container in data.get(root, []) if isinstance(data, dict) else []:
+        if not isinstance(container, dict):
+            continue
+        for key, items in container.items():
+            for index, item in enumerate(items if isinstance(items, list) else []):
+                yield key, index, item
+
+
+def _stream_items(path: str, root: str) -> Iterator[Tuple[int, Any]]:
+    """Yield (index, item) for every ``root: [item, ...]`` entry"""
+    if ijson is not None:
+        with open(path, "rb") as file:
+            yield from enumerate(ijson.items(file, f"{root}.item", use_float=True))
+        return
+
+    with open(path, "rb") as file:
+        data = _loads(file.read())
+    items = data.get(root, []) if isinstance(data, dict) else []
+    yield from enumerate(items)
+
+
+def _single_entry(value: Any) -> Optional[Tuple[str, Any]]:
+    """Unwrap the ``{key: value}`` wrappers used for rounds and matches"""
+    if isinstance(value, dict) and len(value) == 1:
+        return next(iter(value.items()))
+    return None
+
+
+def _to_score(value: Any) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    return int(value)
+
+
+def played_scores(game: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    (home, away) score of a completed match, else (None, None).
+
+    A ``Match_State`` other than full time means the match has not finished.
+    Files written before the state was stored recorded unplayed fixtures as
+    0-0, so a 0-0 without a state is read as unplayed too.
+    """
+    home, away = _to_score(game.get("Home_Score")), _to_score(game.get("Away_Score"))
+    if home is None or away is None:
+        return None, None
+    state = game.get("Match_State")
+    if state is not None:
+        return (home, away) if str(state).replace(" ", "").lower() == "fulltime" else (None, None)
+    return (None, None) if home == 0 and away == 0 else (home, away)
+
+
+def match_code(year, round_num, home_id, away_id):
+    """Single integer key per fixture (also works element-wise on numpy arrays)"""
+    return year * 1_000_000 + round_num * 10_000 + home_id * 100 + away_id
+
+
+def _team_id(game: Dict[str, Any], side: str, selection: str) -> Optional[int]:
+    """Stored team ID, or the registry ID for files scraped before IDs were kept"""
+    stored = game.get(f"{side}_Id")
+    if stored is not None:
+        return int(stored)
+    if selection not in TEAM_LISTS:
+        return None
+    return team_id(game[side], selection)
+
+
+def _split_match_name(name: str, separator: str) -> Optional[Tuple[str, str]]:
+    parts = name.split(separator)
+    if len(parts) != 2 or not all(parts):
+        return None
+    return parts[0], parts[1]
+
+
+# ============================================
+# Typed record loaders
+# ============================================
+
+def iter_match_rounds(path: str, selection: str, report: Optional[LoadReport] = None) -> Iterator[Tuple[int, int, List[MatchRecord]]]:
+    """
+    Yield (year, round, matches) for each round of a match data file.
+
+    Parameters
+    ----------
+    path : str
+        Path to a ``{selection}_data_{year}.json`` file
+    selection : str
+        Competition key at the top of the file
+    report : LoadReport, optional
+        Collects skipped and malformed entries
+    """
+    report = report if report is not None else LoadReport()
+
+    for year_key, index, round_entry in _stream_nested(path, selection):
+        location = f"{year_key}[{index}]"
+        entry = _single_entry(round_entry)
+        if entry is None:
+            report.add(path, location, "round entry is not a single {round: [matches]} mapping")
+            continue
+
+        round_key, games = entry
+        try:
+            year, round_num = int(year_key), int(round_key)
+        except ValueError:
+            report.add(path, location, f"non-numeric year or round key {year_key!r}/{round_key!r}")
+            continue
+        if round_num != index + 1:
+            report.add(path, location, f"round key {round_num} out of sequence (expected {index + 1})")
+        if not isinstance(games, list):
+            report.add(path, f"{location}.{round_key}", "round has no match list")
+            continue
+
+        matches = []
+        for game_index, game in enumerate(games):
+            game_location = f"{year}/round {round_num}/match {game_index}"
+            try:
+                home_score, away_score = played_scores(game)
+                matches.append(MatchRecord(
+                    competition=selection,
+                    year=year,
+                    round=round_num,
+                    home=game["Home"],
+                    away=game["Away"],
+                    home_score=home_score,
+                    away_score=away_score,
+                    venue=game.get("Venue"),
+                    date=game.get("Date"),
+                    match_centre_url=game.get("Match_Centre_URL"),
+                    home_id=_team_id(game, "Home", selection),
+                    away_id=_team_id(game, "Away", selection),
+                ))
+            except (KeyError, TypeError) as ex:
+                report.add(path, game_location, f"missing field {ex}")
+            except ValueError as ex:
+                report.add(path, game_location, f"invalid score: {ex}")
+
+        report.loaded += len(matches)
+        yield year, round_num, matches
+
+
+def iter_matches(path: str, selection: str, report: Optional[LoadReport] = None) -> Iterator[MatchRecord]:
+    """Yield every match in a match data file, in round order"""
+    for _, _, matches in iter_match_rounds(path, selection, report):
+        yield from matches
+
+
+def iter_detailed_matches(path: str, selection: str, year: int, report: Optional[LoadReport] = None) -> Iterator[DetailedMatchRecord]:
+    """
+    Yield every match in a detailed match data file.
+
+    The detailed files do not store the season, so it must be supplied.
+    """
+    report = report if report is not None else LoadReport()
+
+    for index, round_entry in _stream_items(path, selection):
+        entry = _single_entry(round_entry)
+        if entry is None:
+            report.add(path, f"[{index}]", "round entry is not a single {round: [matches]} mapping")
+            continue
+
+        round_key, games = entry
+        try:
+            round_num = int(round_key)
+        except ValueError:
+            report.add(path, f"[{index}]", f"non-numeric round key {round_key!r}")
+            continue
+
+        for game_index, game in enumerate(games if isinstance(games, list) else []):
+            location = f"round {round_num}/match {game_index}"
+            game_entry = _single_entry(game)
+            teams = _split_match_name(game_entry[0], " v ") if game_entry else None
+            if teams is None:
+                report.add(path, location, "match entry is not a single {'Home v Away': data} mapping")
+                continue
+
+            details = game_entry[1]
+            if not isinstance(details, dict) or not {"match", "home", "away"} <= details.keys():
+                report.add(path, location, "match data missing 'match', 'home' or 'away'")
+                continue
+
+            report.loaded += 1
+            yield DetailedMatchRecord(selection, year, round_num, teams[0], teams[1],
+                                      details["match"], details["home"], details["away"])
+
+
+def iter_player_stats(path: str, report: Optional[LoadReport] = None) -> Iterator[PlayerStatRecord]:
+    """
+    Yield one record per player row in a player statistics file.
+
+    Round keys in these files are zero based; records carry the real round.
+    """
+    report = report if report is not None else LoadReport()
+
+    for year_key, index, round_entry in _stream_nested(path, "PlayerStats"):
+        location = f"{year_key}[{index}]"
+        entry = _single_entry(round_entry)
+        if entry is None:
+            report.add(path, location, "round entry is not a single {round: [matches]} mapping")
+            continue
+
+        round_key, games = entry
+        try:
+            year, round_num = int(year_key), int(round_key) + 1
+        except ValueError:
+            report.add(path, location, f"non-numeric year or round key {year_key!r}/{round_key!r}")
+            continue
+
+        for game_index, game in enumerate(games if isinstance(games, list) else []):
+            game_location = f"{year}/round {round_num}/match {game_index}"
+            game_entry = _single_entry(game)
+            if game_entry is None or not isinstance(game_entry[1], list):
+                report.add(path, game_location, "match entry is not a single {match_key: [players]} mapping")
+                continue
+
+            match_key, players = game_entry
+            teams = _split_match_name(match_key.split("-", 2)[-1], "-v-")
+            if teams is None:
+                report.add(path, game_location, f"unrecognised match key {match_key!r}")
+                continue
+            home, away = [team.replace("-", " ") for team in teams]
+
+            for row, player in enumerate(players):
+                if not isinstance(player, dict):
+                    report.add(path, f"{game_location}/row {row}", "player row is not a mapping")
+                    continue
+                stats = {k: v for k, v in player.items() if k != "Name"}
+                report.loaded += 1
+                yield PlayerStatRecord(year, round_num, match_key, home, away, row, player.get("Name"), stats)
+
+
+def away_start(numbers: List[Optional[int]]) -> int:
+    """
+    Index of the first away player in one match's player rows: the home side
+    is listed first, so the away side starts where the jersey numbers restart
+    (or half way down when numbers are missing).
+    """
+    for index in range(1, len(numbers)):
+        if numbers[index] is not None and numbers[index - 1] is not None and numbers[index] <= numbers[index - 1]:
+            return index
+    return len(numbers) // 2
+
+
+def iter_seasons(selection: str, years: Iterable[int], kind: str = "match",
+                 base_path: str = DATA_DIR, report: Optional[LoadReport] = None) -> Iterator[NamedTuple]:
+    """
+    Chain the records of several season files lazily, one file open at a time.
+
+    Missing season files are recorded in the report instead of raising.
+    """
+    report = report if report is not None else LoadReport()
+
+    for year in years:
+        path = season_path(selection, year, kind, base_path)
+        if not os.path.exists(path):
+            report.add(path, str(year), "file not found")
+            continue
+        try:
+            if kind == "match":
+                yield from iter_matches(path, selection, report)
+            elif kind == "detailed":
+                yield from iter_detailed_matches(path, selection, year, report)
+            else:
+                yield from iter_player_stats(path, report)
+        except ValueError as ex:
+            report.add(path, str(year), f"invalid JSON: {ex}")
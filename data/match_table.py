@@ -0,0 +1,222 @@
+"""
+match_table.py
+
+Long-format (match, team) table built from the match data files.
+
+Every analysis notebook used to build one ``np.zeros(len(teams) * len(variables))``
+row per round, fill it game by game and append it to a wide DataFrame, with
+-1 sentinels for byes. This module builds the same information as one row
+per team per match in a single vectorized pass, so memory scales with games
+played. ``to_wide`` pivots back to the legacy "{team} {Variable}" layout for
+code that still expects it.
+
+Requires:
+    - pandas
+    - numpy
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from data.entities import get_registry
+from data.loader import DATA_DIR, DetailedMatchRecord, LoadReport, MatchRecord, iter_seasons
+
+# Legacy wide-table variable -> long-table column
+LEGACY_COLUMNS: Dict[str, str] = {
+    "Year": "year",
+    "Win": "win",
+    "Defense": "defense",
+    "Attack": "attack",
+    "Margin": "margin",
+    "Home": "home",
+    "Versus": "opponent_id",
+    "Round": "round",
+    "Halftime_Attack": "half_time",
+    "Halftime_Defense": "opp_half_time",
+    "Tries": "tries",
+    "FirstHalf_Tries": "first_half_tries",
+    "SecondHalf_Tries": "second_half_tries",
+    "FirstHalf_Tries_Other": "opp_first_half_tries",
+    "SecondHalf_Tries_Other": "opp_second_half_tries",
+}
+
+LEGACY_VARIABLES: List[str] = ["Year", "Win", "Defense", "Attack", "Margin", "Home", "Versus", "Round"]
+
+# Values the notebooks wrote for a team on a bye (anything not listed is -1)
+LEGACY_BYE_VALUES: Dict[str, int] = {"Margin": 0}
+
+
+def build_match_table(records: Iterable[MatchRecord]) -> pd.DataFrame:
+    """
+    Build the long (match, team) table from match records.
+
+    Each match produces a home row and an away row. Matches that are not
+    completed (see ``data.loader.played_scores``) have ``completed`` False
+    and keep null scores and results rather than zeros.
+
+    Parameters
+    ----------
+    records : iterable of MatchRecord
+        Typically ``data.loader.iter_seasons(...)``
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns: match_id, competition, year, round, team_id, team,
+        opponent_id, opponent, home, completed, attack, defense, margin, win,
+        venue, date
+    """
+    matches = pd.DataFrame.from_records(list(records), columns=MatchRecord._fields)
+    if matches.empty:
+        return _empty_table()
+
+    matches = matches.sort_values(["year", "round"], kind="stable", ignore_index=True)
+    order = matches.groupby(["year", "round"], sort=False).cumcount().to_numpy()
+    match_id = matches["year"].to_numpy(np.int64) * 100000 + matches["round"].to_numpy(np.int64) * 100 + order
+
+    home_score = matches["home_score"].astype("Int16")
+    away_score = matches["away_score"].astype("Int16")
+    completed = (home_score.notna() & away_score.notna()).to_numpy()
+
+    def side(team, team_id, opponent, opponent_id, scored, conceded, is_home):
+        return pd.DataFrame({
+            "match_id": match_id,
+            "competition": matches["competition"],
+            "year": matches["year"].astype(np.int16),
+            "round": matches["round"].astype(np.int8),
+            "team_id": matches[team_id].astype("Int16"),
+            "team": matches[team],
+            "opponent_id": matches[opponent_id].astype("Int16"),
+            "opponent": matches[opponent],
+            "home": np.full(len(matches), is_home, dtype=np.int8),
+            "completed": completed,
+            "attack": scored,
+            "defense": conceded,
+            "margin": scored - conceded,
+            # Draws count as a win for both sides, as in the original notebooks
+            "win": (scored >= conceded).astype("Int8"),
+            "venue": matches["venue"],
+            "date": matches["date"],
+        })
+
+    table = pd.concat([
+        side("home", "home_id", "away", "away_id", home_score, away_score, 1),
+        side("away", "away_id", "home", "home_id", away_score, home_score, 0),
+    ], ignore_index=True)
+
+    table = table.sort_values(["match_id", "home"], ascending=[True, False], kind="stable", ignore_index=True)
+    for column in ("competition", "team", "opponent", "venue"):
+        table[column] = table[column].astype("category")
+    return table
+
+
+def add_detailed_stats(table: pd.DataFrame, records: Iterable[DetailedMatchRecord],
+                       stats: Sequence[str] = ("half_time",)) -> pd.DataFrame:
+    """
+    Join per-team values from the detailed match data onto the long table.
+
+    Each requested stat becomes ``{stat}`` (this team) and ``opp_{stat}``
+    (the opponent). Files that still carry ``try_minutes`` also get try
+    counts split by half.
+    """
+    rows = []
+    for record in records:
+        for is_home, own, other in ((1, record.home_stats, record.away_stats), (0, record.away_stats, record.home_stats)):
+            row = {"year": record.year, "round": record.round, "team": record.home if is_home else record.away, "home": is_home}
+            for stat in stats:
+                row[stat] = _to_number(own.get(stat))
+                row[f"opp_{stat}"] = _to_number(other.get(stat))
+            if "try_minutes" in own:
+                row.update(_try_split(own.get("try_minutes"), ""))
+                row.update(_try_split(other.get("try_minutes"), "opp_"))
+            rows.append(row)
+
+    if not rows:
+        return table
+
+    detailed = pd.DataFrame.from_records(rows)
+    detailed["year"] = detailed["year"].astype(np.int16)
+    detailed["round"] = detailed["round"].astype(np.int8)
+    keys = ["year", "round", "team", "home"]
+    merged = table.assign(team=table["team"].astype(str)).merge(detailed, on=keys, how="left")
+    merged["team"] = merged["team"].astype("category")
+    return merged
+
+
+def load_match_table(selection: str, years: Iterable[int], base_path: str = DATA_DIR,
+                     report: Optional[LoadReport] = None, detailed_stats: Sequence[str] = ()) -> pd.DataFrame:
+    """
+    Load seasons from disk straight into the long table.
+
+    Parameters
+    ----------
+    selection : str
+        Competition name (e.g. 'NRL')
+    years : iterable of int
+        Seasons to include
+    detailed_stats : sequence of str, optional
+        Detailed match stats to join (e.g. ('half_time',))
+    """
+    years = list(years)
+    table = build_match_table(iter_seasons(selection, years, "match", base_path, report))
+    if detailed_stats:
+        table = add_detailed_stats(table, iter_seasons(selection, years, "detailed", base_path, report), detailed_stats)
+    return table
+
+
+def to_wide(table: pd.DataFrame, competition: str = "NRL", variables: Sequence[str] = LEGACY_VARIABLES,
+            teams: Optional[Sequence[str]] = None, legacy_byes: bool = False) -> pd.DataFrame:
+    """
+    Pivot the long table to one row per (year, round) with "{team} {Variable}" columns.
+
+    Byes are null unless ``legacy_byes`` is set, in which case they use the
+    -1 sentinels (and 0 margin) the original notebooks produced.
+    """
+    teams = list(teams) if teams is not None else get_registry().team_index(competition).names
+    columns = [LEGACY_COLUMNS.get(variable, variable) for variable in variables]
+
+    long = table.dropna(subset=["team_id"]).set_index(["year", "round", "team_id"])
+    value_columns = [c for c in dict.fromkeys(columns) if c not in ("year", "round")]
+    wide = long[value_columns].unstack("team_id")
+    wide = wide.reindex(columns=pd.MultiIndex.from_product([value_columns, range(len(teams))]))
+
+    result = {}
+    years = wide.index.get_level_values("year")
+    rounds = wide.index.get_level_values("round")
+    for team_id, team in enumerate(teams):
+        for variable, column in zip(variables, columns):
+            if column == "year":
+                values = pd.Series(years, index=wide.index)
+            elif column == "round":
+                values = pd.Series(rounds, index=wide.index)
+            else:
+                values = wide[(column, team_id)]
+                if legacy_byes:
+                    values = values.astype("Float64").fillna(LEGACY_BYE_VALUES.get(variable, -1)).astype(int)
+            result[f"{team} {variable}"] = values
+
+    return pd.DataFrame(result).reset_index(drop=True)
+
+
+def _empty_table() -> pd.DataFrame:
+    return pd.DataFrame(columns=["match_id", "competition", "year", "round", "team_id", "team", "opponent_id",
+                                 "opponent", "home", "completed", "attack", "defense", "margin", "win", "venue",
+                                 "date"])
+
+
+def _to_number(value) -> float:
+    try:
+        return float(str(value).replace("'", ""))
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _try_split(minutes, prefix: str) -> Dict[str, float]:
+    if not isinstance(minutes, list):
+        return {f"{prefix}tries": np.nan, f"{prefix}first_half_tries": np.nan, f"{prefix}second_half_tries": np.nan}
+    parsed = np.array([_to_number(m) for m in minutes], dtype=float)
+    second = int((parsed > 40).sum())
+    return {f"{prefix}tries": len(parsed), f"{prefix}first_half_tries": len(parsed) - second,
+            f"{prefix}second_half_tries": second}
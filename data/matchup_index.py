@@ -0,0 +1,265 @@
+"""
+matchup_index.py
+
+Precomputed head-to-head and venue statistics.
+
+Pairwise meeting aggregates (games, wins, draws, total margin and the last
+``LAST_MEETINGS`` margins) live in (team, team) arrays, and per-team splits
+live in (team, venue) and (team, home/away) arrays. Each completed match
+updates a handful of cells, once per match code, so the index follows the
+season match by match (a partly played round completes on a later update),
+and any (home, away, venue) lookup is a few array reads no matter how many
+seasons have been loaded. Venue columns use the shared entity registry's
+venue IDs, the same ``venue_id`` the fixture cache carries.
+
+    index = MatchupIndex.build(iter_seasons("NRL", range(2008, 2025)))
+    index.query(home_id, away_id, "Suncorp Stadium")
+
+Usage (from the repository root):
+    python -m data.matchup_index --years 2008-2025
+
+Requires:
+    - numpy
+"""
+
+import argparse
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from config.paths import MATCHUP_INDEX_PATH
+from data.entities import TEAM_LISTS, EntityIndex, get_registry, team_id
+from data.loader import match_code, played_scores
+
+
+# Number of most recent meetings kept per pair
+LAST_MEETINGS: int = 5
+
+# Columns of the count arrays
+GAMES, WINS, DRAWS, MARGIN = range(4)
+
+
+class MatchupIndex:
+    """
+    Attributes
+    ----------
+    pairs : numpy.ndarray
+        (team, opponent, 4) games, wins, draws and summed margin from the
+        team's side, kept symmetric
+    last : numpy.ndarray
+        (team, opponent, LAST_MEETINGS) most recent margins, newest first
+        (NaN where fewer meetings exist)
+    venues : numpy.ndarray
+        (team, venue, 4) the same aggregates per venue, by registry venue ID
+    sides : numpy.ndarray
+        (team, 2, 4) aggregates away (0) and at home (1)
+    through : tuple or None
+        Last (year, round) applied
+    applied : set
+        Match codes (``data.loader.match_code``) of every match applied
+    """
+
+    def __init__(self, n_teams: int, venue_index: Optional[EntityIndex] = None,
+                 last_meetings: int = LAST_MEETINGS) -> None:
+        self.venue_index = venue_index if venue_index is not None else get_registry().venues
+        self.pairs = np.zeros((n_teams, n_teams, 4))
+        self.last = np.full((n_teams, n_teams, last_meetings), np.nan)
+        self.venues = np.zeros((n_teams, max(len(self.venue_index), 1), 4))
+        self.sides = np.zeros((n_teams, 2, 4))
+        self.through: Optional[Tuple[int, int]] = None
+        self.applied: Set[int] = set()
+
+    @classmethod
+    def for_competition(cls, selection: str = "NRL", **params) -> "MatchupIndex":
+        return cls(len(TEAM_LISTS[selection]), **params)
+
+    # ============================================
+    # Updates
+    # ============================================
+
+    def _venue_id(self, venue: Union[str, int, None], create: bool = False) -> Optional[int]:
+        if venue is None or isinstance(venue, (int, np.integer)):
+            return venue
+        if not create:
+            return self.venue_index.resolve(venue)
+        venue_id = self.venue_index.id(venue, create=True)
+        if venue_id >= self.venues.shape[1]:
+            grow = max(venue_id + 1 - self.venues.shape[1], self.venues.shape[1])
+            self.venues = np.concatenate([self.venues, np.zeros((len(self.venues), grow, 4))], axis=1)
+        return venue_id
+
+    def update(self, year: int, round_num: int, home: int, away: int, home_score: float, away_score: float,
+               venue: Optional[str] = None) -> bool:
+        """Apply one completed match in O(1); returns False if it was already applied"""
+        code = match_code(year, round_num, home, away)
+        if code in self.applied:
+            return False
+        self.applied.add(code)
+        margin = home_score - away_score
+        for team, opponent, side, team_margin in ((home, away, 1, margin), (away, home, 0, -margin)):
+            result = np.array([1.0, team_margin > 0, team_margin == 0, team_margin])
+            self.pairs[team, opponent] += result
+            self.last[team, opponent, 1:] = self.last[team, opponent, :-1]
+            self.last[team, opponent, 0] = team_margin
+            self.sides[team, side] += result
+
+        venue_id = self._venue_id(venue, create=True)
+        if venue_id is not None:
+            self.venues[home, venue_id] += np.array([1.0, margin > 0, margin == 0, margin])
+            self.venues[away, venue_id] += np.array([1.0, margin < 0, margin == 0, -margin])
+        self.through = max(self.through or (year, round_num), (year, round_num))
+        return True
+
+    def update_round(self, round_data: Dict[str, List[dict]], year: int, selection: str = "NRL") -> int:
+        """
+        Apply a round as returned by ``get_nrl_data`` ({round: [matches]}).
+
+        Matches that are not completed (see ``data.loader.played_scores``) or
+        were applied before are skipped, so a round can be re-applied as its
+        matches finish without double counting. Returns the number applied.
+        """
+        applied = 0
+        for round_key, matches in round_data.items():
+            round_num = int(round_key)
+            for match in matches:
+                home = match["Home_Id"] if match.get("Home_Id") is not None else team_id(match["Home"], selection)
+                away = match["Away_Id"] if match.get("Away_Id") is not None else team_id(match["Away"], selection)
+                home_score, away_score = played_scores(match)
+                if home is None or away is None or home_score is None:
+                    continue
+                applied += self.update(year, round_num, home, away, float(home_score), float(away_score),
+                                       match.get("Venue"))
+        return applied
+
+    @classmethod
+    def build(cls, records: Iterable, selection: str = "NRL", **params) -> "MatchupIndex":
+        """Build from loader MatchRecords in chronological order"""
+        index = cls.for_competition(selection, **params)
+        for record in records:
+            if None in (record.home_id, record.away_id, record.home_score, record.away_score):
+                continue
+            index.update(record.year, record.round, record.home_id, record.away_id,
+                         record.home_score, record.away_score, record.venue)
+        return index
+
+    # ============================================
+    # Queries
+    # ============================================
+
+    def head_to_head(self, team: int, opponent: int) -> Dict[str, float]:
+        """Meeting record from ``team``'s side"""
+        games, wins, draws, margin = self.pairs[team, opponent]
+        last = self.last[team, opponent]
+        recent = last[~np.isnan(last)]
+        return {
+            "games": int(games),
+            "wins": int(wins),
+            "draws": int(draws),
+            "losses": int(games - wins - draws),
+            "win_rate": float(wins / games) if games else None,
+            "margin_mean": float(margin / games) if games else None,
+            "last_margins": [float(m) for m in recent],
+            "last_margin_mean": float(recent.mean()) if len(recent) else None,
+        }
+
+    def venue_record(self, team: int, venue: Union[str, int, None]) -> Dict[str, float]:
+        """Record at a venue (zeros for an unknown venue)"""
+        venue_id = self._venue_id(venue)
+        counts = (self.venues[team, venue_id] if venue_id is not None and venue_id < self.venues.shape[1]
+                  else np.zeros(4))
+        return _record(counts)
+
+    def side_record(self, team: int, home: bool) -> Dict[str, float]:
+        """Record at home or away"""
+        return _record(self.sides[team, int(home)])
+
+    def query(self, home: int, away: int, venue: Union[str, int, None] = None) -> Dict[str, object]:
+        """Everything known about a fixture, as served by the predictions API"""
+        return {
+            "head_to_head": self.head_to_head(home, away),
+            "home_at_home": self.side_record(home, True),
+            "away_on_road": self.side_record(away, False),
+            "home_at_venue": self.venue_record(home, venue),
+            "away_at_venue": self.venue_record(away, venue),
+        }
+
+    def match_features(self, home: int, away: int, venue: Union[str, int, None] = None) -> Dict[str, float]:
+        """Flat numeric features for a fixture (NaN where there is no history)"""
+        games, wins, _, margin = self.pairs[home, away]
+        last = self.last[home, away]
+        venue_id = self._venue_id(venue)
+        known = venue_id is not None and venue_id < self.venues.shape[1]
+        home_venue = self.venues[home, venue_id] if known else np.zeros(4)
+        away_venue = self.venues[away, venue_id] if known else np.zeros(4)
+        home_side, away_side = self.sides[home, 1], self.sides[away, 0]
+        return {
+            "h2h_games": float(games),
+            "h2h_win_rate": _ratio(wins, games),
+            "h2h_margin_mean": _ratio(margin, games),
+            "h2h_last_margin_mean": float(np.nanmean(last)) if not np.isnan(last).all() else np.nan,
+            "venue_home_games": float(home_venue[GAMES]),
+            "venue_home_win_rate": _ratio(home_venue[WINS], home_venue[GAMES]),
+            "venue_away_win_rate": _ratio(away_venue[WINS], away_venue[GAMES]),
+            "venue_home_side_margin": _ratio(home_side[MARGIN], home_side[GAMES]),
+            "venue_away_side_margin": _ratio(away_side[MARGIN], away_side[GAMES]),
+        }
+
+    # ============================================
+    # Persistence
+    # ============================================
+
+    def save(self, path: str = MATCHUP_INDEX_PATH) -> None:
+        np.savez_compressed(path, pairs=self.pairs, last=self.last, venues=self.venues, sides=self.sides,
+                            venue_names=np.array(self.venue_index.names[:self.venues.shape[1]], dtype=str),
+                            through=np.array(self.through or (0, 0)),
+                            applied=np.array(sorted(self.applied), dtype=np.int64))
+
+    @classmethod
+    def load(cls, path: str = MATCHUP_INDEX_PATH, venue_index: Optional[EntityIndex] = None) -> "MatchupIndex":
+        """Load a saved index, moving its venue columns to the registry's current venue IDs"""
+        with np.load(path) as data:
+            index = cls(len(data["pairs"]), venue_index, data["last"].shape[2])
+            index.pairs, index.last = data["pairs"].copy(), data["last"].copy()
+            index.sides = data["sides"].copy()
+            for column, name in enumerate(data["venue_names"]):
+                index.venues[:, index._venue_id(str(name), create=True)] = data["venues"][:, column]
+            through = tuple(int(x) for x in data["through"])
+            index.through = through if through != (0, 0) else None
+            # Files saved before applied matches were tracked have none
+            index.applied = set(int(code) for code in data["applied"]) if "applied" in data else set()
+        return index
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    return float(numerator / denominator) if denominator else np.nan
+
+
+def _record(counts: np.ndarray) -> Dict[str, float]:
+    games, wins, draws, margin = counts
+    return {
+        "games": int(games),
+        "wins": int(wins),
+        "draws": int(draws),
+        "win_rate": float(wins / games) if games else None,
+        "margin_mean": float(margin / games) if games else None,
+    }
+
+
+if __name__ == "__main__":
+    from data.loader import LoadReport, iter_seasons
+
+    parser = argparse.ArgumentParser(description="Build the head-to-head and venue statistics index")
+    parser.add_argument("--selection", default="NRL")
+    parser.add_argument("--years", default="2008-2025", help="first-last season, e.g. 2008-2025")
+    parser.add_argument("--output", default=MATCHUP_INDEX_PATH)
+    args = parser.parse_args()
+
+    first, last = (int(year) for year in args.years.split("-"))
+    report = LoadReport()
+    index = MatchupIndex.build(iter_seasons(args.selection, range(first, last + 1), report=report), args.selection)
+    if report.issues:
+        print(report.summary())
+    index.save(args.output)
+    # Keep newly seen venue IDs stable for the fixture cache and the next load
+    get_registry().save_changes()
+    print(f"Saved {int(index.pairs[..., GAMES].sum() / 2)} matches through {index.through} to {args.output}")
@@ -0,0 +1,350 @@
+"""
+odds.py
+
+Time-indexed odds store with margin-free implied probabilities.
+
+Odds snapshots (one price for one selection of one market of one fixture
+at one time, from one bookmaker) are ingested from local CSV / JSON lines
+files or from a local stand-in server that returns the same records as
+JSON. They are kept as typed columns sorted by (fixture, market,
+selection, bookmaker, time), so thousands of snapshots per round cost a
+few bytes each, and a fixture's history or the prices at any moment are
+found with binary searches and one vectorized pass.
+
+    store = OddsStore.load("NRL", 2026)
+    store.ingest_file("odds_round_3.jsonl")
+    h2h = store.h2h(at="2026-03-20T18:00:00")       # one row per fixture
+    value_bets(h2h, model_probabilities, min_edge=0.05)
+
+A snapshot record has: timestamp (ISO string or epoch ms), year, round,
+home, away (names or IDs), market ('h2h', 'line' or 'total'),
+selection ('home', 'away', 'draw', 'over' or 'under'), price (decimal
+odds) and optionally line (handicap or points) and bookmaker.
+
+Usage (from the repository root):
+    python -m data.odds --year 2026 odds/*.jsonl http://localhost:8001/odds
+
+Requires:
+    - pandas
+    - numpy
+    - httpx, through scraping.utilities.http_client (only for server ingestion)
+"""
+
+import argparse
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from config.paths import DATA_DIR, odds_path
+from data.entities import team_id
+from data.loader import match_code
+
+MARKETS: List[str] = ["h2h", "line", "total"]
+SELECTIONS: List[str] = ["home", "away", "draw", "over", "under"]
+
+# Sort order of the store; a fixture's rows are contiguous
+SORT_COLUMNS: List[str] = ["fixture", "market", "selection", "bookmaker", "timestamp"]
+
+SNAPSHOT_COLUMNS: List[str] = ["timestamp", "year", "round", "home", "away", "market", "selection",
+                               "price", "line", "bookmaker"]
+
+Timestamp = Union[str, int, float, pd.Timestamp, None]
+
+
+def fixture_code(year, round_num, home_id, away_id) -> np.ndarray:
+    """Single int64 key per fixture (vectorized over arrays); see data.loader.match_code"""
+    return match_code(*(np.asarray(value, dtype=np.int64) for value in (year, round_num, home_id, away_id)))
+
+
+# ============================================
+# Probabilities
+# ============================================
+
+def implied_probabilities(prices: np.ndarray, method: str = "power", iterations: int = 20) -> np.ndarray:
+    """
+    Margin-free implied probabilities for a (markets, outcomes) array of decimal odds.
+
+    Missing prices (NaN) are ignored within their row. ``proportional``
+    divides each 1/price by the row's book total; ``power`` finds k with
+    sum((1/price) ** k) = 1, which moves more of the bookmaker margin onto
+    long shots (the favourite-longshot bias).
+    """
+    raw = 1.0 / np.atleast_2d(np.asarray(prices, dtype=float))
+    if method == "proportional":
+        return raw / np.nansum(raw, axis=1, keepdims=True)
+    if method != "power":
+        raise ValueError(f"Unknown method {method!r}; choose 'proportional' or 'power'")
+
+    # Newton steps on f(k) = sum(raw ** k) - 1, all rows at once
+    k = np.ones((len(raw), 1))
+    log_raw = np.log(raw)
+    for _ in range(iterations):
+        powered = raw ** k
+        f = np.nansum(powered, axis=1, keepdims=True) - 1.0
+        slope = np.nansum(powered * log_raw, axis=1, keepdims=True)
+        k = k - f / np.where(slope == 0, -1e-12, slope)
+    probabilities = raw ** k
+    return probabilities / np.nansum(probabilities, axis=1, keepdims=True)
+
+
+def book_margin(prices: np.ndarray) -> np.ndarray:
+    """Overround of each row of decimal odds (0.05 = 5% margin)"""
+    return np.nansum(1.0 / np.atleast_2d(np.asarray(prices, dtype=float)), axis=1) - 1.0
+
+
+def value_bets(h2h: pd.DataFrame, model: pd.DataFrame, min_edge: float = 0.0) -> pd.DataFrame:
+    """
+    Compare model win probabilities with a head-to-head odds table.
+
+    Parameters
+    ----------
+    h2h : pandas.DataFrame
+        Output of ``OddsStore.h2h``
+    model : pandas.DataFrame
+        year, round, home_id, away_id and home_prob (model P(home win))
+    min_edge : float
+        Minimum expected return per unit (model probability * price - 1)
+
+    Returns
+    -------
+    pandas.DataFrame
+        The joined rows with home_edge, away_edge, the better side as
+        ``value_side`` and ``is_value`` where its edge exceeds min_edge
+    """
+    keys = ["year", "round", "home_id", "away_id"]
+    joined = model.merge(h2h, on=keys, how="inner")
+    home_prob = joined["home_prob"].to_numpy(dtype=float)
+    joined["home_edge"] = home_prob * joined["home_odds"].to_numpy(dtype=float) - 1.0
+    joined["away_edge"] = (1.0 - home_prob) * joined["away_odds"].to_numpy(dtype=float) - 1.0
+    joined["model_edge"] = home_prob - joined["home_implied"].to_numpy(dtype=float)
+
+    home_better = joined["home_edge"].to_numpy() >= joined["away_edge"].to_numpy()
+    best_edge = np.where(home_better, joined["home_edge"], joined["away_edge"])
+    joined["value_side"] = np.where(home_better, "home", "away")
+    joined["is_value"] = best_edge > min_edge
+    return joined
+
+
+# ============================================
+# Store
+# ============================================
+
+class OddsStore:
+    """
+    Attributes
+    ----------
+    frame : pandas.DataFrame
+        Every snapshot, sorted by SORT_COLUMNS: fixture, year, round,
+        home_id, away_id, market, selection, bookmaker, timestamp (UTC),
+        price, line
+    """
+
+    def __init__(self, selection: str = "NRL", frame: Optional[pd.DataFrame] = None) -> None:
+        self.selection = selection
+        self._frame = frame if frame is not None else _empty_frame()
+        self._pending: List[pd.DataFrame] = []
+
+    # ============================================
+    # Ingestion
+    # ============================================
+
+    def add(self, snapshots: Union[pd.DataFrame, Iterable[dict]]) -> int:
+        """
+        Append snapshot records; returns how many were kept.
+
+        Rows with an unknown team, market or selection, or a price of 1.0
+        or less, are dropped.
+        """
+        raw = snapshots if isinstance(snapshots, pd.DataFrame) else pd.DataFrame.from_records(list(snapshots))
+        if raw.empty:
+            return 0
+        raw = raw.reindex(columns=SNAPSHOT_COLUMNS)
+
+        home_id = _team_ids(raw["home"], self.selection)
+        away_id = _team_ids(raw["away"], self.selection)
+        frame = pd.DataFrame({
+            "year": pd.to_numeric(raw["year"], errors="coerce"),
+            "round": pd.to_numeric(raw["round"], errors="coerce"),
+            "home_id": home_id,
+            "away_id": away_id,
+            "market": pd.Categorical(raw["market"].fillna("h2h").str.lower(), categories=MARKETS),
+            "selection": pd.Categorical(raw["selection"].str.lower(), categories=SELECTIONS),
+            "bookmaker": raw["bookmaker"].fillna("default").astype(str),
+            "timestamp": _to_timestamps(raw["timestamp"]),
+            "price": pd.to_numeric(raw["price"], errors="coerce").astype("float32"),
+            "line": pd.to_numeric(raw["line"], errors="coerce").astype("float32"),
+        })
+        valid = (frame[["year", "round", "home_id", "away_id", "timestamp"]].notna().all(axis=1)
+                 & frame["market"].notna() & frame["selection"].notna() & (frame["price"] > 1.0))
+        frame = frame[valid].copy()
+        for column in ("year", "round", "home_id", "away_id"):
+            frame[column] = frame[column].astype(np.int16)
+        frame.insert(0, "fixture", fixture_code(frame["year"], frame["round"], frame["home_id"], frame["away_id"]))
+        self._pending.append(frame)
+        return len(frame)
+
+    def ingest_file(self, path: str) -> int:
+        """Ingest a .csv, .jsonl or .json (list of records) snapshot file"""
+        if path.endswith(".csv"):
+            return self.add(pd.read_csv(path))
+        if path.endswith(".jsonl"):
+            return self.add(pd.read_json(path, lines=True, dtype=False))
+        with open(path, encoding="utf-8") as f:
+            return self.add(json.load(f))
+
+    def ingest_url(self, url: str, timeout: float = 30) -> int:
+        """
+        Ingest the JSON list of snapshot records served at a URL (e.g. a local
+        stand-in server), through the shared client's per-host rate limit,
+        backoff and circuit breaker
+        """
+        from scraping.utilities.http_client import get_client
+
+        response = get_client().get(url, timeout=timeout)
+        response.raise_for_status()
+        return self.add(response.json())
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """All snapshots, merging and sorting pending appends once"""
+        if self._pending:
+            merged = pd.concat([self._frame, *self._pending], ignore_index=True)
+            merged["market"] = pd.Categorical(merged["market"], categories=MARKETS)
+            merged["selection"] = pd.Categorical(merged["selection"], categories=SELECTIONS)
+            merged = merged.drop_duplicates(subset=SORT_COLUMNS, keep="last")
+            self._frame = merged.sort_values(SORT_COLUMNS, kind="stable", ignore_index=True)
+            self._pending.clear()
+        return self._frame
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    # ============================================
+    # Queries
+    # ============================================
+
+    def history(self, year: int, round_num: int, home_id: int, away_id: int,
+                market: str = "h2h") -> pd.DataFrame:
+        """Every snapshot of one fixture's market, found by binary search"""
+        frame = self.frame
+        code = fixture_code(year, round_num, home_id, away_id)
+        start, end = np.searchsorted(frame["fixture"].to_numpy(), [code, code + 1])
+        rows = frame.iloc[start:end]
+        return rows[rows["market"] == market].reset_index(drop=True)
+
+    def latest(self, at: Timestamp = None, market: str = "h2h",
+               rounds: Optional[Sequence[tuple]] = None) -> pd.DataFrame:
+        """Last price per (fixture, selection, bookmaker) at or before ``at`` (default: now)"""
+        frame = self.frame
+        mask = (frame["market"] == market).to_numpy(copy=True)
+        if at is not None:
+            mask &= (frame["timestamp"] <= _to_timestamps(pd.Series([at])).iloc[0]).to_numpy()
+        if rounds is not None:
+            wanted = pd.MultiIndex.from_tuples(list(rounds))
+            mask &= pd.MultiIndex.from_arrays([frame["year"], frame["round"]]).isin(wanted)
+        current = frame[mask]
+        # Rows are time-sorted within each group, so the last one is the latest
+        return current.drop_duplicates(subset=["fixture", "selection", "bookmaker"], keep="last")
+
+    def h2h(self, at: Timestamp = None, method: str = "power",
+            rounds: Optional[Sequence[tuple]] = None) -> pd.DataFrame:
+        """
+        One row per fixture with the best available home and away prices at
+        ``at``, the consensus margin-free probabilities (mean over
+        bookmakers) and the average bookmaker margin.
+        """
+        latest = self.latest(at, "h2h", rounds)
+        latest = latest[latest["selection"].isin(["home", "away"])]
+        keys = ["fixture", "year", "round", "home_id", "away_id"]
+        if latest.empty:
+            return pd.DataFrame(columns=[*keys[1:], "home_odds", "away_odds", "home_implied", "away_implied",
+                                         "margin", "bookmakers", "updated"])
+
+        books = latest.pivot_table(index=[*keys, "bookmaker"], columns="selection", values="price",
+                                   aggfunc="last", observed=True).reindex(columns=["home", "away"])
+        # Prices are stored as float32; round away the widening noise
+        books = books.astype(float).round(4)
+        prices = books.to_numpy(dtype=float)
+        books["home_implied"], books["away_implied"] = implied_probabilities(prices, method).T
+        books["margin"] = book_margin(prices)
+
+        grouped = books.groupby(level=keys, sort=True)
+        result = pd.DataFrame({
+            "home_odds": grouped["home"].max(),
+            "away_odds": grouped["away"].max(),
+            "home_implied": grouped["home_implied"].mean(),
+            "away_implied": grouped["away_implied"].mean(),
+            "margin": grouped["margin"].mean(),
+            "bookmakers": grouped.size(),
+        })
+        result["updated"] = latest.groupby(keys, sort=True, observed=True)["timestamp"].max()
+        return result.reset_index().drop(columns="fixture")
+
+    # ============================================
+    # Persistence
+    # ============================================
+
+    def save(self, year: int, base_path: str = DATA_DIR) -> str:
+        """Write one season of snapshots; returns the path"""
+        path = odds_path(self.selection, year, base_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        frame = self.frame
+        frame[frame["year"] == year].to_pickle(path, compression="gzip")
+        return path
+
+    @classmethod
+    def load(cls, selection: str = "NRL", year: Optional[int] = None, base_path: str = DATA_DIR) -> "OddsStore":
+        """Load a saved season (an empty store when none exists)"""
+        path = odds_path(selection, year, base_path) if year is not None else None
+        if path is None or not os.path.exists(path):
+            return cls(selection)
+        return cls(selection, pd.read_pickle(path, compression="gzip"))
+
+
+def _empty_frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        "fixture": pd.Series(dtype=np.int64),
+        "year": pd.Series(dtype=np.int16),
+        "round": pd.Series(dtype=np.int16),
+        "home_id": pd.Series(dtype=np.int16),
+        "away_id": pd.Series(dtype=np.int16),
+        "market": pd.Categorical([], categories=MARKETS),
+        "selection": pd.Categorical([], categories=SELECTIONS),
+        "bookmaker": pd.Series(dtype=object),
+        "timestamp": pd.Series(dtype="datetime64[ns, UTC]"),
+        "price": pd.Series(dtype=np.float32),
+        "line": pd.Series(dtype=np.float32),
+    })
+
+
+def _team_ids(values: pd.Series, selection: str) -> pd.Series:
+    """Team IDs from names or IDs, resolving each distinct name once"""
+    numeric = pd.to_numeric(values, errors="coerce")
+    names = values[numeric.isna() & values.notna()].astype(str)
+    lookup = {name: team_id(name, selection) for name in names.unique()}
+    return numeric.fillna(names.map(lookup)).astype("Float64")
+
+
+def _to_timestamps(values: pd.Series) -> pd.Series:
+    """UTC timestamps from ISO strings or epoch milliseconds"""
+    numeric = pd.to_numeric(values, errors="coerce")
+    from_numbers = pd.to_datetime(numeric, unit="ms", utc=True)
+    from_strings = pd.to_datetime(values.where(numeric.isna()), utc=True, errors="coerce", format="mixed")
+    return from_numbers.fillna(from_strings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest odds snapshots into the season odds store")
+    parser.add_argument("sources", nargs="+", help="snapshot files (.csv, .jsonl, .json) or http(s) URLs")
+    parser.add_argument("--selection", default="NRL")
+    parser.add_argument("--year", type=int, required=True)
+    args = parser.parse_args()
+
+    store = OddsStore.load(args.selection, args.year)
+    for source in args.sources:
+        kept = store.ingest_url(source) if source.startswith(("http://", "https://")) else store.ingest_file(source)
+        print(f"{source}: {kept} snapshots")
+    print(f"Saved {len(store)} snapshots to {store.save(args.year)}")
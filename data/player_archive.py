@@ -0,0 +1,286 @@
+"""
+player_archive.py
+
+Streaming reader for the archived per-player statistics under
+``data/txt/players``.
+
+``player_data_csv.rar`` and ``player_data_txt.rar`` hold one tab-separated
+member per player (``Adam Reynolds.csv``), written by
+``converters/player_to_txt_2023.ipynb`` for the 2023 season: the
+PLAYER_LABELS columns followed by Round, Team and Opposition. Members are
+decompressed one at a time straight from the archive and yielded as
+``ArchivePlayerRecord``s, so nothing is extracted to disk:
+
+    for record in iter_archive_players(columns=["Tries", "All Run Metres"]):
+        ...
+
+Season, player and column filters are applied before any decompression
+where possible: a season the archive does not cover opens nothing, and a
+player filter only decompresses the matching members.
+
+Rows only name the player's team and the opposition. The home and away
+sides, and the ``match_key`` used by the player statistics files, are
+looked up in the season's match file; they are None for a match it does
+not list (or when the file is missing).
+
+Usage (from the repository root):
+    python -m data.player_archive --players "Adam Reynolds,AJ Brimson" --columns Tries,Points
+    python -m data.player_archive --list
+
+Requires:
+    - rarfile, or the ``bsdtar`` / ``unrar`` command line tool
+"""
+
+import argparse
+import csv
+import io
+import os
+import shutil
+import subprocess
+import time
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from config import environment as EV
+from config.paths import DATA_DIR
+from data.loader import LoadReport, iter_seasons
+
+try:
+    import rarfile
+except ImportError:  # pragma: no cover - optional dependency
+    rarfile = None
+
+ARCHIVE_PATHS = {
+    "csv": os.path.join(DATA_DIR, "txt", "players", "csv", "player_data_csv.rar"),
+    "txt": os.path.join(DATA_DIR, "txt", "players", "txt", "player_data_txt.rar"),
+}
+
+# The archived files were written from the 2023 player statistics only
+ARCHIVE_SEASON: int = 2023
+
+# Columns appended after the PLAYER_LABELS in every member
+CONTEXT_COLUMNS: List[str] = ["Round", "Team", "Opposition"]
+
+# Command line extractors, tried in order when rarfile is not installed: (list, print to stdout)
+TOOLS = {
+    "bsdtar": (["bsdtar", "-tf"], ["bsdtar", "-xOf"]),
+    "unrar": (["unrar", "lb", "-p-"], ["unrar", "p", "-inul", "-p-"]),
+}
+
+
+class ArchivePlayerRecord(NamedTuple):
+    """
+    One player row of an archive member. ``match_key``, ``home`` and
+    ``away`` follow ``data.loader.PlayerStatRecord`` and are None when the
+    match is not in the season's match file.
+    """
+    year: int
+    round: int
+    match_key: Optional[str]
+    home: Optional[str]
+    away: Optional[str]
+    row: int
+    name: str
+    stats: Dict[str, str]
+    team: str
+    opponent: str
+
+
+def archive_tool() -> Optional[str]:
+    """Backend used to read archives: 'rarfile', a command line tool, or None"""
+    if rarfile is not None:
+        return "rarfile"
+    return next((tool for tool in TOOLS if shutil.which(tool)), None)
+
+
+def _require_tool() -> str:
+    tool = archive_tool()
+    if tool is None:
+        raise RuntimeError("Reading the player archives requires rarfile (pip install rarfile) "
+                           "or the bsdtar or unrar command line tool")
+    return tool
+
+
+def list_members(path: str = ARCHIVE_PATHS["csv"]) -> List[str]:
+    """Names of the files in an archive, in archive order"""
+    tool = _require_tool()
+    if tool == "rarfile":
+        with rarfile.RarFile(path) as archive:
+            return [info.filename for info in archive.infolist() if not info.is_dir()]
+    result = subprocess.run([*TOOLS[tool][0], path], capture_output=True, text=True, check=True)
+    return [name for name in result.stdout.splitlines() if name and not name.endswith("/")]
+
+
+def player_name(member: str) -> str:
+    """'Adam Reynolds.csv' -> 'Adam Reynolds'"""
+    return os.path.splitext(os.path.basename(member))[0]
+
+
+def season_fixtures(selection: str = "NRL", year: int = ARCHIVE_SEASON, base_path: str = DATA_DIR,
+                    report: Optional[LoadReport] = None) -> Dict[Tuple[int, str], Tuple[str, str]]:
+    """(round, team) -> (home, away) for both teams of every match in a season's match file"""
+    fixtures = {}
+    for record in iter_seasons(selection, [year], "match", base_path, report):
+        fixtures[(record.round, record.home)] = fixtures[(record.round, record.away)] = (record.home, record.away)
+    return fixtures
+
+
+# ============================================
+# Member streams
+# ============================================
+
+def _iter_member_lines(path: str, members: List[str],
+                       everything: bool = False) -> Iterator[Tuple[str, Iterator[str]]]:
+    """(member, text lines) for each requested member, decompressed one at a time"""
+    tool = _require_tool()
+    if tool == "rarfile":
+        with rarfile.RarFile(path) as archive:
+            for member in members:
+                with archive.open(member) as raw:
+                    yield member, io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+        return
+
+    # One extractor process streams the requested members, in archive order, to stdout.
+    # Members are told apart by their header line, which every member starts with.
+    process = subprocess.Popen([*TOOLS[tool][1], path, *([] if everything else members)], stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL)
+    finished = False
+    try:
+        lines = io.TextIOWrapper(process.stdout, encoding="utf-8-sig", newline="")
+        header, member_index, current = None, -1, []
+        for line in lines:
+            if header is None:
+                header = line
+            if line == header:
+                if member_index >= 0:
+                    yield members[member_index], iter(current)
+                member_index, current = member_index + 1, []
+                if member_index >= len(members):
+                    raise RuntimeError(f"{path}: more members in the output than requested")
+            current.append(line)
+        if member_index >= 0:
+            yield members[member_index], iter(current)
+        if member_index + 1 != len(members):
+            raise RuntimeError(f"{path}: read {member_index + 1} of {len(members)} members "
+                               "(a member without the shared header?)")
+        finished = True
+    finally:
+        if not finished:
+            # Stopped early (or failed): the rest of the output is not wanted
+            process.kill()
+        process.stdout.close()
+        if process.wait() != 0 and finished:
+            raise RuntimeError(f"{tool} could not read {path} (exit status {process.returncode})")
+
+
+def iter_archive_players(path: str = ARCHIVE_PATHS["csv"], seasons: Optional[Iterable[int]] = None,
+                         players: Optional[Iterable[str]] = None, columns: Optional[Sequence[str]] = None,
+                         report: Optional[LoadReport] = None, selection: str = "NRL",
+                         base_path: str = DATA_DIR) -> Iterator[ArchivePlayerRecord]:
+    """
+    Yield one record per player row of an archive, member by member.
+
+    Parameters
+    ----------
+    path : str, optional
+        Archive to read (defaults to the csv one; both hold the same rows)
+    seasons : iterable of int, optional
+        Seasons to keep; nothing is decompressed when the archive has none of them
+    players : iterable of str, optional
+        Player names to keep; only their members are decompressed
+    columns : sequence of str, optional
+        PLAYER_LABELS to keep in ``stats`` (all by default)
+    report : LoadReport, optional
+        Collects rows that could not be read and matches that could not be placed
+    selection, base_path : str, optional
+        Competition and data directory of the match file the sides are read from
+
+    Notes
+    -----
+    Archive rows are stored per player, not per match: ``team`` and
+    ``opponent`` are as written, while ``home``, ``away`` and ``match_key``
+    come from the match file. ``row`` is the row within the player's file.
+    """
+    report = report if report is not None else LoadReport()
+    if columns is not None:
+        unknown = [column for column in columns if column not in EV.PLAYER_LABELS]
+        if unknown:
+            raise ValueError(f"Unknown player statistics {unknown}; expected PLAYER_LABELS names")
+    if seasons is not None and ARCHIVE_SEASON not in {int(season) for season in seasons}:
+        return
+
+    members = list_members(path)
+    if players is not None:
+        wanted = set(players)
+        members = [member for member in members if player_name(member) in wanted]
+    if not members:
+        return
+
+    fixtures = season_fixtures(selection, ARCHIVE_SEASON, base_path, report)
+    unplaced = set()
+    for member, lines in _iter_member_lines(path, members, everything=players is None):
+        name = player_name(member)
+        first = next(lines, "")
+        # The notebook wrote tabs to both archives; sniff in case a member was re-saved as CSV
+        reader = csv.reader(lines, delimiter="\t" if "\t" in first else ",")
+        header = next(csv.reader([first], delimiter=reader.dialect.delimiter), [])
+        position = {column: index for index, column in enumerate(header)}
+        missing = [column for column in CONTEXT_COLUMNS if column not in position]
+        if missing:
+            report.add(path, member, f"missing columns {missing}")
+            continue
+        keep = [(column, position[column]) for column in (columns or EV.PLAYER_LABELS) if column in position]
+        round_at, team_at, opponent_at = (position[column] for column in CONTEXT_COLUMNS)
+
+        for row, values in enumerate(reader):
+            if not values:
+                continue
+            if len(values) != len(header):
+                report.add(path, f"{member}/row {row}", f"{len(values)} values for {len(header)} columns")
+                continue
+            try:
+                round_num = int(values[round_at])
+            except ValueError:
+                report.add(path, f"{member}/row {row}", f"non-numeric round {values[round_at]!r}")
+                continue
+            team, opponent = values[team_at], values[opponent_at]
+            home, away = fixtures.get((round_num, team), (None, None))
+            if {home, away} != {team, opponent}:
+                if (round_num, team) not in unplaced:
+                    unplaced.add((round_num, team))
+                    report.add(path, f"round {round_num}/{team}", f"no {team} v {opponent} match in the match file")
+                home = away = None
+            match_key = (f"{ARCHIVE_SEASON}-{round_num}-{home.replace(' ', '-')}-v-{away.replace(' ', '-')}"
+                         if home is not None else None)
+            report.loaded += 1
+            yield ArchivePlayerRecord(ARCHIVE_SEASON, round_num, match_key, home, away, row, name,
+                                      {column: values[index] for column, index in keep}, team, opponent)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream player statistics out of the archives in data/txt/players")
+    parser.add_argument("--archive", default="csv", choices=list(ARCHIVE_PATHS))
+    parser.add_argument("--players", default=None, help="comma separated player names (default: all)")
+    parser.add_argument("--columns", default=None, help="comma separated PLAYER_LABELS (default: all)")
+    parser.add_argument("--seasons", default=None, help="comma separated seasons")
+    parser.add_argument("--list", action="store_true", help="list the archive members and exit")
+    args = parser.parse_args()
+
+    archive_path = ARCHIVE_PATHS[args.archive]
+    if args.list:
+        print("\n".join(list_members(archive_path)))
+        raise SystemExit
+
+    start = time.perf_counter()
+    load_report = LoadReport()
+    records = iter_archive_players(
+        archive_path,
+        seasons=[int(season) for season in args.seasons.split(",")] if args.seasons else None,
+        players=args.players.split(",") if args.players else None,
+        columns=args.columns.split(",") if args.columns else None,
+        report=load_report,
+    )
+    for record in records:
+        if args.players:
+            print(f"{record.name}\t{record.year} round {record.round}\t{record.team} v {record.opponent}"
+                  f"\t{record.match_key}\t{record.stats}")
+    print(f"{load_report.summary()}\nRead with {archive_tool()} in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,227 @@
+"""
+scoring_events.py
+
+Scoring-event table: one row per try, conversion, penalty goal or field
+goal, with the match, team, player and integer minute.
+
+The detailed match files used to keep try scorers and minutes as strings
+(``"12'"``) and only the first try scorer overall, so every analysis
+re-parsed ``try_minutes`` in loops. Here all seasons are parsed once into
+typed columns sorted by (match, sequence) with each match's running try
+count, plus a minute index, so a match's events are a binary search and a
+minute window over every season is a range scan:
+
+    events = load_scoring_events("NRL", range(2019, 2025))
+    events.first_try_distribution()              # first-try minute by team
+    events.by_position(lineups, start=0, end=10)  # early tries by position
+    events.race_to_tries(2)                       # first side to two tries
+
+Detailed files scraped before ``scoring_events`` existed still give their
+tries from ``try_minutes`` (and ``try_names`` when present).
+
+The match summary lists tries with their minutes but conversions and
+penalty goals only as made/attempted tallies (minute ``NO_MINUTE``), so a
+running score in points cannot be rebuilt; running counts and races are
+kept in timed tries instead.
+
+Requires:
+    - pandas
+    - numpy
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from data.entities import get_registry, team_id
+from data.loader import DATA_DIR, DetailedMatchRecord, LoadReport, iter_seasons, match_code
+
+EVENT_TYPES: List[str] = ["try", "conversion", "penalty_goal", "field_goal_1", "field_goal_2"]
+EVENT_POINTS: Dict[str, int] = {"try": 4, "conversion": 2, "penalty_goal": 2, "field_goal_1": 1, "field_goal_2": 2}
+
+# Minute of events listed without a time (e.g. "3/4" conversion tallies)
+NO_MINUTE: int = -1
+
+# Ten-minute bins up to full time, then golden point
+MINUTE_BINS: List[int] = [0, 10, 20, 30, 40, 50, 60, 70, 80, 200]
+
+EVENT_COLUMNS: List[str] = [
+    "match", "year", "round", "home_id", "away_id", "sequence", "minute", "type", "points",
+    "team_id", "opponent_id", "home", "player", "player_id", "tries_for", "tries_against",
+]
+
+
+def iter_event_rows(records: Iterable[DetailedMatchRecord], selection: str = "NRL") -> Iterator[Dict[str, Any]]:
+    """One row per scoring event of each match, timed events first in minute order"""
+    players = get_registry().players
+    for record in records:
+        home_id, away_id = team_id(record.home, selection), team_id(record.away, selection)
+        if home_id is None or away_id is None:
+            continue
+        events = []
+        for home, stats in ((1, record.home_stats), (0, record.away_stats)):
+            for order, (event_type, player, minute) in enumerate(_side_events(stats)):
+                events.append((minute is None, minute or 0, 1 - home, order, home, event_type, player, minute))
+        events.sort()
+
+        code = match_code(record.year, record.round, home_id, away_id)
+        for sequence, (*_, home, event_type, player, minute) in enumerate(events):
+            yield {
+                "match": code,
+                "year": record.year,
+                "round": record.round,
+                "home_id": home_id,
+                "away_id": away_id,
+                "sequence": sequence,
+                "minute": NO_MINUTE if minute is None else minute,
+                "type": event_type,
+                "points": EVENT_POINTS[event_type],
+                "team_id": home_id if home else away_id,
+                "opponent_id": away_id if home else home_id,
+                "home": home,
+                "player": player,
+                "player_id": players.id(player, create=True) if player else None,
+            }
+    # Keep the player IDs assigned here stable for the next run
+    get_registry().save_changes()
+
+
+def build_events(records: Iterable[DetailedMatchRecord], selection: str = "NRL") -> pd.DataFrame:
+    """
+    Scoring-event table from detailed match records.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns in EVENT_COLUMNS, sorted by (match, sequence). ``tries_for``
+        and ``tries_against`` are the scoring side's and its opponent's
+        timed tries up to and including the event.
+    """
+    events = pd.DataFrame.from_records(list(iter_event_rows(records, selection)),
+                                       columns=[c for c in EVENT_COLUMNS if not c.startswith("tries_")])
+    for column, dtype in (("match", np.int64), ("year", np.int16), ("round", np.int8), ("home_id", np.int16),
+                          ("away_id", np.int16), ("sequence", np.int16), ("minute", np.int16), ("points", np.int8),
+                          ("team_id", np.int16), ("opponent_id", np.int16), ("home", np.int8)):
+        events[column] = events[column].astype(dtype)
+    events["type"] = pd.Categorical(events["type"], categories=EVENT_TYPES)
+    events["player"] = events["player"].astype("category")
+    events["player_id"] = events["player_id"].astype("Int32")
+    events = events.sort_values(["match", "sequence"], kind="stable", ignore_index=True)
+
+    # Running timed tries per side within each match, vectorized over every season
+    timed_try = (events["type"] == "try") & (events["minute"] != NO_MINUTE)
+    is_home = events["home"] == 1
+    home_tries = (timed_try & is_home).astype(np.int16).groupby(events["match"]).cumsum()
+    away_tries = (timed_try & ~is_home).astype(np.int16).groupby(events["match"]).cumsum()
+    events["tries_for"] = home_tries.where(is_home, away_tries).astype(np.int16)
+    events["tries_against"] = away_tries.where(is_home, home_tries).astype(np.int16)
+    return events
+
+
+class ScoringEvents:
+    """
+    Attributes
+    ----------
+    frame : pandas.DataFrame
+        Every event, sorted by (match, sequence); see ``build_events``
+    """
+
+    def __init__(self, frame: pd.DataFrame) -> None:
+        self.frame = frame
+        self._matches = frame["match"].to_numpy()
+        minutes = frame["minute"].to_numpy()
+        # Secondary index: row positions ordered by minute, for minute-range scans
+        self._by_minute = np.argsort(minutes, kind="stable")
+        self._sorted_minutes = minutes[self._by_minute]
+
+    @classmethod
+    def build(cls, records: Iterable[DetailedMatchRecord], selection: str = "NRL") -> "ScoringEvents":
+        return cls(build_events(records, selection))
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    # ============================================
+    # Lookups
+    # ============================================
+
+    def match_events(self, year: int, round_num: int, home_id: int, away_id: int) -> pd.DataFrame:
+        """Events of one match in order, found by binary search"""
+        code = match_code(int(year), int(round_num), int(home_id), int(away_id))
+        start, end = np.searchsorted(self._matches, [code, code + 1])
+        return self.frame.iloc[start:end].reset_index(drop=True)
+
+    def window(self, start: int = 0, end: int = 10, types: Optional[Sequence[str]] = ("try",)) -> pd.DataFrame:
+        """Events with ``start <= minute < end`` (of ``types``; all when None), in (match, sequence) order"""
+        low, high = np.searchsorted(self._sorted_minutes, [max(start, 0), end])
+        rows = self.frame.iloc[np.sort(self._by_minute[low:high])]
+        return rows if types is None else rows[rows["type"].isin(types)]
+
+    # ============================================
+    # Queries
+    # ============================================
+
+    def first_tries(self) -> pd.DataFrame:
+        """First timed try of every match"""
+        tries = self.frame[(self.frame["type"] == "try") & (self.frame["minute"] != NO_MINUTE)]
+        return tries.drop_duplicates(subset="match", keep="first").reset_index(drop=True)
+
+    def first_try_distribution(self, bins: Sequence[int] = MINUTE_BINS, by: str = "team_id") -> pd.DataFrame:
+        """Counts of first-try minutes per ``by`` value (rows) and minute bin (columns)"""
+        first = self.first_tries()
+        minute_bin = pd.cut(first["minute"], bins=list(bins), right=False)
+        return pd.crosstab(first[by], minute_bin, dropna=False)
+
+    def by_position(self, lineups: pd.DataFrame, start: int = 0, end: int = 10,
+                    types: Sequence[str] = ("try",), column: str = "position") -> pd.Series:
+        """
+        Events in a minute window counted by the scorer's ``position`` (or
+        ``group``) from ``data.lineups``; scorers missing from the lineups
+        count as 'unknown'.
+        """
+        events = self.window(start, end, types)
+        keys = ["year", "round", "team_id", "player_id"]
+        named = lineups[keys + [column]].dropna(subset=["team_id", "player_id"]).drop_duplicates(subset=keys)
+        named = named.astype({"year": np.int16, "round": np.int8, "team_id": np.int16, "player_id": "Int32"})
+        merged = events[keys].merge(named, on=keys, how="left")
+        return merged[column].astype(object).fillna("unknown").value_counts()
+
+    def race_to_tries(self, tries: int = 2) -> pd.DataFrame:
+        """
+        Per match, the first side to score ``tries`` timed tries and the
+        minute it got there (goals are untimed, so races are run in tries).
+        """
+        frame = self.frame
+        reached = frame[(frame["type"] == "try") & (frame["minute"] != NO_MINUTE) & (frame["tries_for"] >= tries)]
+        first = reached.drop_duplicates(subset="match", keep="first")
+        return first[["year", "round", "home_id", "away_id", "team_id", "opponent_id", "home", "minute",
+                      "tries_for", "tries_against"]].reset_index(drop=True)
+
+
+def load_scoring_events(selection: str, years: Iterable[int], base_path: str = DATA_DIR,
+                        report: Optional[LoadReport] = None) -> ScoringEvents:
+    """Scoring events for whole seasons straight from the detailed match files"""
+    return ScoringEvents.build(iter_seasons(selection, years, "detailed", base_path, report), selection)
+
+
+def _side_events(stats: Dict[str, Any]) -> List[tuple]:
+    """(type, player, minute) of one side, from ``scoring_events`` or the legacy try lists"""
+    events = stats.get("scoring_events")
+    if isinstance(events, list):
+        return [(event.get("type"), event.get("player"), _to_minute(event.get("minute")))
+                for event in events if isinstance(event, dict) and event.get("type") in EVENT_POINTS]
+
+    minutes = stats.get("try_minutes")
+    if not isinstance(minutes, list):
+        return []
+    names = stats.get("try_names")
+    names = names if isinstance(names, list) and len(names) == len(minutes) else [None] * len(minutes)
+    return [("try", name, _to_minute(minute)) for name, minute in zip(names, minutes)]
+
+
+def _to_minute(value: Any) -> Optional[int]:
+    try:
+        return int(float(str(value).replace("'", "").strip()))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,211 @@
+"""
+backtest.py
+
+Walk-forward backtesting for match predictions.
+
+For every round R of every season, a model is trained on all matches
+played before R and then predicts R, so no future result ever reaches
+training (unlike the shuffled ``train_test_split`` in ``model_1.ipynb``).
+Folds are spread over a process pool. The feature matrix is built once
+and each fold reads a prefix slice of it: every feature only uses games
+before its match, so the slice equals what a per-fold rebuild produces.
+
+Reports accuracy, margin MAE and, when odds are supplied, the ROI of
+staking one unit on each predicted winner.
+
+Usage (from the repository root):
+    python -m predictions.backtest --years 2008-2024 --workers 4
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from predictions.features import GAME_HISTORY, build_features, feature_columns
+from predictions.models import MODELS, RidgeMargin
+
+ODDS_KEYS: List[str] = ["year", "round", "home_id", "away_id"]
+
+# Per-process state set once by the pool initializer, so folds only ship slice bounds
+_WORKER: Dict[str, Any] = {}
+
+
+@dataclass
+class BacktestResult:
+    """
+    Attributes
+    ----------
+    predictions : pandas.DataFrame
+        One row per predicted match with the predicted and actual margin
+    folds : pandas.DataFrame
+        Accuracy, MAE and betting results per (year, round) fold
+    """
+    predictions: pd.DataFrame
+    folds: pd.DataFrame
+
+    def by_season(self) -> pd.DataFrame:
+        return _aggregate(self.predictions.groupby("year"))
+
+    def summary(self) -> Dict[str, float]:
+        row = _aggregate(self.predictions.groupby(lambda _: "all")).iloc[0]
+        return {key: float(value) for key, value in row.items()}
+
+
+def walk_forward_folds(features: pd.DataFrame, start_year: Optional[int] = None,
+                       min_train: int = 50) -> List[Tuple[int, int, int, int]]:
+    """
+    (year, round, start, end) for every fold of a sorted feature matrix.
+
+    Rows [0, start) are the training set and rows [start, end) the round to
+    predict. Folds with fewer than ``min_train`` prior matches are skipped.
+    """
+    if features.empty:
+        return []
+    keys = features[["year", "round"]].to_numpy()
+    boundaries = np.flatnonzero(np.any(keys[1:] != keys[:-1], axis=1)) + 1
+    starts = np.concatenate([[0], boundaries])
+    ends = np.concatenate([boundaries, [len(features)]])
+
+    folds = []
+    for start, end in zip(starts, ends):
+        year, round_num = keys[start]
+        if start < min_train or (start_year is not None and year < start_year):
+            continue
+        folds.append((int(year), int(round_num), int(start), int(end)))
+    return folds
+
+
+def _init_worker(X: np.ndarray, y: np.ndarray, model_factory: Callable, model_params: Dict[str, Any]) -> None:
+    _WORKER.update(X=X, y=y, factory=model_factory, params=model_params)
+
+
+def _run_fold(fold: Tuple[int, int, int, int]) -> Tuple[int, int, np.ndarray]:
+    _, _, start, end = fold
+    X, y = _WORKER["X"], _WORKER["y"]
+    train = ~np.isnan(y[:start])
+    model = _WORKER["factory"](**_WORKER["params"]).fit(X[:start][train], y[:start][train])
+    return start, end, model.predict_batch(X[start:end])
+
+
+def run_backtest(features: pd.DataFrame, model_factory: Callable = RidgeMargin,
+                 model_params: Optional[Dict[str, Any]] = None, odds: Optional[pd.DataFrame] = None,
+                 start_year: Optional[int] = None, min_train: int = 50,
+                 workers: Optional[int] = None) -> BacktestResult:
+    """
+    Walk-forward backtest over every round of a feature matrix.
+
+    Parameters
+    ----------
+    features : pandas.DataFrame
+        Output of ``predictions.features.build_features``
+    model_factory : callable, optional
+        Picklable model class (or factory) with fit/predict_batch, see
+        ``predictions.models.MODELS``; its ``inputs`` attribute, if set,
+        selects the feature columns
+    model_params : dict, optional
+        Keyword arguments for the factory
+    odds : pandas.DataFrame, optional
+        year, round, home_id, away_id, home_odds, away_odds
+    start_year : int, optional
+        First season to predict (earlier seasons are only used for training)
+    workers : int, optional
+        Process count; 1 runs in-process (defaults to all cores)
+    """
+    features = features.sort_values(["year", "round", "match_id"], ignore_index=True)
+    columns = getattr(model_factory, "inputs", None) or feature_columns(features)
+    X = features[columns].to_numpy(dtype=float)
+    y = features["margin"].to_numpy(dtype=float, na_value=np.nan)
+    folds = walk_forward_folds(features, start_year, min_train)
+    params = model_params or {}
+
+    predicted = np.full(len(features), np.nan)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(X, y, model_factory, params)
+        results = map(_run_fold, folds)
+        for start, end, prediction in results:
+            predicted[start:end] = prediction
+    else:
+        chunksize = max(1, len(folds) // (workers * 4))
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(X, y, model_factory, params)) as pool:
+            for start, end, prediction in pool.map(_run_fold, folds, chunksize=chunksize):
+                predicted[start:end] = prediction
+
+    fold_rows = np.zeros(len(features), dtype=bool)
+    for _, _, start, end in folds:
+        fold_rows[start:end] = True
+
+    predictions = features.loc[fold_rows, ["match_id", *ODDS_KEYS]].copy()
+    predictions["predicted_margin"] = predicted[fold_rows]
+    predictions["margin"] = y[fold_rows]
+    predictions = predictions.dropna(subset=["margin"])
+    if odds is not None:
+        predictions = predictions.merge(odds[[*ODDS_KEYS, "home_odds", "away_odds"]], on=ODDS_KEYS, how="left")
+    _score(predictions)
+
+    return BacktestResult(predictions, _aggregate(predictions.groupby(["year", "round"])))
+
+
+def _score(predictions: pd.DataFrame) -> None:
+    """Add correctness, absolute error and one-unit betting profit columns"""
+    pick_home = predictions["predicted_margin"] > 0
+    predictions["correct"] = np.where(pick_home, predictions["margin"] > 0, predictions["margin"] < 0)
+    predictions["abs_error"] = (predictions["predicted_margin"] - predictions["margin"]).abs()
+
+    if "home_odds" in predictions:
+        price = np.where(pick_home, predictions["home_odds"], predictions["away_odds"])
+        predictions["staked"] = ~np.isnan(price.astype(float))
+        predictions["profit"] = np.where(predictions["staked"], np.where(predictions["correct"], price - 1.0, -1.0), 0.0)
+    else:
+        predictions["staked"] = False
+        predictions["profit"] = 0.0
+
+
+def _aggregate(groups) -> pd.DataFrame:
+    result = groups.agg(
+        matches=("correct", "size"),
+        accuracy=("correct", "mean"),
+        margin_mae=("abs_error", "mean"),
+        bets=("staked", "sum"),
+        profit=("profit", "sum"),
+    )
+    result["roi"] = result["profit"] / result["bets"].where(result["bets"] > 0)
+    return result
+
+
+def _parse_years(value: str) -> Sequence[int]:
+    if "-" in value:
+        first, last = value.split("-")
+        return range(int(first), int(last) + 1)
+    return [int(year) for year in value.split(",")]
+
+
+if __name__ == "__main__":
+    from data.loader import LoadReport
+    from data.match_table import load_match_table
+
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the match model")
+    parser.add_argument("--selection", default="NRL")
+    parser.add_argument("--years", default="2008-2024", help="e.g. 2008-2024 or 2022,2023")
+    parser.add_argument("--start-year", type=int, default=None, help="first season to predict")
+    parser.add_argument("--history", type=int, default=GAME_HISTORY)
+    parser.add_argument("--model", default="ridge", choices=sorted(MODELS))
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    report = LoadReport()
+    table = load_match_table(args.selection, _parse_years(args.years), report=report)
+    if report.issues:
+        print(report.summary())
+    if table.empty:
+        raise SystemExit("No matches loaded; download or scrape the match data first.")
+
+    result = run_backtest(build_features(table, args.history), model_factory=MODELS[args.model],
+                          start_year=args.start_year, workers=args.workers)
+    print(result.by_season().to_string())
+    print(result.summary())
@@ -0,0 +1,203 @@
+"""
+features.py
+
+Match-level feature matrix built from the long (match, team) table.
+
+This is the vectorized form of ``get_game_history`` from ``model_1.ipynb``:
+for every team and match it summarises the team's previous ``history``
+games in the same season (win rate, median and mean attack, defense and
+margin, home share and byes so far). Each value only uses games played
+before the match, so the matrix can be built once and sliced by round for
+walk-forward evaluation without leaking future results.
+
+Requires:
+    - pandas
+    - numpy
+"""
+
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data.lineups import lineup_strength, strength_columns
+from data.matchup_index import MatchupIndex
+from predictions.ratings import RATING_K, RatingEngine
+
+# Number of previous games summarised per team (GAME_HISTORY in model_1.ipynb)
+GAME_HISTORY: int = 3
+
+RATING_FEATURES: List[str] = ["home_rating", "away_rating", "diff_rating", "rating_margin"]
+
+MATCHUP_FEATURES: List[str] = [
+    "h2h_games", "h2h_win_rate", "h2h_margin_mean", "h2h_last_margin_mean",
+    "venue_home_games", "venue_home_win_rate", "venue_away_win_rate",
+    "venue_home_side_margin", "venue_away_side_margin",
+]
+
+TEAM_FEATURES: List[str] = [
+    "win", "defense", "attack", "margin", "byes", "games_at_home",
+    "defense_mean", "attack_mean", "margin_mean",
+]
+
+def team_form(table: pd.DataFrame, history: int = GAME_HISTORY) -> pd.DataFrame:
+    """
+    Rolling pre-match form for every row of the long table.
+
+    Parameters
+    ----------
+    table : pandas.DataFrame
+        Output of ``data.match_table.build_match_table``
+    history : int, optional
+        Number of previous games to summarise
+
+    Returns
+    -------
+    pandas.DataFrame
+        match_id, team_id plus one column per TEAM_FEATURES entry
+    """
+    played = table.dropna(subset=["attack", "defense", "team_id"]).sort_values(["team_id", "year", "round"], kind="stable")
+    values = played[["win", "defense", "attack", "margin", "home"]].astype(float)
+    groups = [played["team_id"].to_numpy(), played["year"].to_numpy()]
+
+    # Shift by one so each row only sees games before it
+    previous = values.groupby(groups).shift(1)
+    rolling = previous.groupby(groups).rolling(history, min_periods=1)
+    means = rolling.mean().reset_index(level=[0, 1], drop=True)
+    medians = rolling.median().reset_index(level=[0, 1], drop=True)
+
+    games_before = played.groupby(groups).cumcount()
+    form = pd.DataFrame({
+        "match_id": played["match_id"],
+        "team_id": played["team_id"].astype(int),
+        "win": means["win"],
+        "defense": medians["defense"],
+        "attack": medians["attack"],
+        "margin": medians["margin"],
+        "byes": (played["round"].astype(int) - 1 - games_before).clip(lower=0),
+        "games_at_home": means["home"],
+        "defense_mean": means["defense"],
+        "attack_mean": means["attack"],
+        "margin_mean": means["margin"],
+    }, index=played.index)
+    return form.sort_index()
+
+
+def rating_features(table: pd.DataFrame, **rating_params) -> pd.DataFrame:
+    """
+    Pre-match team ratings for every match, indexed by match_id.
+
+    Ratings come from ``predictions.ratings.RatingEngine`` updated after each
+    completed match in match_id (chronological) order.
+    """
+    home = table[table["home"] == 1].sort_values("match_id")
+    away = table[table["home"] == 0].set_index("match_id").reindex(home["match_id"])
+    home_ids = home["team_id"].fillna(-1).astype(int).to_numpy()
+    away_ids = away["team_id"].fillna(-1).astype(int).to_numpy()
+    home_scores = home["attack"].astype(float).to_numpy()
+    away_scores = home["defense"].astype(float).to_numpy()
+
+    # One spare slot absorbs teams missing from the registry (ID -1)
+    engine = RatingEngine(max(home_ids.max(initial=-1), away_ids.max(initial=-1)) + 2, **rating_params)
+    rows = []
+    for year, round_num, h, a, home_score, away_score in zip(
+            home["year"].to_numpy(), home["round"].to_numpy(), home_ids, away_ids, home_scores, away_scores):
+        engine.advance(int(year), int(round_num))
+        rows.append(engine.match_features(h, a))
+        if not (np.isnan(home_score) or np.isnan(away_score)):
+            engine.update(int(year), int(round_num), h, a, home_score, away_score)
+
+    return pd.DataFrame(rows, columns=RATING_FEATURES, index=home["match_id"].to_numpy())
+
+
+def matchup_features(table: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pre-match head-to-head and venue features for every match, indexed by match_id.
+
+    A ``data.matchup_index.MatchupIndex`` is queried before and updated after
+    each completed match in match_id (chronological) order.
+    """
+    home = table[table["home"] == 1].sort_values("match_id")
+    away = table[table["home"] == 0].set_index("match_id").reindex(home["match_id"])
+    home_ids = home["team_id"].fillna(-1).astype(int).to_numpy()
+    away_ids = away["team_id"].fillna(-1).astype(int).to_numpy()
+    home_scores = home["attack"].astype(float).to_numpy()
+    away_scores = home["defense"].astype(float).to_numpy()
+    venues = home["venue"].astype(object).where(home["venue"].notna(), None).to_numpy()
+
+    index = MatchupIndex(max(home_ids.max(initial=-1), away_ids.max(initial=-1)) + 2)
+    rows = []
+    for year, round_num, h, a, home_score, away_score, venue in zip(
+            home["year"].to_numpy(), home["round"].to_numpy(), home_ids, away_ids, home_scores, away_scores, venues):
+        rows.append(index.match_features(h, a, venue))
+        if not (np.isnan(home_score) or np.isnan(away_score)):
+            index.update(int(year), int(round_num), h, a, home_score, away_score, venue)
+
+    return pd.DataFrame(rows, columns=MATCHUP_FEATURES, index=home["match_id"].to_numpy())
+
+
+def lineup_features(features: pd.DataFrame, lineups: pd.DataFrame) -> pd.DataFrame:
+    """
+    Home, away and difference columns of the lineup strength aggregates
+    (``data.lineups.lineup_strength``), aligned with a feature matrix.
+    """
+    strength = lineup_strength(lineups)
+    columns = strength_columns(strength)
+    strength = strength.dropna(subset=["team_id"]).drop_duplicates(["year", "round", "team_id"])
+    by_team = strength.set_index(["year", "round", "team_id"])[columns]
+
+    sides = {}
+    for side, ids in (("home", features["home_id"]), ("away", features["away_id"])):
+        keys = pd.MultiIndex.from_arrays([features["year"], features["round"], ids.astype("Int16")])
+        sides[side] = by_team.reindex(keys)[columns].to_numpy(dtype=float)
+
+    values = np.hstack([sides["home"], sides["away"], sides["home"] - sides["away"]])
+    names = [f"{side}_{column}" for side in ("home", "away", "diff") for column in columns]
+    return pd.DataFrame(values, columns=names, index=features.index)
+
+
+def build_features(table: pd.DataFrame, history: int = GAME_HISTORY, rating_k: float = RATING_K,
+                   lineups: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    One row per match with home form, away form and the home margin and result
+    (``margin`` and ``home_won``, null for unplayed matches).
+
+    Feature columns are prefixed ``home_`` and ``away_`` (plus ``diff_`` for
+    home minus away). Matches early in a season without any prior game have
+    NaN form and are kept; callers decide how to treat them. Passing
+    ``lineups`` (``data.lineups.load_lineups``) adds lineup strength by
+    position group.
+    """
+    form = team_form(table, history)
+    scores = table[["match_id", "year", "round", "team_id", "home", "attack", "defense"]].rename(
+        columns={"attack": "points_for", "defense": "points_against"})
+    long = scores.join(form.drop(columns=["match_id", "team_id"]))
+
+    home = long[long["home"] == 1].set_index("match_id")
+    away = long[long["home"] == 0].set_index("match_id")
+
+    features = pd.DataFrame({
+        "year": home["year"].astype(int),
+        "round": home["round"].astype(int),
+        "home_id": home["team_id"],
+        "away_id": away["team_id"].reindex(home.index),
+    }, index=home.index)
+    for feature in TEAM_FEATURES:
+        features[f"home_{feature}"] = home[feature].astype(float)
+        features[f"away_{feature}"] = away[feature].reindex(home.index).astype(float)
+        features[f"diff_{feature}"] = features[f"home_{feature}"] - features[f"away_{feature}"]
+
+    features = features.join(rating_features(table, k=rating_k))
+    features = features.join(matchup_features(table))
+    if lineups is not None:
+        features = features.join(lineup_features(features, lineups))
+
+    features["margin"] = (home["points_for"] - home["points_against"]).astype(float)
+    features["home_won"] = (home["points_for"] > home["points_against"]).astype(float).where(features["margin"].notna())
+    return features.reset_index().sort_values(["year", "round", "match_id"], ignore_index=True)
+
+
+def feature_columns(features: pd.DataFrame) -> List[str]:
+    """Model input columns of a feature matrix"""
+    return [c for c in features.columns
+            if c.startswith(("home_", "away_", "diff_", "rating_", "h2h_", "venue_")) and c not in ("home_id", "away_id", "home_won")]
@@ -0,0 +1,346 @@
+"""
+models.py
+
+Registry of CPU-friendly match models sharing one interface.
+
+Every model is fitted on the shared feature matrix and the home margin,
+and scores a whole batch of matches at once:
+
+    model = get_model("ridge", alpha=1.0)
+    model.fit(X, y)
+    margins = model.predict_batch(X_new)        # predicted home margin
+    probs = model.predict_proba_batch(X_new)    # P(home win)
+
+A model may declare ``inputs`` (feature names it reads); callers select
+those columns before fitting, otherwise every feature column is used.
+
+``evaluate_configs`` trains many (model, hyperparameter) configs in
+parallel and reports accuracy next to training and inference time, so the
+cheapest model that is good enough can be deployed.
+
+Requires:
+    - numpy
+    - scikit-learn (only for "gbt")
+    - tensorflow (only for "mlp")
+"""
+
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Scale that maps margin / residual spread to a logistic win probability
+_LOGISTIC_SCALE: float = 1.702
+
+
+def _margin_to_proba(margin: np.ndarray, spread: float) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-_LOGISTIC_SCALE * margin / max(spread, 1e-6)))
+
+
+class MarginModel:
+    """Shared behaviour: NaN filling and win probabilities from predicted margins"""
+
+    inputs: Optional[List[str]] = None
+
+    def _fit_fill(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=float)
+        self.fill_ = np.nan_to_num(np.nanmean(X, axis=0)) if len(X) else np.zeros(X.shape[1])
+        return self._fill(X)
+
+    def _fill(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=float)
+        return np.where(np.isnan(X), self.fill_, X)
+
+    def _fit_spread(self, X: np.ndarray, y: np.ndarray) -> None:
+        residuals = y - self.predict_batch(X)
+        self.spread_ = float(residuals.std()) if len(residuals) else 1.0
+
+    def predict_batch(self, X: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def predict_proba_batch(self, X: np.ndarray) -> np.ndarray:
+        return _margin_to_proba(self.predict_batch(X), self.spread_)
+
+
+class RidgeMargin(MarginModel):
+    """
+    Ridge regression on standardised features, solved in closed form.
+    Missing feature values are replaced by the training column means.
+    """
+
+    def __init__(self, alpha: float = 1.0) -> None:
+        self.alpha = alpha
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> "RidgeMargin":
+        X = self._fit_fill(X)
+        y = np.asarray(y, dtype=float)
+        self.mean_ = X.mean(axis=0) if len(X) else np.zeros(X.shape[1])
+        self.scale_ = X.std(axis=0) if len(X) else np.ones(X.shape[1])
+        self.scale_[self.scale_ == 0] = 1.0
+        Z = (X - self.mean_) / self.scale_
+        self.intercept_ = y.mean() if len(y) else 0.0
+        gram = Z.T @ Z + self.alpha * np.eye(Z.shape[1])
+        self.coef_ = np.linalg.solve(gram, Z.T @ (y - self.intercept_))
+        self._fit_spread(X, y)
+        return self
+
+    def predict_batch(self, X: np.ndarray) -> np.ndarray:
+        Z = (self._fill(X) - self.mean_) / self.scale_
+        return Z @ self.coef_ + self.intercept_
+
+
+class LogisticWin(MarginModel):
+    """
+    L2-regularised logistic regression on the home win, fitted with Newton steps.
+    Margins are the log-odds rescaled by a least-squares fit to the training margins.
+    """
+
+    def __init__(self, C: float = 1.0, max_iter: int = 25) -> None:
+        self.C = C
+        self.max_iter = max_iter
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> "LogisticWin":
+        X = self._fit_fill(X)
+        y = np.asarray(y, dtype=float)
+        self.mean_ = X.mean(axis=0) if len(X) else np.zeros(X.shape[1])
+        self.scale_ = X.std(axis=0) if len(X) else np.ones(X.shape[1])
+        self.scale_[self.scale_ == 0] = 1.0
+        Z = np.column_stack([np.ones(len(X)), (X - self.mean_) / self.scale_])
+        target = (y > 0).astype(float)
+
+        penalty = np.eye(Z.shape[1]) / self.C
+        penalty[0, 0] = 0.0
+        self.coef_ = np.zeros(Z.shape[1])
+        for _ in range(self.max_iter):
+            p = 1.0 / (1.0 + np.exp(-Z @ self.coef_))
+            gradient = Z.T @ (p - target) + penalty @ self.coef_
+            hessian = (Z * (p * (1 - p))[:, None]).T @ Z + penalty
+            step = np.linalg.solve(hessian, gradient)
+            self.coef_ -= step
+            if np.abs(step).max() < 1e-6:
+                break
+
+        logits = Z @ self.coef_
+        self.margin_scale_ = float(logits @ y / max(logits @ logits, 1e-9))
+        return self
+
+    def _logits(self, X: np.ndarray) -> np.ndarray:
+        Z = (self._fill(X) - self.mean_) / self.scale_
+        return Z @ self.coef_[1:] + self.coef_[0]
+
+    def predict_batch(self, X: np.ndarray) -> np.ndarray:
+        return self._logits(X) * self.margin_scale_
+
+    def predict_proba_batch(self, X: np.ndarray) -> np.ndarray:
+        return 1.0 / (1.0 + np.exp(-self._logits(X)))
+
+
+class GradientBoostedMargin(MarginModel):
+    """Histogram gradient-boosted trees on the margin (scikit-learn)"""
+
+    def __init__(self, max_iter: int = 200, learning_rate: float = 0.05, max_leaf_nodes: int = 15,
+                 l2_regularization: float = 0.0) -> None:
+        self.max_iter = max_iter
+        self.learning_rate = learning_rate
+        self.max_leaf_nodes = max_leaf_nodes
+        self.l2_regularization = l2_regularization
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> "GradientBoostedMargin":
+        try:
+            from sklearn.ensemble import HistGradientBoostingRegressor
+        except ImportError as ex:
+            raise ImportError("The 'gbt' model requires scikit-learn (pip install scikit-learn)") from ex
+
+        # Boosted trees handle missing values natively, so no filling here
+        self.model_ = HistGradientBoostingRegressor(
+            max_iter=self.max_iter, learning_rate=self.learning_rate,
+            max_leaf_nodes=self.max_leaf_nodes, l2_regularization=self.l2_regularization)
+        self.model_.fit(np.asarray(X, dtype=float), np.asarray(y, dtype=float))
+        self._fit_spread(X, np.asarray(y, dtype=float))
+        return self
+
+    def predict_batch(self, X: np.ndarray) -> np.ndarray:
+        return self.model_.predict(np.asarray(X, dtype=float))
+
+
+class EloMargin(MarginModel):
+    """
+    Margin as a linear function of the rating engine's expected margin
+    (``predictions.ratings``). The fit only recalibrates slope and intercept.
+    """
+
+    inputs = ["rating_margin"]
+
+    def __init__(self, points_per_rating: Optional[float] = None) -> None:
+        self.points_per_rating = points_per_rating
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> "EloMargin":
+        x = self._fit_fill(X)[:, 0]
+        y = np.asarray(y, dtype=float)
+        if self.points_per_rating is None:
+            slope, intercept = np.polyfit(x, y, 1) if len(x) > 1 else (1.0, 0.0)
+        else:
+            slope = self.points_per_rating
+            intercept = float((y - slope * x).mean()) if len(y) else 0.0
+        self.slope_, self.intercept_ = float(slope), float(intercept)
+        self._fit_spread(X, y)
+        return self
+
+    def predict_batch(self, X: np.ndarray) -> np.ndarray:
+        return self._fill(X)[:, 0] * self.slope_ + self.intercept_
+
+
+class NeuralMargin(MarginModel):
+    """
+    The dense network from ``model_1.ipynb`` (Keras): Dense/BatchNorm/Dropout
+    blocks on standardised features, Adam with an ``ExponentialDecay``
+    schedule, stopped once the training loss stops improving.
+    """
+
+    def __init__(self, hidden_layers: Sequence[int] = (128, 64, 32), dropout: Sequence[float] = (0.3, 0.2),
+                 initial_learning_rate: float = 1e-3, decay_rate: float = 0.96, batch_size: int = 32,
+                 epochs: int = 200, patience: int = 10) -> None:
+        self.hidden_layers = list(hidden_layers)
+        self.dropout = list(dropout)
+        self.initial_learning_rate = initial_learning_rate
+        self.decay_rate = decay_rate
+        self.batch_size = batch_size
+        self.epochs = epochs
+        self.patience = patience
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> "NeuralMargin":
+        try:
+            from tensorflow import keras
+        except ImportError as ex:
+            raise ImportError("The 'mlp' model requires tensorflow (pip install tensorflow)") from ex
+
+        X = self._fit_fill(X)
+        y = np.asarray(y, dtype=float)
+        self.mean_ = X.mean(axis=0) if len(X) else np.zeros(X.shape[1])
+        self.scale_ = X.std(axis=0) if len(X) else np.ones(X.shape[1])
+        self.scale_[self.scale_ == 0] = 1.0
+
+        layers = [keras.Input(shape=(X.shape[1],))]
+        for i, units in enumerate(self.hidden_layers):
+            layers.append(keras.layers.Dense(units, activation="relu"))
+            if i < len(self.dropout) and self.dropout[i] > 0:
+                layers.append(keras.layers.BatchNormalization())
+                layers.append(keras.layers.Dropout(self.dropout[i]))
+        layers.append(keras.layers.Dense(1))
+        self.model_ = keras.Sequential(layers)
+
+        schedule = keras.optimizers.schedules.ExponentialDecay(
+            initial_learning_rate=self.initial_learning_rate,
+            decay_steps=max(1, len(X) // self.batch_size), decay_rate=self.decay_rate, staircase=True)
+        self.model_.compile(optimizer=keras.optimizers.Adam(learning_rate=schedule), loss="mse")
+        stop = keras.callbacks.EarlyStopping(monitor="loss", patience=self.patience, min_delta=1e-5,
+                                             restore_best_weights=True)
+        history = self.model_.fit((X - self.mean_) / self.scale_, y, batch_size=self.batch_size,
+                                  epochs=self.epochs, callbacks=[stop], verbose=0)
+        self.epochs_run_ = len(history.epoch)
+        self._fit_spread(X, y)
+        return self
+
+    def predict_batch(self, X: np.ndarray) -> np.ndarray:
+        Z = (self._fill(X) - self.mean_) / self.scale_
+        return self.model_.predict(Z, batch_size=4096, verbose=0)[:, 0]
+
+
+MODELS: Dict[str, type] = {
+    "ridge": RidgeMargin,
+    "logistic": LogisticWin,
+    "gbt": GradientBoostedMargin,
+    "elo": EloMargin,
+    "mlp": NeuralMargin,
+}
+
+
+def get_model(name: str, **params: Any) -> MarginModel:
+    """
+    Instantiate a registered model.
+
+    Raises
+    ------
+    KeyError
+        If the name is not registered
+    """
+    try:
+        return MODELS[name](**params)
+    except KeyError:
+        raise KeyError(f"Unknown model {name!r}; choose from {sorted(MODELS)}") from None
+
+
+def model_inputs(name: str, columns: Sequence[str]) -> List[str]:
+    """Feature columns a registered model reads from the shared matrix"""
+    return list(MODELS[name].inputs or columns)
+
+
+def expand_grid(grid: Dict[str, Iterable[Any]]) -> List[Dict[str, Any]]:
+    """All combinations of a {param: values} grid"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def _evaluate(config: Tuple[str, Dict[str, Any]], X_train: np.ndarray, y_train: np.ndarray,
+              X_test: np.ndarray, y_test: np.ndarray) -> Dict[str, Any]:
+    name, params = config
+    model = get_model(name, **params)
+
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predicted = model.predict_batch(X_test)
+    predict_seconds = time.perf_counter() - start
+
+    return {
+        "model": name,
+        "params": params,
+        "accuracy": float(np.mean(np.sign(predicted) == np.sign(y_test))),
+        "margin_mae": float(np.mean(np.abs(predicted - y_test))),
+        "fit_seconds": fit_seconds,
+        "predict_us_per_match": predict_seconds / max(len(y_test), 1) * 1e6,
+    }
+
+
+def _evaluate_job(job):
+    return _evaluate(*job)
+
+
+def evaluate_configs(features: pd.DataFrame, configs: Sequence[Tuple[str, Dict[str, Any]]],
+                     validation_years: Sequence[int], workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Train every (model name, params) config on seasons before the validation
+    years and score it on them, in parallel across configs.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per config: accuracy, margin MAE, fit time and inference time
+    """
+    from predictions.features import feature_columns
+
+    played = features.dropna(subset=["margin"])
+    columns = feature_columns(played)
+    train = played["year"] < min(validation_years)
+    test = played["year"].isin(validation_years)
+
+    jobs = []
+    for name, params in configs:
+        inputs = model_inputs(name, columns)
+        X = played[inputs].to_numpy(dtype=float)
+        y = played["margin"].to_numpy(dtype=float)
+        jobs.append(((name, params), X[train.to_numpy()], y[train.to_numpy()], X[test.to_numpy()], y[test.to_numpy()]))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        rows = [_evaluate_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            rows = list(pool.map(_evaluate_job, jobs))
+    return pd.DataFrame(rows).sort_values(["accuracy", "fit_seconds"], ascending=[False, True], ignore_index=True)
@@ -0,0 +1,237 @@
+"""
+ratings.py
+
+Incremental Elo-style team ratings.
+
+Each team carries three numbers: an attack rating (points scored above
+the league average), a defense rating (points prevented) and its own home
+advantage. A completed match moves them in O(1) towards the observed
+scores, so new results from ``get_nrl_data`` can be applied as they
+arrive, and the whole history replays in a single pass.
+
+The state before every round is snapshotted, so the ratings going into
+any past round can be read back instantly as features. Applied matches are
+remembered by match code, so re-applying a round (or a round that was
+only partly played the first time) never counts a result twice, and a
+late result for an earlier round leaves the snapshots already taken alone.
+
+    engine = RatingEngine.replay(iter_seasons("NRL", range(2008, 2025)))
+    engine.expected_margin(home_id, away_id)
+    engine.ratings_at(2024, 10)
+
+Requires:
+    - numpy
+"""
+
+import argparse
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from config.paths import RATINGS_PATH
+from data.entities import TEAM_LISTS, team_id
+from data.loader import match_code, played_scores
+
+
+# Learning rate per point of scoring error, and for the home advantage
+RATING_K: float = 0.08
+HOME_K: float = 0.02
+# Share of a rating carried into the next season
+SEASON_CARRYOVER: float = 0.75
+# League average points per team per game and starting home advantage
+BASE_POINTS: float = 20.0
+BASE_HOME_ADVANTAGE: float = 3.0
+
+Snapshot = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+class RatingEngine:
+    """
+    Attributes
+    ----------
+    attack, defense, home_advantage : numpy.ndarray
+        Current per-team ratings, indexed by team ID
+    base : float
+        Running league average points per team per game
+    snapshots : dict
+        (year, round) -> copy of (attack, defense, home_advantage) before that round
+    applied : set
+        Match codes (``data.loader.match_code``) of every match applied
+    """
+
+    def __init__(self, n_teams: int, k: float = RATING_K, home_k: float = HOME_K,
+                 carryover: float = SEASON_CARRYOVER) -> None:
+        self.k = k
+        self.home_k = home_k
+        self.carryover = carryover
+        self.attack = np.zeros(n_teams)
+        self.defense = np.zeros(n_teams)
+        self.home_advantage = np.full(n_teams, BASE_HOME_ADVANTAGE)
+        self.base = BASE_POINTS
+        self.snapshots: Dict[Tuple[int, int], Snapshot] = {}
+        self.current: Optional[Tuple[int, int]] = None
+        self.applied: Set[int] = set()
+
+    @classmethod
+    def for_competition(cls, selection: str = "NRL", **params) -> "RatingEngine":
+        return cls(len(TEAM_LISTS[selection]), **params)
+
+    # ============================================
+    # Updates
+    # ============================================
+
+    def advance(self, year: int, round_num: int) -> None:
+        """
+        Snapshot the state going into a new round, regressing ratings at a new season.
+
+        Only moves forwards: a late result for an earlier round is applied to
+        the current ratings, but never rewinds ``current``, overwrites that
+        round's snapshot or regresses the ratings again.
+        """
+        if self.current is not None and (year, round_num) <= self.current:
+            return
+        if self.current is not None and year > self.current[0]:
+            self.attack *= self.carryover
+            self.defense *= self.carryover
+        self.current = (year, round_num)
+        self.snapshots.setdefault(self.current, (self.attack.copy(), self.defense.copy(), self.home_advantage.copy()))
+
+    def expected_scores(self, home: int, away: int) -> Tuple[float, float]:
+        """Expected (home, away) points from the current ratings"""
+        half_home = self.home_advantage[home] / 2
+        return (self.base + self.attack[home] - self.defense[away] + half_home,
+                self.base + self.attack[away] - self.defense[home] - half_home)
+
+    def expected_margin(self, home: int, away: int) -> float:
+        expected_home, expected_away = self.expected_scores(home, away)
+        return expected_home - expected_away
+
+    def update(self, year: int, round_num: int, home: int, away: int, home_score: float, away_score: float) -> bool:
+        """Apply one completed match in O(1); returns False if it was already applied"""
+        code = match_code(year, round_num, home, away)
+        if code in self.applied:
+            return False
+        self.applied.add(code)
+        self.advance(year, round_num)
+        expected_home, expected_away = self.expected_scores(home, away)
+        home_error, away_error = home_score - expected_home, away_score - expected_away
+
+        self.attack[home] += self.k * home_error
+        self.defense[away] -= self.k * home_error
+        self.attack[away] += self.k * away_error
+        self.defense[home] -= self.k * away_error
+        self.home_advantage[home] += self.home_k * (home_error - away_error)
+        self.base += self.k * 0.05 * (home_error + away_error) / 2
+        return True
+
+    def update_round(self, round_data: Dict[str, List[dict]], year: int, selection: str = "NRL") -> int:
+        """
+        Apply a round as returned by ``get_nrl_data`` ({round: [matches]}).
+        Matches that are not completed (see ``data.loader.played_scores``) or
+        were applied before are skipped; returns the number applied.
+        """
+        applied = 0
+        for round_key, matches in round_data.items():
+            for match in matches:
+                home = match["Home_Id"] if match.get("Home_Id") is not None else team_id(match["Home"], selection)
+                away = match["Away_Id"] if match.get("Away_Id") is not None else team_id(match["Away"], selection)
+                home_score, away_score = played_scores(match)
+                if home is None or away is None or home_score is None:
+                    continue
+                applied += self.update(year, int(round_key), home, away, float(home_score), float(away_score))
+        return applied
+
+    @classmethod
+    def replay(cls, records: Iterable, selection: str = "NRL", **params) -> "RatingEngine":
+        """Rebuild the state from loader MatchRecords in chronological order"""
+        engine = cls.for_competition(selection, **params)
+        for record in records:
+            if record.home_id is None or record.away_id is None:
+                continue
+            engine.advance(record.year, record.round)
+            if record.home_score is None or record.away_score is None:
+                continue
+            engine.update(record.year, record.round, record.home_id, record.away_id,
+                          record.home_score, record.away_score)
+        return engine
+
+    # ============================================
+    # Queries
+    # ============================================
+
+    def ratings_at(self, year: int, round_num: int) -> Snapshot:
+        """
+        (attack, defense, home_advantage) going into a round.
+
+        Raises
+        ------
+        KeyError
+            If the round was never reached during replay
+        """
+        return self.snapshots[(year, round_num)]
+
+    def strength(self, snapshot: Optional[Snapshot] = None) -> np.ndarray:
+        """Net rating (attack + defense) per team"""
+        attack, defense, _ = snapshot if snapshot is not None else (self.attack, self.defense, None)
+        return attack + defense
+
+    def match_features(self, home: int, away: int, year: Optional[int] = None,
+                       round_num: Optional[int] = None) -> Dict[str, float]:
+        """Rating features for a fixture, from a past round or the current state"""
+        attack, defense, home_advantage = (self.ratings_at(year, round_num) if year is not None
+                                           else (self.attack, self.defense, self.home_advantage))
+        home_rating, away_rating = attack[home] + defense[home], attack[away] + defense[away]
+        return {
+            "home_rating": float(home_rating),
+            "away_rating": float(away_rating),
+            "diff_rating": float(home_rating - away_rating),
+            "rating_margin": float(attack[home] - defense[away] - attack[away] + defense[home] + home_advantage[home]),
+        }
+
+    # ============================================
+    # Persistence
+    # ============================================
+
+    def save(self, path: str = RATINGS_PATH) -> None:
+        keys = np.array(list(self.snapshots), dtype=np.int32).reshape(-1, 2)
+        stacked = np.array([np.stack(s) for s in self.snapshots.values()]).reshape(len(keys), 3, len(self.attack))
+        np.savez_compressed(path, attack=self.attack, defense=self.defense, home_advantage=self.home_advantage,
+                            base=self.base, keys=keys, snapshots=stacked.astype(np.float32),
+                            current=np.array(self.current or (0, 0)),
+                            applied=np.array(sorted(self.applied), dtype=np.int64),
+                            params=np.array([self.k, self.home_k, self.carryover]))
+
+    @classmethod
+    def load(cls, path: str = RATINGS_PATH) -> "RatingEngine":
+        with np.load(path) as data:
+            k, home_k, carryover = data["params"]
+            engine = cls(len(data["attack"]), k=k, home_k=home_k, carryover=carryover)
+            engine.attack, engine.defense = data["attack"].copy(), data["defense"].copy()
+            engine.home_advantage, engine.base = data["home_advantage"].copy(), float(data["base"])
+            engine.snapshots = {
+                (int(year), int(round_num)): tuple(snapshot.astype(float))
+                for (year, round_num), snapshot in zip(data["keys"], data["snapshots"])
+            }
+            current = tuple(int(x) for x in data["current"])
+            engine.current = current if current != (0, 0) else None
+            # Files saved before applied matches were tracked have none
+            engine.applied = set(int(code) for code in data["applied"]) if "applied" in data else set()
+        return engine
+
+
+if __name__ == "__main__":
+    from data.loader import LoadReport, iter_seasons
+
+    parser = argparse.ArgumentParser(description="Replay match history and save team ratings")
+    parser.add_argument("--selection", default="NRL")
+    parser.add_argument("--years", default="2008-2025", help="first-last season, e.g. 2008-2025")
+    parser.add_argument("--output", default=RATINGS_PATH)
+    args = parser.parse_args()
+
+    first, last = (int(year) for year in args.years.split("-"))
+    report = LoadReport()
+    engine = RatingEngine.replay(iter_seasons(args.selection, range(first, last + 1), report=report), args.selection)
+    if report.issues:
+        print(report.summary())
+    engine.save(args.output)
+    print(f"Saved ratings for {len(engine.snapshots)} rounds to {args.output}")
@@ -0,0 +1,389 @@
+"""
+search.py
+
+Hyperparameter search over feature settings and registered models.
+
+Building X/y is the slow, repeated part of tuning, so each feature matrix
+is cached on disk under a key made from the feature config and the data
+version (size and mtime of the season files). A sweep only rebuilds a
+matrix when its settings or the underlying data change.
+
+Trials are scored season by season on the validation years with
+successive halving: every rung adds one validation season, and only the
+best ``1 / eta`` of the surviving trials go on to the next rung, so bad
+configs are stopped after a single season. Jobs within a rung run on a
+process pool. Every finished or stopped trial is appended to a JSON lines
+experiment log.
+
+Usage (from the repository root):
+    python -m predictions.search --years 2008-2024 --validation 2022-2024 --trials 200 --workers 4
+    python -m predictions.search --models ridge,gbt,mlp --space space.json
+
+A space file maps model names to {param: [values]} grids, with an optional
+"features" entry for the feature settings (history, rating_k).
+
+Requires:
+    - numpy
+    - pandas
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data.loader import DATA_DIR, LoadReport, data_version
+from predictions.features import build_features, feature_columns
+from predictions.models import MODELS, expand_grid, get_model, model_inputs
+from predictions.ratings import RATING_K
+
+PACKAGE_DIR: str = os.path.dirname(os.path.abspath(__file__))
+FEATURE_CACHE_DIR: str = os.path.join(DATA_DIR, "cache", "features")
+EXPERIMENT_LOG: str = os.path.join(PACKAGE_DIR, "experiments.jsonl")
+
+# Bump when build_features changes so cached matrices are rebuilt
+FEATURE_CACHE_VERSION: int = 2
+
+DEFAULT_FEATURE_SPACE: Dict[str, List[Any]] = {
+    "history": [3, 5, 8],
+    "rating_k": [0.05, RATING_K, 0.12],
+}
+
+DEFAULT_SPACE: Dict[str, Dict[str, List[Any]]] = {
+    "ridge": {"alpha": [0.1, 1.0, 10.0, 100.0]},
+    "logistic": {"C": [0.01, 0.1, 1.0, 10.0]},
+    "gbt": {"max_iter": [100, 200, 400], "learning_rate": [0.02, 0.05, 0.1], "max_leaf_nodes": [7, 15, 31]},
+    "elo": {"points_per_rating": [None]},
+    "mlp": {
+        "hidden_layers": [[128, 64, 32], [64, 32], [32]],
+        "dropout": [[0.3, 0.2], [0.1], []],
+        "initial_learning_rate": [1e-4, 1e-3],
+        "decay_rate": [0.9, 0.99],
+        "epochs": [100, 300],
+    },
+}
+
+# Metric -> True when larger is better
+METRICS: Dict[str, bool] = {"margin_mae": False, "accuracy": True, "log_loss": False}
+
+# Per-process feature matrices set once by the pool initializer
+_WORKER: Dict[str, pd.DataFrame] = {}
+
+
+# ============================================
+# Feature matrix cache
+# ============================================
+
+def feature_key(selection: str, years: Sequence[int], feature_config: Dict[str, Any],
+                version: Optional[str] = None, base_path: str = DATA_DIR) -> str:
+    """Hash of the feature config and the data version it would be built from"""
+    if version is None:
+        version = data_version(selection, years, base_path=base_path)
+    payload = json.dumps({
+        "selection": selection,
+        "years": list(years),
+        "features": feature_config,
+        "data_version": version,
+        "cache_version": FEATURE_CACHE_VERSION,
+    }, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def cached_features(selection: str, years: Sequence[int], feature_config: Dict[str, Any],
+                    base_path: str = DATA_DIR, cache_dir: str = FEATURE_CACHE_DIR,
+                    report: Optional[LoadReport] = None) -> Tuple[pd.DataFrame, str, bool]:
+    """
+    Load a feature matrix from the disk cache, building and storing it on a miss.
+
+    Parameters
+    ----------
+    feature_config : dict
+        Keyword arguments for ``build_features`` (history, rating_k)
+
+    Returns
+    -------
+    tuple
+        (features, key, hit)
+
+    Raises
+    ------
+    ValueError
+        If no matches could be loaded
+    """
+    from data.match_table import load_match_table
+
+    years = list(years)
+    key = feature_key(selection, years, feature_config, base_path=base_path)
+    path = os.path.join(cache_dir, f"{key}.pkl")
+    if os.path.exists(path):
+        return pd.read_pickle(path), key, True
+
+    table = load_match_table(selection, years, base_path, report)
+    if table.empty:
+        raise ValueError("No matches loaded; download or scrape the match data first.")
+    features = build_features(table, **feature_config)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write then rename so a parallel sweep never reads a partial file
+    partial = f"{path}.{os.getpid()}.tmp"
+    features.to_pickle(partial)
+    os.replace(partial, path)
+    return features, key, False
+
+
+# ============================================
+# Trials
+# ============================================
+
+@dataclass
+class Trial:
+    """
+    Attributes
+    ----------
+    trial_id : int
+        Position in the sweep
+    model : str
+        Registered model name (``predictions.models.MODELS``)
+    params : dict
+        Model hyperparameters
+    features : dict
+        Feature settings passed to ``build_features``
+    seasons : dict
+        Validation year -> metrics, filled rung by rung
+    status : str
+        'running', 'stopped' (early-stopped) or 'complete'
+    """
+    trial_id: int
+    model: str
+    params: Dict[str, Any]
+    features: Dict[str, Any]
+    seasons: Dict[int, Dict[str, float]] = field(default_factory=dict)
+    status: str = "running"
+
+    def score(self, metric: str) -> float:
+        values = [season[metric] for season in self.seasons.values()]
+        return float(np.mean(values)) if values else math.nan
+
+
+def sample_trials(space: Dict[str, Dict[str, List[Any]]], feature_space: Dict[str, List[Any]],
+                  n_trials: Optional[int] = None, seed: int = 0) -> List[Trial]:
+    """
+    Every (feature config, model, params) combination, or a random sample of
+    ``n_trials`` of them.
+    """
+    combinations = [
+        (features, name, params)
+        for features in expand_grid(feature_space)
+        for name, grid in space.items()
+        for params in expand_grid(grid)
+    ]
+    if n_trials is not None and n_trials < len(combinations):
+        combinations = random.Random(seed).sample(combinations, n_trials)
+    return [Trial(i, name, params, features) for i, (features, name, params) in enumerate(combinations)]
+
+
+def _init_worker(matrices: Dict[str, pd.DataFrame]) -> None:
+    _WORKER.update(matrices)
+
+
+def _run_trial_season(job: Tuple[int, str, Dict[str, Any], str, int]) -> Tuple[int, int, Dict[str, float]]:
+    """Train on every season before ``year`` and score the model on ``year``"""
+    trial_id, name, params, key, year = job
+    played = _WORKER[key]
+    played = played[played["year"] <= year]
+    inputs = model_inputs(name, feature_columns(played))
+    train = (played["year"] < year).to_numpy()
+
+    X = played[inputs].to_numpy(dtype=float)
+    y = played["margin"].to_numpy(dtype=float)
+    model = get_model(name, **params)
+    start = time.perf_counter()
+    model.fit(X[train], y[train])
+    fit_seconds = time.perf_counter() - start
+
+    predicted = model.predict_batch(X[~train])
+    proba = np.clip(model.predict_proba_batch(X[~train]), 1e-6, 1 - 1e-6)
+    actual = y[~train]
+    home_won = (actual > 0).astype(float)
+    return trial_id, year, {
+        "matches": int(len(actual)),
+        "accuracy": float(np.mean(np.sign(predicted) == np.sign(actual))),
+        "margin_mae": float(np.mean(np.abs(predicted - actual))),
+        "log_loss": float(-np.mean(home_won * np.log(proba) + (1 - home_won) * np.log(1 - proba))),
+        "fit_seconds": fit_seconds,
+    }
+
+
+def _log_trial(log, experiment: Dict[str, Any], trial: Trial, key: str, metric: str) -> None:
+    log.write(json.dumps({
+        **experiment,
+        "trial": trial.trial_id,
+        "status": trial.status,
+        "model": trial.model,
+        "params": trial.params,
+        "features": trial.features,
+        "feature_key": key,
+        "metric": metric,
+        "score": trial.score(metric),
+        "seasons": {str(year): metrics for year, metrics in trial.seasons.items()},
+    }) + "\n")
+    log.flush()
+
+
+def run_search(trials: List[Trial], selection: str, years: Sequence[int], validation_years: Sequence[int],
+               metric: str = "margin_mae", eta: int = 3, workers: Optional[int] = None,
+               base_path: str = DATA_DIR, cache_dir: str = FEATURE_CACHE_DIR,
+               log_path: str = EXPERIMENT_LOG) -> pd.DataFrame:
+    """
+    Successive-halving search over trials, logging each one as it finishes.
+
+    Parameters
+    ----------
+    trials : list of Trial
+        Usually from ``sample_trials``
+    years : sequence of int
+        Seasons loaded for training and validation
+    validation_years : sequence of int
+        Seasons scored one rung at a time, in order
+    metric : str
+        Key of METRICS used to rank trials
+    eta : int
+        Keep the best 1 / eta trials after every rung
+    workers : int, optional
+        Process count; 1 runs in-process (defaults to all cores)
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per trial, best first
+    """
+    if metric not in METRICS:
+        raise KeyError(f"Unknown metric {metric!r}; choose from {sorted(METRICS)}")
+    validation_years = sorted(validation_years)
+    higher_is_better = METRICS[metric]
+
+    report = LoadReport()
+    matrices, keys = {}, {}
+    for trial in trials:
+        config_id = json.dumps(trial.features, sort_keys=True)
+        if config_id not in keys:
+            features, key, hit = cached_features(selection, years, trial.features, base_path, cache_dir, report)
+            print(f"Features {trial.features}: {'cached' if hit else 'built'} ({key})")
+            matrices[key] = features.dropna(subset=["margin"])
+            keys[config_id] = key
+    if report.issues:
+        print(report.summary())
+
+    experiment = {
+        "experiment": time.strftime("%Y%m%d-%H%M%S"),
+        "selection": selection,
+        "years": [min(years), max(years)],
+        "validation_years": validation_years,
+    }
+    trial_keys = {trial.trial_id: keys[json.dumps(trial.features, sort_keys=True)] for trial in trials}
+    by_id = {trial.trial_id: trial for trial in trials}
+
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(matrices,)) if workers > 1 else None
+    if pool is None:
+        _init_worker(matrices)
+
+    os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+    try:
+        with open(log_path, "a", encoding="utf-8") as log:
+            surviving = list(trials)
+            for rung, year in enumerate(validation_years):
+                jobs = [(t.trial_id, t.model, t.params, trial_keys[t.trial_id], year) for t in surviving]
+                results = pool.map(_run_trial_season, jobs) if pool else map(_run_trial_season, jobs)
+                for trial_id, season, metrics in results:
+                    by_id[trial_id].seasons[season] = metrics
+
+                last_rung = rung == len(validation_years) - 1
+                ranked = sorted(surviving, key=lambda t: t.score(metric), reverse=higher_is_better)
+                keep = len(ranked) if last_rung else max(1, math.ceil(len(ranked) / eta))
+                for trial in ranked[keep:]:
+                    trial.status = "stopped"
+                    _log_trial(log, experiment, trial, trial_keys[trial.trial_id], metric)
+                surviving = ranked[:keep]
+                print(f"Rung {rung + 1}/{len(validation_years)} ({year}): {len(ranked)} trials, "
+                      f"best {metric} {ranked[0].score(metric):.4f}")
+
+            for trial in surviving:
+                trial.status = "complete"
+                _log_trial(log, experiment, trial, trial_keys[trial.trial_id], metric)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    rows = [{
+        "trial": trial.trial_id,
+        "status": trial.status,
+        "model": trial.model,
+        "params": trial.params,
+        **trial.features,
+        "seasons": len(trial.seasons),
+        metric: trial.score(metric),
+        "fit_seconds": sum(season["fit_seconds"] for season in trial.seasons.values()),
+    } for trial in trials]
+    result = pd.DataFrame(rows)
+    result["complete"] = result["status"] == "complete"
+    result = result.sort_values(["complete", "seasons", metric], ascending=[False, False, not higher_is_better],
+                                ignore_index=True)
+    return result.drop(columns="complete")
+
+
+def read_log(log_path: str = EXPERIMENT_LOG) -> pd.DataFrame:
+    """Experiment log as a DataFrame, one row per logged trial"""
+    if not os.path.exists(log_path):
+        return pd.DataFrame()
+    return pd.read_json(log_path, lines=True)
+
+
+def _parse_years(value: str) -> Sequence[int]:
+    if "-" in value:
+        first, last = value.split("-")
+        return range(int(first), int(last) + 1)
+    return [int(year) for year in value.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hyperparameter search for the match models")
+    parser.add_argument("--selection", default="NRL")
+    parser.add_argument("--years", default="2008-2024", help="seasons to load, e.g. 2008-2024")
+    parser.add_argument("--validation", default="2022-2024", help="seasons scored one rung at a time")
+    parser.add_argument("--models", default="ridge,logistic,gbt,elo", help=f"comma separated from {sorted(MODELS)}")
+    parser.add_argument("--space", default=None, help="JSON file of {model: {param: [values]}, 'features': {...}}")
+    parser.add_argument("--trials", type=int, default=None, help="random sample size (default: full grid)")
+    parser.add_argument("--metric", default="margin_mae", choices=sorted(METRICS))
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--log", default=EXPERIMENT_LOG)
+    args = parser.parse_args()
+
+    space = {name: DEFAULT_SPACE[name] for name in args.models.split(",")}
+    feature_space = dict(DEFAULT_FEATURE_SPACE)
+    if args.space:
+        with open(args.space, encoding="utf-8") as f:
+            custom = json.load(f)
+        feature_space.update(custom.pop("features", {}))
+        space = {name: custom.get(name, grid) for name, grid in space.items()}
+
+    years, validation_years = list(_parse_years(args.years)), list(_parse_years(args.validation))
+    trials = sample_trials(space, feature_space, args.trials, args.seed)
+    print(f"{len(trials)} trials over {len(validation_years)} validation seasons")
+    try:
+        result = run_search(trials, args.selection, years, validation_years, args.metric, args.eta,
+                            args.workers, log_path=args.log)
+    except ValueError as ex:
+        raise SystemExit(str(ex))
+    print(result.head(20).to_string())
+    print(f"Logged to {args.log}")
@@ -6,19 +6,17 @@ This module defines a class for downloading structured JSON datasets
 data server. It supports organizing the data by competition and year.
 
 Requires:
-    - requests
-    - ENVIRONMENT_VARIABLES.py containing `DATA_WEBSITE`
+    - httpx (through utilities.http_client)
+    - config.environment containing `DATA_WEBSITE`
 """
 
 import os
-import sys
-import requests
 import json
 from typing import List, Callable
 
-# Add parent directory to path to import environment variables
-sys.path.append('..')
-import ENVIRONMENT_VARIABLES as EV
+from config import environment as EV
+from config.paths import DATA_DIR
+from scraping.utilities.http_client import get_client
 
 # Configurable constants
 SELECTION_TYPE: List[str] = ['HOSTPLUS']
@@ -46,7 +44,7 @@ class DataDownloader:
         List of methods that return filenames to download
     """
 
-    def __init__(self, selection: str, year: int, base_path: str = "./../data/") -> None:
+    def __init__(self, selection: str, year: int, base_path: str = DATA_DIR) -> None:
         """
         Initialize the downloader for a specific competition and year.
 
@@ -57,7 +55,7 @@ class DataDownloader:
         year : int
             Year of the dataset
         base_path : str, optional
-            Path to save downloaded files (default is "./../data/")
+            Path to save downloaded files (default is the repository data directory)
         """
         self.selection: str = selection
         self.year: int = year
@@ -125,7 +123,7 @@ class DataDownloader:
                 print(f"File already exists, skipping: {file_path}")
                 continue
 
-            response = requests.get(file_url)
+            response = get_client().get(file_url)
             if response.status_code == 200:
                 try:
                     data = response.json()
@@ -1,24 +1,52 @@
 import json
-import pandas as pd
-import numpy as np
-from utilities.get_detailed_match_data import get_detailed_nrl_data
-from utilities.set_up_driver import set_up_driver
+from scraping.utilities.get_detailed_match_data import get_detailed_nrl_data
+from scraping.utilities.http_client import get_client
+from scraping.utilities.instrumentation import get_metrics
+from urllib.parse import urlparse
 import sys
 
-sys.path.append("..")
-import ENVIRONMENT_VARIABLES as EV
+from config import environment as EV
+from data.loader import LoadReport, iter_match_rounds, season_path
 
 # Define key variables
 # SELECTION_TYPE = 'HOSTPLUS'
 # SELECT_YEAR = 2024
 # SELECT_ROUND = 1
 
+def fetch_match_data(driver, h_team, a_team, round_num, year, website=EV.NRL_WEBSITE, retries=2):
+    """
+    Fetch the detailed data for a single match with a persistent WebDriver.
+    Page loads go through the shared client's per-host rate limit and circuit
+    breaker, retrying with jittered backoff; returns {"Home v Away": data} or None.
+    Only load failures (timeouts, WebDriver errors) are retried and count
+    against the host; a page that loads but cannot be parsed fails at once.
+    """
+    from scraping.utilities.set_up_driver import transport_errors
+
+    def load():
+        game_data = get_detailed_nrl_data(
+            round=round_num, year=year,
+            home_team=h_team.lower(), away_team=a_team.lower(),
+            driver=driver, nrl_website=website  # **Pass persistent WebDriver**
+        )
+        if "match" not in game_data:
+            raise ValueError("no match data on page")
+        return game_data
+
+    try:
+        game_data = get_client().call(urlparse(website).netloc, load, retries=retries, retry_on=transport_errors())
+        return {f"{h_team} v {a_team}": game_data}
+    except Exception as ex:
+        cause = get_metrics().failure(ex, "detailed")
+        print(f"Failed to fetch {h_team} vs {a_team} ({cause}): {ex}")
+    return None
+
+
 def match_data_detailed_select(SELECT_YEAR, SELECT_ROUND, SELECTION_TYPE):
     
         
-    VARIABLES = ["Year", "Win", "Defense", "Attack", "Margin", "Home", "Versus", "Round"]
-    JSON_FILE_PATH = f"../data/{SELECTION_TYPE}/{SELECT_YEAR}/{SELECTION_TYPE}_data_{SELECT_YEAR}.json"
-    OUTPUT_FILE_PATH = f"../data/{SELECTION_TYPE}/{SELECT_YEAR}/{SELECTION_TYPE}_detailed_match_data_{SELECT_YEAR}.json"
+    JSON_FILE_PATH = season_path(SELECTION_TYPE, SELECT_YEAR, "match")
+    OUTPUT_FILE_PATH = season_path(SELECTION_TYPE, SELECT_YEAR, "detailed")
 
 
     # ============================================
@@ -27,69 +55,39 @@ def match_data_detailed_select(SELECT_YEAR, SELECT_ROUND, SELECTION_TYPE):
     # ============================================
     # ============================================
 
-    selection_mapping = {
-        'NRLW': (EV.NRLW_TEAMS, EV.NRLW_WEBSITE),
-        'KNOCKON': (EV.KNOCKON_TEAMS, EV.KNOCKON_WEBSITE),
-        'HOSTPLUS': (EV.HOSTPLUS_TEAMS, EV.HOSTPLUS_WEBSITE)
-    }
+    # Website selecter
+    _, WEBSITE = EV.SELECTION_MAPPING.get(SELECTION_TYPE, EV.SELECTION_MAPPING['NRL'])
 
-    WEBSITE = EV.NRL_WEBSITE
-    # Team name selecter
-    TEAMS = EV.TEAMS
-    TEAMS, WEBSITE = selection_mapping.get(SELECTION_TYPE, (TEAMS, WEBSITE))
 
-
-    # Load NRL match data
+    # Load NRL match data, reporting any rounds or matches that cannot be read
+    report = LoadReport()
     try:
-        with open(JSON_FILE_PATH, "r") as file:
-            data = json.load(file)[f"{SELECTION_TYPE}"]
-    except (FileNotFoundError, KeyError, json.JSONDecodeError) as e:
+        rounds_arr = {
+            round_num: games
+            for _, round_num, games in iter_match_rounds(JSON_FILE_PATH, SELECTION_TYPE, report)
+        }
+    except (FileNotFoundError, ValueError) as e:
         print(f"Error loading JSON data: {e}")
         sys.exit(1)
-
-    # Extract data for the selected year
-    try:
-        years_arr = {SELECT_YEAR: data[0][str(SELECT_YEAR)]}  # Use direct indexing
-    except IndexError as e:
-        print(f"Error accessing year data: {e}")
-        sys.exit(1)
-
-    # Create DataFrame with appropriate columns
-    df = pd.DataFrame(columns=[f"{team} {variable}" for team in TEAMS for variable in VARIABLES])
-
-
-    # ** Function to Fetch Data for a Single Match (Using Persistent WebDriver) **
-    def fetch_match_data(driver, game, round_num):
-        h_team, a_team = game["Home"], game["Away"]
-
-        # Try fetching data twice before failing
-        game_data = None
-        for attempt in range(2):
-            try:
-                game_data = get_detailed_nrl_data(
-                    round=round_num + 1, year=SELECT_YEAR,
-                    home_team=h_team.lower(), away_team=a_team.lower(),
-                    driver=driver, nrl_website=WEBSITE  # **Pass persistent WebDriver**
-                )
-                if "match" in game_data:
-                    return {f"{h_team} v {a_team}": game_data}  
-            except Exception as ex:
-                print(f"Attempt {attempt + 1} failed for {h_team} vs {a_team}: {ex}")
-
-        return None 
-
+    if report.issues:
+        print(report.summary())
 
     # ** Keep Selenium WebDriver Open **
+    from scraping.utilities.set_up_driver import set_up_driver
+
     driver = set_up_driver()  # **Initialize WebDriver once**
     match_json_datas = []
 
     for round_num in range(SELECT_ROUND):
+        if round_num + 1 not in rounds_arr:
+            print(f"Round {round_num + 1} missing from {JSON_FILE_PATH}, skipping.")
+            continue
         try:
-            round_data = years_arr[SELECT_YEAR][round_num][str(round_num + 1)]
+            round_data = rounds_arr[round_num + 1]
             round_data_scores = []
 
             for game in round_data:
-                match_data = fetch_match_data(driver, game, round_num)
+                match_data = fetch_match_data(driver, game.home, game.away, round_num + 1, SELECT_YEAR, WEBSITE)
                 if match_data:
                     round_data_scores.append(match_data)
 
@@ -3,11 +3,10 @@ This script fetches NRL  match data for the selected year and saves it to a JSON
 """
 
 # Imports
-from utilities.get_nrl_data import get_nrl_data
+from scraping.utilities.get_nrl_data import get_nrl_data
 import json
-import sys
-sys.path.append('..')
-import ENVIRONMENT_VARIABLES as EV
+from config import environment as EV
+from data.loader import season_path
 import os
 
 
@@ -36,10 +35,8 @@ def match_data_select(SELECT_YEAR, SELECT_ROUNDS, SELECTION_TYPE):
 
     overall_data = {f"{SELECTION_TYPE}": match_json_datas}
 
-    directory_path = os.path.abspath(f"../data/{SELECTION_TYPE}/{SELECT_YEAR}/")
-    os.makedirs(directory_path, exist_ok=True)
-
-    file_path = os.path.join(directory_path, f"{SELECTION_TYPE}_data_{SELECT_YEAR}.json")
+    file_path = season_path(SELECTION_TYPE, SELECT_YEAR, "match")
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
     try:
         with open(file_path, "w", encoding="utf-8") as file:
             json.dump(overall_data, file, ensure_ascii=False, separators=(',', ':'))
@@ -0,0 +1,405 @@
+"""
+Pipeline that scrapes several competitions at once.
+
+Every (competition, season, round) is a unit of work, split into stages:
+the match list ("match") comes first, and the detailed match data
+("detailed") and player statistics ("player") for that round depend on it.
+Units from different competitions and seasons are independent, so they run
+concurrently on a thread pool. Requests go through the shared HTTP client,
+whose per-host token bucket and circuit breaker pace nrl.com, qrl.com.au and
+nswrl.com.au on their own.
+
+Season files are rewritten in round order after every completed round, in
+the same layout as match_data_select, match_data_detailed_select and
+player_data_select. A single progress line reports done/failed/skipped
+units, throughput and ETA across all competitions, and stage timings,
+matches per minute and failures by cause are collected by
+scraping.utilities.instrumentation and saved with --metrics. Once the scrape
+finishes, the chart data of the changed seasons is rebuilt and the NRL
+results are applied to the saved team ratings and matchup index.
+
+Usage (from the repository root):
+    python -m scraping.pipeline --selections NRL,NRLW,HOSTPLUS,KNOCKON --years 2023-2024 --rounds 27 \
+        --metrics data/cache/scrape_metrics.jsonl
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+from config import environment as EV
+from config.paths import MATCHUP_INDEX_PATH, RATINGS_PATH, REGISTRY_PATH
+from data.loader import DATA_DIR, season_path
+from scraping.utilities.instrumentation import get_metrics
+
+STAGES = ["match", "detailed", "player"]
+
+# Stages that need the match list of their round first
+DEPENDENCIES = {"match": [], "detailed": ["match"], "player": ["match"]}
+
+# Worker threads per host when --workers is not given
+WORKERS_PER_HOST = 2
+
+# Seconds between progress lines
+PROGRESS_INTERVAL = 10
+
+# Competition the saved ratings and matchup index cover
+RATINGS_SELECTION = "NRL"
+
+
+@dataclass(frozen=True)
+class WorkUnit:
+    selection: str
+    year: int
+    round: int
+    stage: str
+
+    def __str__(self):
+        return f"{self.selection} {self.year} round {self.round} {self.stage}"
+
+
+# ============================================
+# Hosts
+# ============================================
+
+def stage_host(selection, stage):
+    """Host a stage talks to: match lists come from nrl.com, match pages from the competition site"""
+    if stage == "match":
+        return urlparse(EV.NRL_BASE_URL).netloc
+    _, website = EV.SELECTION_MAPPING.get(selection, EV.SELECTION_MAPPING['NRL'])
+    return urlparse(website).netloc
+
+
+# ============================================
+# Stages
+# ============================================
+
+_browser = threading.local()
+_drivers = []
+_drivers_lock = threading.Lock()
+
+
+def thread_driver():
+    """One WebDriver per worker thread, created on first use"""
+    if getattr(_browser, "driver", None) is None:
+        from scraping.utilities.set_up_driver import set_up_driver
+
+        _browser.driver = set_up_driver()
+        with _drivers_lock:
+            _drivers.append(_browser.driver)
+    return _browser.driver
+
+
+def close_drivers():
+    with _drivers_lock:
+        for driver in _drivers:
+            try:
+                driver.quit()
+            except Exception as ex:
+                print(f"Error closing WebDriver: {ex}")
+        _drivers.clear()
+
+
+def run_match_stage(unit, matches):
+    """Fetch the round's match list; returns get_nrl_data's {round: [matches]}"""
+    from scraping.utilities.get_nrl_data import get_nrl_data
+
+    round_data = get_nrl_data(unit.round, unit.year, EV.COMPETITION[unit.selection])
+    if round_data is None:
+        raise RuntimeError("no fixture data returned")
+    return round_data
+
+
+def run_detailed_stage(unit, matches):
+    """Fetch the detailed data of every match in the round"""
+    from scraping.match_data_detailed_select import fetch_match_data
+
+    _, website = EV.SELECTION_MAPPING.get(unit.selection, EV.SELECTION_MAPPING['NRL'])
+    results = []
+    for game in matches:
+        match_data = fetch_match_data(thread_driver(), game["Home"], game["Away"], unit.round, unit.year, website)
+        if match_data:
+            results.append(match_data)
+    return results
+
+
+def run_player_stage(unit, matches):
+    """Fetch the player statistics of every match in the round"""
+    from scraping.player_data_select import fetch_player_match
+
+    _, website = EV.SELECTION_MAPPING.get(unit.selection, EV.SELECTION_MAPPING['NRL'])
+    results = []
+    for game in matches:
+        try:
+            match_key, players = fetch_player_match(
+                thread_driver(), unit.year, unit.round, game["Home"], game["Away"], unit.selection, website)
+        except Exception as ex:
+            get_metrics().failure(ex, "player")
+            raise
+        results.append({match_key: players})
+    return results
+
+
+STAGE_FUNCTIONS = {"match": run_match_stage, "detailed": run_detailed_stage, "player": run_player_stage}
+
+
+# ============================================
+# Output
+# ============================================
+
+class SeasonWriter:
+    """Collects round results per (selection, year, stage) and rewrites the season file in round order"""
+
+    def __init__(self, base_path=DATA_DIR):
+        self.base_path = base_path
+        self._rounds = defaultdict(dict)
+        self._lock = threading.Lock()
+
+    def add(self, unit, result):
+        key = (unit.selection, unit.year, unit.stage)
+        with self._lock, get_metrics().stage("write"):
+            self._rounds[key][unit.round] = result
+            rounds = dict(sorted(self._rounds[key].items()))
+            path = season_path(unit.selection, unit.year, unit.stage, self.base_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(self._layout(unit, rounds), file, ensure_ascii=False, separators=(',', ':'))
+
+    @staticmethod
+    def _layout(unit, rounds):
+        if unit.stage == "match":
+            return {unit.selection: [{str(unit.year): list(rounds.values())}]}
+        if unit.stage == "detailed":
+            return {unit.selection: [{round_num: games} for round_num, games in rounds.items()]}
+        # Player statistics files use zero-based round keys
+        return {"PlayerStats": [{str(unit.year): [{str(round_num - 1): games} for round_num, games in rounds.items()]}]}
+
+
+# ============================================
+# Scheduler
+# ============================================
+
+class Progress:
+    """Counts finished units and prints a combined progress and throughput line"""
+
+    def __init__(self, total):
+        self.total = total
+        self.started = time.monotonic()
+        self.counts = defaultdict(int)
+        self.by_selection = defaultdict(lambda: defaultdict(int))
+        self._last_print = 0.0
+
+    def record(self, unit, status):
+        self.counts[status] += 1
+        self.by_selection[unit.selection][status] += 1
+
+    @property
+    def finished(self):
+        return sum(self.counts.values())
+
+    def line(self):
+        elapsed = time.monotonic() - self.started
+        rate = self.counts["done"] / elapsed * 60 if elapsed else 0.0
+        remaining = self.total - self.finished
+        eta = remaining / (self.finished / elapsed) if self.finished and elapsed else float("nan")
+        return (f"[{self.finished}/{self.total}] done {self.counts['done']}, failed {self.counts['failed']}, "
+                f"skipped {self.counts['skipped']} | {rate:.1f} units/min | "
+                f"elapsed {elapsed:.0f}s, ETA {eta:.0f}s")
+
+    def maybe_print(self, force=False):
+        now = time.monotonic()
+        if force or now - self._last_print >= PROGRESS_INTERVAL:
+            self._last_print = now
+            print(self.line())
+
+    def report(self):
+        lines = [self.line()]
+        for selection, counts in sorted(self.by_selection.items()):
+            lines.append(f"  {selection}: " + ", ".join(f"{status} {count}" for status, count in sorted(counts.items())))
+        return "\n".join(lines)
+
+
+def build_graph(selections, years, rounds, stages=STAGES):
+    """
+    Work units and their dependencies for every (selection, year, round).
+    rounds is a round count for every year or a {year: rounds} mapping.
+    """
+    graph = {}
+    for selection in selections:
+        for year in years:
+            for round_num in range(1, (rounds[year] if isinstance(rounds, dict) else rounds) + 1):
+                for stage in stages:
+                    unit = WorkUnit(selection, year, round_num, stage)
+                    graph[unit] = [WorkUnit(selection, year, round_num, dep) for dep in DEPENDENCIES[stage]
+                                   if dep in stages]
+    return graph
+
+
+def run_pipeline(selections, years, rounds, stages=STAGES, host_rate=None, host_burst=None, workers=None,
+                 base_path=DATA_DIR, stage_functions=None, metrics_path=None, metrics_format=None):
+    """
+    Scrape every (selection, year, round) unit, respecting stage dependencies,
+    and return the Progress with the final counts.
+
+    Per-host pacing is left to the shared HTTP client; host_rate (requests
+    per second) and host_burst override its token bucket for every host the
+    run talks to. stage_functions maps stage name -> fn(unit, matches) and
+    defaults to STAGE_FUNCTIONS. Stage metrics are written to metrics_path
+    ("jsonl" or "prometheus", see ScrapeMetrics.write) when given.
+    """
+    stage_functions = stage_functions or STAGE_FUNCTIONS
+    graph = build_graph(selections, years, rounds, stages)
+    dependents = defaultdict(list)
+    for unit, deps in graph.items():
+        for dep in deps:
+            dependents[dep].append(unit)
+
+    hosts = {stage_host(selection, stage) for selection in selections for stage in stages}
+    if host_rate is not None or host_burst is not None:
+        from scraping.utilities.http_client import get_client
+
+        for host in hosts:
+            get_client().configure_host(host, rate=host_rate, burst=host_burst)
+    workers = workers or max(1, WORKERS_PER_HOST * len(hosts))
+
+    writer = SeasonWriter(base_path)
+    progress = Progress(len(graph))
+    metrics = get_metrics()
+    round_matches = {}
+    remaining_deps = {unit: len(deps) for unit, deps in graph.items()}
+
+    def execute(unit):
+        matches = round_matches.get((unit.selection, unit.year, unit.round), [])
+        return stage_functions[unit.stage](unit, matches)
+
+    def skip(unit):
+        for dependent in dependents[unit]:
+            if remaining_deps.pop(dependent, None) is not None:
+                progress.record(dependent, "skipped")
+                skip(dependent)
+
+    print(f"Scheduling {len(graph)} units for {', '.join(selections)} on {workers} workers "
+          f"({', '.join(sorted(hosts))})")
+    try:
+        with ThreadPoolExecutor(workers) as pool:
+            running = {}
+
+            def submit_ready():
+                for unit in [u for u, count in remaining_deps.items() if count == 0]:
+                    del remaining_deps[unit]
+                    running[pool.submit(execute, unit)] = unit
+
+            submit_ready()
+            while running:
+                finished, _ = wait(running, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    unit = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as ex:
+                        print(f"Failed {unit}: {ex}")
+                        progress.record(unit, "failed")
+                        skip(unit)
+                        continue
+
+                    if unit.stage == "match":
+                        round_matches[(unit.selection, unit.year, unit.round)] = next(iter(result.values()), [])
+                        metrics.add_matches(unit.stage, len(round_matches[(unit.selection, unit.year, unit.round)]))
+                    else:
+                        metrics.add_matches(unit.stage, len(result))
+                    writer.add(unit, result)
+                    progress.record(unit, "done")
+                    for dependent in dependents[unit]:
+                        if dependent in remaining_deps:
+                            remaining_deps[dependent] -= 1
+                submit_ready()
+                progress.maybe_print()
+    finally:
+        close_drivers()
+        if metrics_path:
+            metrics.write(metrics_path, metrics_format)
+
+    print(progress.report())
+    if {"match", "detailed"} & set(stages):
+        refresh_charts(selections, years, base_path)
+    if "match" in stages:
+        update_models(round_matches, base_path)
+    return progress
+
+
+def refresh_charts(selections, years, base_path=DATA_DIR):
+    """Rebuild the web UI chart data of the seasons whose results changed"""
+    try:
+        from data.charts import refresh
+
+        for path in refresh(selections, years, base_path):
+            print(f"Updated chart data {path}")
+    except Exception as ex:
+        print(f"Chart data not updated: {ex}")
+
+
+def update_models(round_matches, base_path=DATA_DIR):
+    """
+    Apply the scraped NRL rounds, oldest first, to the saved team ratings
+    and matchup index. round_matches maps (selection, year, round) -> that
+    round's matches; results already applied are skipped by update_round.
+    """
+    rounds = sorted((year, round_num, matches) for (selection, year, round_num), matches in round_matches.items()
+                    if selection == RATINGS_SELECTION)
+    if not rounds:
+        return
+    try:
+        from data.entities import get_registry
+        from data.matchup_index import MatchupIndex
+        from predictions.ratings import RatingEngine
+    except ImportError as ex:
+        print(f"Ratings and matchup index not updated: {ex}")
+        return
+
+    for name, model, default_path in (("ratings", RatingEngine, RATINGS_PATH),
+                                      ("matchup index", MatchupIndex, MATCHUP_INDEX_PATH)):
+        try:
+            path = os.path.join(base_path, os.path.basename(default_path))
+            state = model.load(path) if os.path.exists(path) else model.for_competition(RATINGS_SELECTION)
+            applied = sum(state.update_round({str(round_num): matches}, year, RATINGS_SELECTION)
+                          for year, round_num, matches in rounds)
+            state.save(path)
+            print(f"Applied {applied} results to the {name} in {path}")
+            if model is MatchupIndex:
+                # Venues first seen in this run get IDs in the shared registry
+                get_registry().save_changes(os.path.join(base_path, os.path.basename(REGISTRY_PATH)))
+        except Exception as ex:
+            print(f"{name.capitalize()} not updated: {ex}")
+
+
+def _parse_years(value):
+    if "-" in value:
+        first, last = value.split("-")
+        return list(range(int(first), int(last) + 1))
+    return [int(year) for year in value.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape several competitions concurrently")
+    parser.add_argument("--selections", default="NRL,NRLW,HOSTPLUS,KNOCKON")
+    parser.add_argument("--years", default="2024", help="e.g. 2020-2024 or 2023,2024")
+    parser.add_argument("--rounds", type=int, default=27)
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument("--host-rate", type=float, default=None,
+                        help="starting requests per second per host (default: the HTTP client's)")
+    parser.add_argument("--host-burst", type=int, default=None, help="request burst per host")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--metrics", default=None, help="write stage metrics here (.jsonl, or .prom for Prometheus)")
+    parser.add_argument("--metrics-format", choices=["jsonl", "prometheus"], default=None)
+    args = parser.parse_args()
+
+    run_pipeline(args.selections.split(","), _parse_years(args.years), args.rounds, args.stages.split(","),
+                 args.host_rate, args.host_burst, args.workers, metrics_path=args.metrics,
+                 metrics_format=args.metrics_format)
+    print(get_metrics().summary())
@@ -4,12 +4,76 @@ Optimized Web Scraper for NRL Player Statistics (Fast Execution, Saves Per Round
 
 from bs4 import BeautifulSoup
 import json
-import sys
 import os
-from utilities.set_up_driver import set_up_driver
+from urllib.parse import urlparse
+from scraping.utilities.http_client import get_client
+from scraping.utilities.instrumentation import get_metrics
+from scraping.utilities.set_up_driver import wait_for_selectors
 
-sys.path.append("..")
-import ENVIRONMENT_VARIABLES as EV
+from config import environment as EV
+from data.loader import LoadReport, iter_match_rounds, season_path
+from data.entities import team_slug
+
+# Player statistics table rows, rendered after the page's scripts run
+READY_SELECTORS = ["tr.table-tbody__tr"]
+
+
+def fetch_player_match(driver, year, round_num, home, away, selection_type, website=EV.NRL_WEBSITE, retries=2):
+    """
+    Scrape the player statistics table of one match centre page.
+    Returns (match_key, [player rows]).
+    The page load goes through the shared client's per-host rate limit and
+    circuit breaker, retrying load failures (timeouts, WebDriver errors)
+    with jittered backoff, as in match_data_detailed_select.fetch_match_data.
+    """
+    from scraping.utilities.set_up_driver import transport_errors
+
+    h_team, a_team = [team.replace(" ", "-") for team in (home, away)]
+    match_key = f"{year}-{round_num}-{h_team}-v-{a_team}"
+
+    h_slug, a_slug = [team_slug(team, selection_type) for team in (home, away)]
+    url = f"{website}{year}/round-{round_num}/{h_slug}-v-{a_slug}/"
+    print(f"Fetching: {url}")
+
+    # Use existing WebDriver (runs headless for speed)
+    metrics = get_metrics()
+
+    def load():
+        with metrics.stage("fetch"):
+            driver.get(url)
+        with metrics.stage("render"):
+            wait_for_selectors(driver, READY_SELECTORS)
+            return driver.page_source
+
+    html = get_client().call(urlparse(website).netloc, load, retries=retries, retry_on=transport_errors())
+    with metrics.stage("parse"):
+        soup = BeautifulSoup(html, "html.parser")
+
+    # Extract player data
+    with metrics.stage("extract"):
+        players_info = _extract_players(soup)
+    return match_key, players_info
+
+
+def _extract_players(soup):
+    rows = soup.find_all("tr", class_="table-tbody__tr")
+    players_info = []
+
+    for row in rows:
+        player_info = {}
+        player_name_elem = row.find("a", class_="table__content-link")
+
+        if player_name_elem:
+            player_info["Name"] = player_name_elem.get_text(strip=True, separator=" ")
+
+        statistics = row.find_all("td", class_="table__cell table-tbody__td")
+
+        for i, label in enumerate(EV.PLAYER_LABELS):
+            player_info[label] = statistics[i].get_text(strip=True) if i < len(statistics) else "na"
+
+        players_info.append(player_info)
+
+    return players_info
 
 
 def player_data_select(SELECT_YEAR, SELECT_ROUND, SELECTION_TYPE):
@@ -19,75 +83,48 @@ def player_data_select(SELECT_YEAR, SELECT_ROUND, SELECTION_TYPE):
     # ============================================
     # ============================================
 
-    selection_mapping = {
-        'NRLW': (EV.NRLW_TEAMS, EV.NRLW_WEBSITE),
-        'KNOCKON': (EV.KNOCKON_TEAMS, EV.KNOCKON_WEBSITE),
-        'HOSTPLUS': (EV.HOSTPLUS_TEAMS, EV.HOSTPLUS_WEBSITE)
-    }
-
-    WEBSITE = EV.NRL_WEBSITE
-    # Team name selecter
-    TEAMS = EV.TEAMS
-    TEAMS, WEBSITE = selection_mapping.get(SELECTION_TYPE, (TEAMS, WEBSITE))
+    # Team name and website selecter
+    TEAMS, WEBSITE = EV.SELECTION_MAPPING.get(SELECTION_TYPE, EV.SELECTION_MAPPING['NRL'])
 
 
     # List of variables for data extraction
     variables = ["Year", "Win", "Versus", "Round"]
 
-    years_overall = [SELECT_YEAR]
     years = [SELECT_YEAR]
 
     # Define file path for player statistics
-    player_stats_file = f"../data/{SELECTION_TYPE}/{SELECT_YEAR}/{SELECTION_TYPE}_player_statistics_{SELECT_YEAR}.json"
+    player_stats_file = season_path(SELECTION_TYPE, SELECT_YEAR, "player")
 
     # **RESET FILE EACH RUN**: Overwrite file with an empty structure
     player_stats = {"PlayerStats": [{str(SELECT_YEAR): []}]}
 
-    # Load NRL match data
-    with open(f"../data/{SELECTION_TYPE}/{SELECT_YEAR}/{SELECTION_TYPE}_data_{SELECT_YEAR}.json", "r") as file:
-        data = json.load(file)
-        data = data[f"{SELECTION_TYPE}"]
-
-    # Store match data for the selected year
-    years_arr = {year: data[years_overall.index(year)][str(year)] for year in years}
+    # Load NRL match data, reporting any rounds or matches that cannot be read
+    match_file = season_path(SELECTION_TYPE, SELECT_YEAR, "match")
+    report = LoadReport()
+    years_arr = {year: {} for year in years}
+    for year, round_num, games in iter_match_rounds(match_file, SELECTION_TYPE, report):
+        if year in years_arr:
+            years_arr[year][round_num] = games
+    if report.issues:
+        print(report.summary())
 
     # **Start WebDriver once and reuse it**
+    from scraping.utilities.set_up_driver import set_up_driver
+
     driver = set_up_driver()
 
     for year in years:
         try:
             for round in range(SELECT_ROUND):
-                round_data = years_arr[year][round][str(round + 1)]
+                if round + 1 not in years_arr[year]:
+                    print(f"Round {round + 1} missing from {match_file}, skipping.")
+                    continue
+                round_data = years_arr[year][round + 1]
                 round_results = []  # Store all matches for this round
 
                 for game in round_data:
-                    h_team, a_team = [game[x].replace(" ", "-") for x in ["Home", "Away"]]
-                    match_key = f"{year}-{round+1}-{h_team}-v-{a_team}"
-
-                    url = f"{WEBSITE}{year}/round-{round+1}/{h_team}-v-{a_team}/"
-                    print(f"Fetching: {url}")
-
-                    # Use existing WebDriver (runs headless for speed)
-                    driver.get(url)
-                    soup = BeautifulSoup(driver.page_source, "html.parser")
-
-                    # Extract player data
-                    rows = soup.find_all("tr", class_="table-tbody__tr")
-                    players_info = []
-
-                    for row in rows:
-                        player_info = {}
-                        player_name_elem = row.find("a", class_="table__content-link")
-
-                        if player_name_elem:
-                            player_info["Name"] = player_name_elem.get_text(strip=True, separator=" ")
-
-                        statistics = row.find_all("td", class_="table__cell table-tbody__td")
-
-                        for i, label in enumerate(EV.PLAYER_LABELS):
-                            player_info[label] = statistics[i].get_text(strip=True) if i < len(statistics) else "na"
-
-                        players_info.append(player_info)
+                    match_key, players_info = fetch_player_match(
+                        driver, year, round + 1, game.home, game.away, SELECTION_TYPE, WEBSITE)
 
                     # Store match data for this round
                     round_results.append({match_key: players_info})
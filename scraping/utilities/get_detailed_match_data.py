@@ -3,11 +3,13 @@ Optimized Web Scraper for Finding NRL Team Statistics
 """
 
 from bs4 import BeautifulSoup
-from utilities.set_up_driver import set_up_driver
-import sys
+from scraping.utilities.instrumentation import get_metrics
+from scraping.utilities.set_up_driver import wait_for_selectors
+import re
+import time
 
-sys.path.append("..")
-import ENVIRONMENT_VARIABLES as EV
+from config import environment as EV
+from data.entities import slugify
 
 # Default statistics with missing values set to -1
 BARS_DATA = {
@@ -29,24 +31,92 @@ DONUT_DATA_2 = {
     '1_point_field_goals': -1, '2_point_field_goals': -1, 'half_time': -1
 }
 
+# Elements that show the match centre statistics have rendered
+READY_SELECTORS = ["dd.stats-bar-chart__label--home", "span.match-centre-summary-group__value"]
+
 DONUT_DATA_2_WORDS = [
     'TRIES', 'CONVERSIONS', 'PENALTY GOALS', 'SIN BINS',
     '1 POINT FIELD GOALS', '2 POINT FIELD GOALS', 'HALF TIME'
 ]
 
+# Match summary groups that list scoring players -> event type (see data/scoring_events.py)
+SCORING_GROUPS = {
+    'TRIES': 'try', 'CONVERSIONS': 'conversion', 'PENALTY GOALS': 'penalty_goal',
+    '1 POINT FIELD GOALS': 'field_goal_1', '2 POINT FIELD GOALS': 'field_goal_2'
+}
+
+# "Reece Walsh 12'", "Reece Walsh 12', 55'" or, without times, "Adam Reynolds 3/4"
+MINUTE_PATTERN = re.compile(r"(\d+)\s*'")
+MADE_PATTERN = re.compile(r"(\d+)\s*/\s*\d+\s*$")
+
+
+def parse_scoring_entry(text: str, event_type: str) -> list:
+    """One {type, player, minute} event per scoring act in a summary list entry"""
+    minutes = MINUTE_PATTERN.findall(text)
+    if minutes:
+        player = text[:MINUTE_PATTERN.search(text).start()].strip(" ,")
+        return [{'type': event_type, 'player': player, 'minute': int(m)} for m in minutes]
+    made = MADE_PATTERN.search(text)
+    if made:
+        player = text[:made.start()].strip(" ,")
+        return [{'type': event_type, 'player': player, 'minute': None} for _ in range(int(made.group(1)))]
+    return [{'type': event_type, 'player': text.strip(), 'minute': None}] if text.strip() else []
+
+
+def extract_scoring_events(soup) -> dict:
+    """
+    Every try, conversion, penalty goal and field goal in the match summary,
+    per side, in minute order. Lists are read from their summary group; when
+    the lists are not nested in groups, the first home/away lists on the page
+    are the tries, as the try scorer extraction always assumed.
+    """
+    events = {'home': [], 'away': []}
+    grouped = False
+    for span in soup.find_all('span', class_='match-centre-summary-group__name'):
+        group = span.find_parent(class_='match-centre-summary-group')
+        if group is None:
+            continue
+        grouped = True
+        event_type = SCORING_GROUPS.get(span.get_text(strip=True).upper())
+        if event_type is None:
+            continue
+        for side in events:
+            entries = group.find('ul', class_=f'match-centre-summary-group__list--{side}')
+            for entry in entries.find_all('li') if entries else []:
+                events[side].extend(parse_scoring_entry(entry.get_text(" ", strip=True), event_type))
+    if not grouped:
+        for side in events:
+            entries = soup.find('ul', class_=f'match-centre-summary-group__list--{side}')
+            for entry in entries.find_all('li') if entries else []:
+                events[side].extend(parse_scoring_entry(entry.get_text(" ", strip=True), 'try'))
+    for side_events in events.values():
+        # Untimed events (e.g. "3/4" conversion tallies) go last
+        side_events.sort(key=lambda event: (event['minute'] is None, event['minute'] or 0))
+    return events
+
 
 def get_detailed_nrl_data(round: int, year: int, home_team: str, away_team: str, driver=None, nrl_website=EV.NRL_WEBSITE):
-    home_team, away_team = [x.replace(" ", "-") for x in [home_team, away_team]]
+    home_team, away_team = [slugify(x) for x in [home_team, away_team]]
 
     url = f"{nrl_website}{year}/round-{round}/{home_team}-v-{away_team}/"
     print(f"Fetching data: {url}")
 
     # Webscrape the NRL website
+    metrics = get_metrics()
     if driver is None:
-        driver = set_up_driver()  # Only create a new driver if one isn't provided
+        from scraping.utilities.set_up_driver import set_up_driver
+
+        with metrics.stage("driver"):
+            driver = set_up_driver()  # Only create a new driver if one isn't provided
     
-    driver.get(url)
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+    with metrics.stage("fetch"):
+        driver.get(url)
+    with metrics.stage("render"):
+        wait_for_selectors(driver, READY_SELECTORS)
+        html = driver.page_source
+    with metrics.stage("parse"):
+        soup = BeautifulSoup(html, "html.parser")
+    extract_start = time.perf_counter()
 
     # Initialize match data structures
     home_bars, away_bars = BARS_DATA.copy(), BARS_DATA.copy()
@@ -81,28 +151,32 @@ def get_detailed_nrl_data(round: int, year: int, home_team: str, away_team: str,
     except Exception:
         print("Error: Issue extracting donut statistics.")
 
-    # **Extract Try Scorers & Times**
-    def extract_try_scorers(team_class):
-        try:
-            tries = soup.find("ul", class_=team_class).find_all("li")
-            names, times = zip(*[(t.get_text(strip=True).rsplit(" ", 1)) for t in tries])
-            return list(names), list(times)
-        except (AttributeError, ValueError):
-            return [], []
-
-    home_try_names, home_try_minutes = extract_try_scorers("match-centre-summary-group__list--home")
-    away_try_names, away_try_minutes = extract_try_scorers("match-centre-summary-group__list--away")
-
-    # **Determine First Try Scorer**
-    def determine_first_scorer():
-        if not home_try_minutes and not away_try_minutes:
-            return None, None, None
-        elif not away_try_minutes or (home_try_minutes and home_try_minutes[0] < away_try_minutes[0]):
-            return home_try_names[0], home_try_minutes[0], home_team
-        else:
-            return away_try_names[0], away_try_minutes[0], away_team
-
-    overall_first_try_scorer, overall_first_try_minute, overall_first_scorer_team = determine_first_scorer()
+    # **Extract Scoring Events (tries, goals and field goals with their minutes)**
+    try:
+        scoring_events = extract_scoring_events(soup)
+    except Exception:
+        scoring_events = {'home': [], 'away': []}
+        print("Error: Issue extracting scoring events.")
+
+    # **Determine First Try Scorer** (integer minutes: "9'" no longer sorts after "12'")
+    # Same-minute tries go to the home side, which the summary lists first
+    timed_tries = sorted(
+        (event['minute'], side != 'home', event['player'])
+        for side, events in scoring_events.items() for event in events
+        if event['type'] == 'try' and event['minute'] is not None
+    )
+    if timed_tries:
+        overall_first_try_minute, away_first, overall_first_try_scorer = timed_tries[0]
+        overall_first_scorer_team = away_team if away_first else home_team
+    else:
+        overall_first_try_scorer, overall_first_try_minute, overall_first_scorer_team = None, None, None
+
+    def try_columns(side):
+        # Timed tries only, so try_names and try_minutes stay aligned; scoring_events keeps every try
+        tries = [event for event in scoring_events[side] if event['type'] == 'try' and event['minute'] is not None]
+        return {'try_names': [event['player'] for event in tries],
+                'try_minutes': [f"{event['minute']}'" for event in tries],
+                'scoring_events': scoring_events[side]}
 
     # **Check Missing Data for DONUT_DATA_2**
     span_elements = {span.text.strip().upper() for span in soup.find_all('span', class_='match-centre-summary-group__name')}
@@ -146,4 +220,9 @@ def get_detailed_nrl_data(round: int, year: int, home_team: str, away_team: str,
         'ground_condition': ground_condition, 'weather_condition': weather_condition
     }
 
-    return {'match': match_data, 'home': {**home_bars, **home_donut, **home_game_stats}, 'away': {**away_bars, **away_donut, **away_game_stats}}
+    metrics.observe("extract", time.perf_counter() - extract_start)
+    return {
+        'match': match_data,
+        'home': {**home_bars, **home_donut, **home_game_stats, **try_columns('home')},
+        'away': {**away_bars, **away_donut, **away_game_stats, **try_columns('away')}
+    }
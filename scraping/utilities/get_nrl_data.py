@@ -2,33 +2,41 @@
 Optimized Web Scraper for NRL Team Statistics
 """
 
-import requests
 from bs4 import BeautifulSoup
-import sys
 
-sys.path.append("..")
-import ENVIRONMENT_VARIABLES as EV
-import requests
+from config import environment as EV
+from data.entities import competition_for_id, team_id
+from scraping.utilities.http_client import CircuitOpenError, get_client
+from scraping.utilities.instrumentation import get_metrics
+import httpx
 import json
-from bs4 import BeautifulSoup
+import time
 
 def get_nrl_data(round=1, year=2024, competition = '111'):
-    url = f"https://www.nrl.com/draw/?competition={competition}&round={round}&season={year}"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-    }
-    
-    response = requests.get(url, headers=headers)
+    url = f"{EV.NRL_DRAW_URL}?competition={competition}&round={round}&season={year}"
+    # Shared client: pooled connections, per-host rate limit, retries with backoff
+    metrics = get_metrics()
+    try:
+        with metrics.stage("fetch"):
+            response = get_client().get(url)
+    except (httpx.HTTPError, CircuitOpenError) as ex:
+        cause = metrics.failure(ex, "match")
+        print(f"Failed to fetch data ({cause}): {ex}")
+        return None
     if response.status_code != 200:
         print("Failed to fetch data")
+        metrics.failure("http", "match")
         return None
 
-    soup = BeautifulSoup(response.text, "html.parser")
-    
+    with metrics.stage("parse"):
+        soup = BeautifulSoup(response.text, "html.parser")
+    extract_start = time.perf_counter()
+
     # Find the JSON data within the HTML
     script_tag = soup.find("div", {"id": "vue-draw"})
     if not script_tag:
         print("Could not find fixture data")
+        metrics.failure("parse", "match")
         return None
 
     # Extract JSON from q-data attribute
@@ -39,6 +47,7 @@ def get_nrl_data(round=1, year=2024, competition = '111'):
     data = json.loads(raw_json)
 
     fixtures = data.get("fixtures", [])
+    selection = competition_for_id(competition) or 'NRL'
     
     matches_json = []
     for fixture in fixtures:
@@ -46,15 +55,20 @@ def get_nrl_data(round=1, year=2024, competition = '111'):
             match = {
                 "Round": fixture["roundTitle"],
                 "Home": fixture["homeTeam"]["nickName"],
-                "Home_Score": fixture["homeTeam"].get("score", 0),
+                # No score (None) until the match is played; Match_State tells live from final scores
+                "Home_Score": fixture["homeTeam"].get("score"),
                 "Away": fixture["awayTeam"]["nickName"],
-                "Away_Score": fixture["awayTeam"].get("score", 0),
+                "Away_Score": fixture["awayTeam"].get("score"),
+                "Match_State": fixture.get("matchState"),
+                "Home_Id": team_id(fixture["homeTeam"]["nickName"], selection),
+                "Away_Id": team_id(fixture["awayTeam"]["nickName"], selection),
                 "Venue": fixture["venue"],
                 "Date": fixture["clock"]["kickOffTimeLong"],
-                "Match_Centre_URL": f"https://www.nrl.com{fixture['matchCentreUrl']}",
+                "Match_Centre_URL": f"{EV.NRL_BASE_URL}{fixture['matchCentreUrl']}",
             }
             matches_json.append(match)
 
+    metrics.observe("extract", time.perf_counter() - extract_start)
     round_data = {
         f"{round}": matches_json
     }
@@ -0,0 +1,429 @@
+"""
+http_client.py
+
+Shared HTTP client for every outbound request made by the scrapers,
+downloader and fixture fetcher.
+
+One pooled ``httpx.Client`` keeps connections alive (HTTP/2 when the
+``h2`` package is installed). Each host gets:
+
+    - an adaptive token bucket: the request rate grows slowly while a host
+      answers normally and is halved on every 429, so throughput settles
+      near the highest rate the site tolerates
+    - jittered exponential backoff on 429/5xx and connection errors,
+      honouring ``Retry-After``
+    - a circuit breaker that stops hammering a host after repeated
+      failures and lets a single trial request through after a cool-down
+
+Counters and latencies per host are kept in ``HttpMetrics`` and can be
+exported as JSON or Prometheus text.
+
+    client = get_client()
+    response = client.get("https://www.nrl.com/draw/?competition=111&round=1&season=2024")
+    print(client.metrics.to_prometheus())
+
+Requires:
+    - httpx (h2 optional, for HTTP/2)
+"""
+
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional, Tuple, Type, TypeVar
+from urllib.parse import urlparse
+
+import httpx
+
+DEFAULT_HEADERS: Dict[str, str] = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.5",
+}
+
+# Responses worth retrying after a pause
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Requests per second per host: starting rate, floor and ceiling
+DEFAULT_RATE: float = 2.0
+MIN_RATE: float = 0.1
+MAX_RATE: float = 10.0
+DEFAULT_BURST: int = 4
+
+MAX_RETRIES: int = 4
+BACKOFF_BASE: float = 0.5
+BACKOFF_MAX: float = 30.0
+
+# Consecutive failures that open a host's circuit, and seconds before a trial request
+BREAKER_THRESHOLD: int = 5
+BREAKER_RESET: float = 60.0
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of sending a request to a host whose circuit is open"""
+
+
+# ============================================
+# Per-host controls
+# ============================================
+
+class TokenBucket:
+    """
+    Token bucket with additive increase / multiplicative decrease of its rate.
+
+    Attributes
+    ----------
+    rate : float
+        Current tokens (requests) per second
+    capacity : int
+        Largest burst allowed after an idle period
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, capacity: int = DEFAULT_BURST,
+                 min_rate: float = MIN_RATE, max_rate: float = MAX_RATE) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a token is available; returns the seconds waited"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1.0
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def succeeded(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + 0.05 * self.rate / max(self.rate, 1.0))
+
+    def throttled(self) -> None:
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+
+
+class CircuitBreaker:
+    """Closed -> open after ``threshold`` consecutive failures -> half-open after ``reset`` seconds"""
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, reset: float = BREAKER_RESET) -> None:
+        self.threshold = threshold
+        self.reset = reset
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def succeeded(self) -> None:
+        with self._lock:
+            self.failures, self.opened_at, self._trial = 0, None, False
+
+    def failed(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+
+# ============================================
+# Metrics
+# ============================================
+
+class HttpMetrics:
+    """Request counters and latency histograms per host"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.latency: Dict[str, list] = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+        self.latency_sum: Dict[str, float] = defaultdict(float)
+        self.waited: Dict[str, float] = defaultdict(float)
+
+    def count(self, host: str, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[host][name] += amount
+
+    def observe(self, host: str, seconds: float, status: Optional[object]) -> None:
+        with self._lock:
+            self.counters[host]["requests"] += 1
+            self.counters[host][f"status_{status}" if status is not None else "transport_errors"] += 1
+            self.latency_sum[host] += seconds
+            bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound), len(LATENCY_BUCKETS))
+            self.latency[host][bucket] += 1
+
+    def add_wait(self, host: str, seconds: float) -> None:
+        with self._lock:
+            self.waited[host] += seconds
+
+    def snapshot(self, rates: Optional[Dict[str, float]] = None) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            result = {}
+            for host, counters in self.counters.items():
+                requests = counters.get("requests", 0)
+                result[host] = {
+                    **counters,
+                    "latency_mean": self.latency_sum[host] / requests if requests else None,
+                    "latency_buckets": dict(zip([*map(str, LATENCY_BUCKETS), "+Inf"], self.latency[host])),
+                    "rate_limit_wait_seconds": round(self.waited[host], 3),
+                }
+                if rates and host in rates:
+                    result[host]["rate"] = round(rates[host], 3)
+            return result
+
+    def to_json(self, rates: Optional[Dict[str, float]] = None) -> str:
+        return json.dumps(self.snapshot(rates), sort_keys=True)
+
+    def to_prometheus(self, rates: Optional[Dict[str, float]] = None) -> str:
+        lines = []
+        snapshot = self.snapshot(rates)
+        for host, values in sorted(snapshot.items()):
+            label = f'host="{host}"'
+            for name, value in sorted(values.items()):
+                if name.startswith("status_"):
+                    lines.append(f'http_client_responses_total{{{label},code="{name[7:]}"}} {value}')
+                elif name in ("requests", "retries", "throttled", "transport_errors", "circuit_rejected"):
+                    lines.append(f"http_client_{name}_total{{{label}}} {value}")
+            cumulative = 0
+            for bound, count in values["latency_buckets"].items():
+                cumulative += count
+                lines.append(f'http_client_latency_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f"http_client_latency_seconds_sum{{{label}}} {self.latency_sum[host]:.6f}")
+            lines.append(f"http_client_latency_seconds_count{{{label}}} {values.get('requests', 0)}")
+            lines.append(f"http_client_rate_limit_wait_seconds_total{{{label}}} {values['rate_limit_wait_seconds']}")
+            if "rate" in values:
+                lines.append(f"http_client_rate_per_second{{{label}}} {values['rate']}")
+        return "\n".join(lines) + "\n"
+
+
+# ============================================
+# Client
+# ============================================
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX) -> float:
+    """Full-jitter exponential backoff for the given (0-based) retry"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    try:
+        return min(float(value), BACKOFF_MAX) if value is not None else None
+    except ValueError:
+        return None
+
+
+class HttpClient:
+    """
+    Pooled client applying per-host rate limits, retries and circuit breaking.
+
+    Parameters
+    ----------
+    rate, burst : float, int
+        Starting requests per second and burst size for every host
+    max_retries : int
+        Retries after the first attempt for retryable responses and errors
+    http2 : bool, optional
+        Defaults to True when the h2 package is installed
+    transport : httpx.BaseTransport, optional
+        Replaces the network transport (e.g. ``httpx.MockTransport`` for benchmarks)
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST, max_retries: int = MAX_RETRIES,
+                 timeout: float = 30.0, http2: Optional[bool] = None, headers: Optional[Dict[str, str]] = None,
+                 breaker_threshold: int = BREAKER_THRESHOLD, breaker_reset: float = BREAKER_RESET,
+                 transport: Optional[httpx.BaseTransport] = None) -> None:
+        if http2 is None:
+            try:
+                import h2  # noqa: F401
+                http2 = True
+            except ImportError:
+                http2 = False
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self.metrics = HttpMetrics()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self._client = httpx.Client(
+            http2=http2, timeout=timeout, follow_redirects=True, headers={**DEFAULT_HEADERS, **(headers or {})},
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=60),
+            transport=transport)
+
+    def configure_host(self, host: str, rate: Optional[float] = None, burst: Optional[int] = None,
+                       max_rate: Optional[float] = None) -> None:
+        """Override the limits of one host"""
+        bucket = self.bucket(host)
+        bucket.rate = rate if rate is not None else bucket.rate
+        bucket.capacity = burst if burst is not None else bucket.capacity
+        bucket.max_rate = max_rate if max_rate is not None else bucket.max_rate
+
+    def bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+                self._breakers[host] = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+            return self._buckets[host]
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        self.bucket(host)
+        return self._breakers[host]
+
+    def rates(self) -> Dict[str, float]:
+        with self._lock:
+            return {host: bucket.rate for host, bucket in self._buckets.items()}
+
+    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request through the host's limiter, retrying 429/5xx and
+        connection errors with jittered backoff.
+
+        Returns the final response (which may still be an error status once
+        retries run out).
+
+        Raises
+        ------
+        CircuitOpenError
+            If the host's circuit is open
+        httpx.TransportError
+            If every attempt failed to connect or read
+        """
+        host = urlparse(url).netloc
+        bucket, breaker = self.bucket(host), self.breaker(host)
+
+        for attempt in range(self.max_retries + 1):
+            if not breaker.allow():
+                self.metrics.count(host, "circuit_rejected")
+                raise CircuitOpenError(f"Circuit open for {host} after {breaker.failures} failures")
+            self.metrics.add_wait(host, bucket.acquire())
+
+            start = time.perf_counter()
+            try:
+                response = self._client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                self.metrics.observe(host, time.perf_counter() - start, None)
+                breaker.failed()
+                if attempt == self.max_retries:
+                    raise
+                self.metrics.count(host, "retries")
+                time.sleep(backoff_delay(attempt))
+                continue
+            self.metrics.observe(host, time.perf_counter() - start, response.status_code)
+
+            if response.status_code not in RETRY_STATUSES:
+                bucket.succeeded()
+                breaker.succeeded()
+                return response
+
+            if response.status_code == 429:
+                self.metrics.count(host, "throttled")
+                bucket.throttled()
+                # The host is up and answering, just rate limiting: that also ends a half-open trial
+                breaker.succeeded()
+            else:
+                breaker.failed()
+            if attempt == self.max_retries:
+                return response
+            self.metrics.count(host, "retries")
+            delay = _retry_after(response)
+            time.sleep(delay if delay is not None else backoff_delay(attempt))
+        return response
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def call(self, host: str, fn: Callable[[], T], retries: Optional[int] = None,
+             retry_on: Tuple[Type[BaseException], ...] = (Exception,)) -> T:
+        """
+        Run a non-HTTP operation against a host (e.g. a WebDriver page load)
+        under the same rate limit, backoff and circuit breaker.
+
+        Exceptions of the ``retry_on`` classes (transport failures: timeouts,
+        driver errors) count against the host and are retried; the last one
+        is raised. Any other exception (e.g. a page that loaded but could not
+        be parsed) is raised at once and counts as the host answering.
+        """
+        bucket, breaker = self.bucket(host), self.breaker(host)
+        retries = self.max_retries if retries is None else retries
+        for attempt in range(retries + 1):
+            if not breaker.allow():
+                self.metrics.count(host, "circuit_rejected")
+                raise CircuitOpenError(f"Circuit open for {host} after {breaker.failures} failures")
+            self.metrics.add_wait(host, bucket.acquire())
+            start = time.perf_counter()
+            try:
+                result = fn()
+            except retry_on:
+                self.metrics.observe(host, time.perf_counter() - start, None)
+                breaker.failed()
+                if attempt == retries:
+                    raise
+                self.metrics.count(host, "retries")
+                time.sleep(backoff_delay(attempt))
+                continue
+            except Exception:
+                # The host answered; the content was the problem. Counts as reachable, so a
+                # half-open trial that ends here closes the circuit instead of holding it
+                self.metrics.observe(host, time.perf_counter() - start, "content_error")
+                breaker.succeeded()
+                raise
+            self.metrics.observe(host, time.perf_counter() - start, "ok")
+            bucket.succeeded()
+            breaker.succeeded()
+            return result
+
+    def close(self) -> None:
+        self._client.close()
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """Process-wide shared client, created on first use"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+def set_client(client: HttpClient) -> Optional[HttpClient]:
+    """Replace the shared client (e.g. with one on a mock transport); returns the previous one"""
+    global _client
+    with _client_lock:
+        previous, _client = _client, client
+        return previous
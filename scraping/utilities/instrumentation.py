@@ -0,0 +1,240 @@
+"""
+instrumentation.py
+
+Structured timing, throughput and failure metrics for the scrapers.
+
+Every scrape is split into stages so a slow backfill shows where its time
+goes:
+
+    - driver:  WebDriver start-up
+    - fetch:   HTTP request or ``driver.get`` navigation
+    - render:  waiting for the extractor's selectors and reading ``driver.page_source``
+    - parse:   BeautifulSoup parsing
+    - extract: pulling fields out of the parsed page
+    - write:   saving season files
+
+Stages feed latency histograms, scraped matches feed per-stage counters
+(reported as matches per minute) and failures are counted by cause
+(timeout, http, circuit_open, driver, parse, other).
+
+    metrics = get_metrics()
+    with metrics.stage("parse"):
+        soup = BeautifulSoup(html, "html.parser")
+    metrics.add_matches("detailed", 8)
+    metrics.write("scrape_metrics.jsonl")   # or .prom for Prometheus text
+    print(metrics.summary())
+
+Requires:
+    - httpx (for the shared HTTP client metrics)
+"""
+
+import json
+import os
+import statistics
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from scraping.utilities.http_client import get_client
+
+STAGES: List[str] = ["driver", "fetch", "render", "parse", "extract", "write"]
+
+# Upper bounds (seconds) of the stage histogram buckets
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Raw durations kept per stage for the summary percentiles
+MAX_SAMPLES: int = 10000
+
+
+def failure_cause(ex: BaseException) -> str:
+    """Coarse cause of a scrape failure, by exception type (without importing selenium)"""
+    names = {cls.__name__ for cls in type(ex).__mro__}
+    if names & {"TimeoutException", "TimeoutError", "ReadTimeout", "ConnectTimeout", "PoolTimeout"}:
+        return "timeout"
+    if "CircuitOpenError" in names:
+        return "circuit_open"
+    if "WebDriverException" in names:
+        return "driver"
+    if names & {"HTTPError", "HTTPStatusError", "TransportError", "ConnectionError"}:
+        return "http"
+    if names & {"JSONDecodeError", "ValueError", "KeyError", "AttributeError", "IndexError", "TypeError"}:
+        return "parse"
+    return "other"
+
+
+class ScrapeMetrics:
+    """Thread-safe stage histograms, match counters and failure counts for one scrape run"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self._clock = time.monotonic()
+        self.buckets: Dict[str, List[int]] = defaultdict(lambda: [0] * (len(STAGE_BUCKETS) + 1))
+        self.totals: Dict[str, float] = defaultdict(float)
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.matches: Dict[str, int] = defaultdict(int)
+        self.failures: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    # ============================================
+    # Recording
+    # ============================================
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.counts[stage] += 1
+            self.totals[stage] += seconds
+            bucket = next((i for i, bound in enumerate(STAGE_BUCKETS) if seconds <= bound), len(STAGE_BUCKETS))
+            self.buckets[stage][bucket] += 1
+            if len(self.samples[stage]) < MAX_SAMPLES:
+                self.samples[stage].append(seconds)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as one observation of ``name`` (recorded even if it raises)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def add_matches(self, stage: str, count: int = 1) -> None:
+        with self._lock:
+            self.matches[stage] += count
+
+    def failure(self, cause: Union[BaseException, str], stage: str = "unknown") -> str:
+        """Count a failure under its cause (an exception or a cause name); returns the cause"""
+        cause = cause if isinstance(cause, str) else failure_cause(cause)
+        with self._lock:
+            self.failures[stage][cause] += 1
+        return cause
+
+    # ============================================
+    # Export
+    # ============================================
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self._clock
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            minutes = self.elapsed / 60
+            stages = {}
+            for name in [*STAGES, *sorted(set(self.counts) - set(STAGES))]:
+                if not self.counts.get(name):
+                    continue
+                samples = self.samples[name]
+                quantiles = statistics.quantiles(samples, n=20, method="inclusive") if len(samples) > 1 else samples * 19
+                stages[name] = {
+                    "count": self.counts[name],
+                    "sum": round(self.totals[name], 6),
+                    "mean": round(self.totals[name] / self.counts[name], 6),
+                    "p50": round(quantiles[9], 6),
+                    "p95": round(quantiles[18], 6),
+                    "max": round(max(samples), 6),
+                    "buckets": dict(zip([*map(str, STAGE_BUCKETS), "+Inf"], self.buckets[name])),
+                }
+            return {
+                "started": self.started,
+                "elapsed_seconds": round(self.elapsed, 3),
+                "stages": stages,
+                "matches": dict(self.matches),
+                "matches_per_minute": {stage: round(count / minutes, 2) if minutes else 0.0
+                                       for stage, count in self.matches.items()},
+                "failures": {stage: dict(causes) for stage, causes in self.failures.items()},
+            }
+
+    def to_json_lines(self, include_http: bool = True) -> str:
+        """One JSON record per stage, throughput counter and failure cause (plus HTTP hosts)"""
+        snapshot = self.snapshot()
+        base = {"run_started": snapshot["started"], "elapsed_seconds": snapshot["elapsed_seconds"]}
+        records = [{**base, "type": "stage", "stage": name, **values} for name, values in snapshot["stages"].items()]
+        records += [{**base, "type": "throughput", "stage": stage, "matches": count,
+                     "matches_per_minute": snapshot["matches_per_minute"][stage]}
+                    for stage, count in snapshot["matches"].items()]
+        records += [{**base, "type": "failure", "stage": stage, "cause": cause, "count": count}
+                    for stage, causes in snapshot["failures"].items() for cause, count in causes.items()]
+        if include_http:
+            client = get_client()
+            records += [{**base, "type": "http", "host": host, **values}
+                        for host, values in client.metrics.snapshot(client.rates()).items()]
+        return "".join(json.dumps(record, sort_keys=True) + "\n" for record in records)
+
+    def to_prometheus(self, include_http: bool = True) -> str:
+        snapshot = self.snapshot()
+        lines = []
+        for name, values in snapshot["stages"].items():
+            label = f'stage="{name}"'
+            cumulative = 0
+            for bound, count in values["buckets"].items():
+                cumulative += count
+                lines.append(f'scrape_stage_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f"scrape_stage_seconds_sum{{{label}}} {values['sum']}")
+            lines.append(f"scrape_stage_seconds_count{{{label}}} {values['count']}")
+        for stage, count in sorted(snapshot["matches"].items()):
+            lines.append(f'scrape_matches_total{{stage="{stage}"}} {count}')
+            lines.append(f'scrape_matches_per_minute{{stage="{stage}"}} {snapshot["matches_per_minute"][stage]}')
+        for stage, causes in sorted(snapshot["failures"].items()):
+            for cause, count in sorted(causes.items()):
+                lines.append(f'scrape_failures_total{{stage="{stage}",cause="{cause}"}} {count}')
+        lines.append(f"scrape_elapsed_seconds {snapshot['elapsed_seconds']}")
+        text = "\n".join(lines) + "\n"
+        if include_http:
+            client = get_client()
+            text += client.metrics.to_prometheus(client.rates())
+        return text
+
+    def write(self, path: str, fmt: Optional[str] = None) -> None:
+        """
+        Save the metrics; ``fmt`` is "jsonl" (appended, so runs accumulate) or
+        "prometheus" (overwritten), inferred from the extension by default.
+        """
+        fmt = fmt or ("prometheus" if path.endswith((".prom", ".txt")) else "jsonl")
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        if fmt == "prometheus":
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(self.to_prometheus())
+        else:
+            with open(path, "a", encoding="utf-8") as file:
+                file.write(self.to_json_lines())
+
+    def summary(self) -> str:
+        """Human-readable end-of-run report"""
+        snapshot = self.snapshot()
+        lines = [f"Scrape metrics after {snapshot['elapsed_seconds']:.0f}s"]
+        total = sum(values["sum"] for values in snapshot["stages"].values()) or 1.0
+        lines.append(f"  {'stage':<8} {'count':>7} {'total s':>9} {'share':>6} {'mean s':>8} {'p95 s':>8} {'max s':>8}")
+        for name, values in snapshot["stages"].items():
+            lines.append(f"  {name:<8} {values['count']:>7} {values['sum']:>9.1f} {values['sum'] / total:>6.0%} "
+                         f"{values['mean']:>8.3f} {values['p95']:>8.3f} {values['max']:>8.3f}")
+        for stage, count in snapshot["matches"].items():
+            lines.append(f"  {stage}: {count} matches ({snapshot['matches_per_minute'][stage]:.1f}/min)")
+        failures = [f"{stage}/{cause} {count}" for stage, causes in snapshot["failures"].items()
+                    for cause, count in sorted(causes.items())]
+        lines.append("  failures: " + (", ".join(failures) if failures else "none"))
+        return "\n".join(lines)
+
+
+_metrics: Optional[ScrapeMetrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> ScrapeMetrics:
+    """Process-wide metrics for the current run, created on first use"""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = ScrapeMetrics()
+        return _metrics
+
+
+def reset_metrics() -> ScrapeMetrics:
+    """Start a fresh run"""
+    global _metrics
+    with _metrics_lock:
+        _metrics = ScrapeMetrics()
+        return _metrics
@@ -1,18 +1,21 @@
 #!/usr/bin/env python3
 """
 Fetch all NRL 2026 fixtures from nrl.com and store in JSON
-Usage: python scripts/fetch_fixtures.py
+Usage (from the repository root): python -m scripts.fetch_fixtures
 """
 
-import requests
 from bs4 import BeautifulSoup
 import json
 from datetime import datetime
 import os
 
+from config import environment as EV
+from data.entities import get_registry
+from scraping.utilities.http_client import get_client
+
 def fetch_round_fixtures(round_num, year=2026, competition='111'):
     """Fetch fixtures for a specific round from nrl.com"""
-    url = f"https://www.nrl.com/draw/?competition={competition}&round={round_num}&season={year}"
+    url = f"{EV.NRL_DRAW_URL}?competition={competition}&round={round_num}&season={year}"
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
@@ -22,7 +25,7 @@ def fetch_round_fixtures(round_num, year=2026, competition='111'):
     print(f"Fetching Round {round_num}...")
     
     try:
-        response = requests.get(url, headers=headers, timeout=30)
+        response = get_client().get(url, headers=headers)
         if response.status_code != 200:
             print(f"  ❌ Failed to fetch round {round_num}: Status {response.status_code}")
             return None
@@ -52,6 +55,9 @@ def fetch_round_fixtures(round_num, year=2026, competition='111'):
         
         fixtures = data.get("fixtures", [])
         
+        registry = get_registry()
+        teams = registry.team_index("NRL")
+
         matches = []
         for fixture in fixtures:
             if fixture.get("type") == "Match":
@@ -66,6 +72,9 @@ def fetch_round_fixtures(round_num, year=2026, competition='111'):
                     "home_team_full": fixture.get("homeTeam", {}).get("name", "TBD"),
                     "away_team_full": fixture.get("awayTeam", {}).get("name", "TBD"),
                 }
+                match["home_team_id"] = teams.resolve(match["home_team"])
+                match["away_team_id"] = teams.resolve(match["away_team"])
+                match["venue_id"] = registry.venues.id(match["venue"], create=True)
                 matches.append(match)
         
         if matches:
@@ -111,6 +120,9 @@ def save_fixtures(fixtures, filepath="app/data/fixtures_2026.json"):
     
     with open(filepath, "w", encoding="utf-8") as f:
         json.dump(output, f, indent=2, ensure_ascii=False)
+
+    # Keep newly seen venue IDs stable for the next fetch
+    get_registry().save()
     
     print(f"\n💾 Saved fixtures to {filepath}")
     print(f"📊 Total matches: {sum(len(matches) for matches in fixtures.values())}")
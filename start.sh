@@ -12,7 +12,7 @@ pip install -r requirements.txt
 
 # Fetch fixtures from nrl.com
 echo "🔄 Fetching fixtures from nrl.com..."
-python3 scripts/fetch_fixtures.py
+python3 -m scripts.fetch_fixtures
 
 echo "✅ Fixtures updated successfully!"
 